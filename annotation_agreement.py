@@ -0,0 +1,335 @@
+#!/usr/bin/python3
+# student: J.F.P. (Richard) Scholtens
+# studentnr.: s2956586
+# datum: 18/10/2026
+# Calculates the agreement between any number of annotators and writes the
+# gold standards. Every annotation file is read into a matrix with a row per
+# entity and a column per label (1 if the annotator gave the label), so all
+# measures are calculated with NumPy over these matrices:
+#
+# - the overlap agreement: the part of the entities answered by both on
+#   which two annotators share at least one label;
+# - Cohen's kappa per pair of annotators and Fleiss' kappa over all
+#   annotators, for every label as a yes/no decision and over all decisions
+#   together;
+# - Krippendorff's alpha over the label sets, with the Jaccard or the MASI
+#   distance between two sets. Entities without answer count as missing.
+#
+# The union, intersection and majority gold standards are written in one
+# pass, in the format of gold_standard.py. An annotation file has the
+# format:
+#
+# SENTENCE: TAB PDF -bestand over de rivier
+# ENTITY 1: TAB PDF
+# ANSWER 1: TAB Category:Technology TAB Category:Science
+#
+# Usage: python3 annotation_agreement.py ANNOTATIONS_1.txt ANNOTATIONS_2.txt
+#                                        [ANNOTATIONS_3.txt ...]
+
+
+import sys
+import itertools
+import numpy as np
+import scipy.sparse as sparse
+
+
+GOLD_STANDARDS = ('union', 'intersection', 'majority')
+
+
+def read_annotations(file_name):
+    """Reads an annotation file and returns a list of (sentence number,
+    sentence, entity, labels) tuples, one per entity. Labels never contain
+    spaces, so labels that were separated by a space instead of a tab are
+    split as well. An entity without answer has no labels."""
+    items = []
+    number = -1
+    sentence = None
+    with open(file_name) as file:
+        for line in file:
+            line = line.strip().split('\t')
+            if line[0] == 'SENTENCE:':
+                number += 1
+                sentence = line[1]
+            elif line[0][:6] == 'ENTITY':
+                items.append((number, sentence, line[1], []))
+            elif line[0][:6] == 'ANSWER' and items:
+                items[-1][3].extend(' '.join(line[1:]).split())
+    return items
+
+
+def annotation_matrices(file_names):
+    """Reads the annotation files of all annotators and returns the entities
+    (sentence number, sentence, entity), the sorted labels, a boolean array
+    (annotators, entities, labels) with the labels of every annotator and a
+    boolean matrix (annotators, entities) that tells which entities every
+    annotator answered. The files must have the same entities in the same
+    order."""
+    annotations = [read_annotations(file_name) for file_name in file_names]
+    entities = [item[:3] for item in annotations[0]]
+    for file_name, items in zip(file_names, annotations):
+        if [item[:3] for item in items] != entities:
+            raise ValueError('{0} DOES NOT HAVE THE ENTITIES OF {1}'.format(
+                file_name, file_names[0]))
+    labels = sorted({label for items in annotations
+                     for item in items for label in item[3]})
+    columns = {label: column for column, label in enumerate(labels)}
+    matrix = np.zeros((len(annotations), len(entities), len(labels)),
+                      dtype=bool)
+    for annotator, items in enumerate(annotations):
+        rows = [row for row, item in enumerate(items) for _ in item[3]]
+        cols = [columns[label] for item in items for label in item[3]]
+        matrix[annotator, rows, cols] = True
+    return entities, labels, matrix, matrix.any(axis=2)
+
+
+def kappa(observed, expected):
+    """Returns (observed - expected) / (1 - expected), or NaN where the
+    expected agreement is 1."""
+    observed = np.asarray(observed, dtype=float)
+    expected = np.asarray(expected, dtype=float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(expected < 1, (observed - expected) / (1 - expected),
+                        np.nan)
+
+
+def nan_mean(values, axis=None):
+    """Returns the mean without NaN values, or NaN if there are none."""
+    values = np.asarray(values, dtype=float)
+    number = np.sum(~np.isnan(values), axis=axis)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.nansum(values, axis=axis) / number
+
+
+def overlap_agreement(matrix, answered):
+    """Returns the part of the entities, answered by both, on which two
+    annotators share at least one label, averaged over all pairs."""
+    scores = []
+    for first, second in itertools.combinations(range(len(matrix)), 2):
+        both = answered[first] & answered[second]
+        shared = np.any(matrix[first, both] & matrix[second, both], axis=1)
+        scores.append(shared.mean() if both.any() else np.nan)
+    return float(nan_mean(scores))
+
+
+def cohen_kappa(matrix, answered):
+    """Returns Cohen's kappa of every label and of all decisions together,
+    averaged over all pairs of annotators, on the entities both annotators
+    of a pair answered."""
+    per_label = []
+    pooled = []
+    for first, second in itertools.combinations(range(len(matrix)), 2):
+        both = answered[first] & answered[second]
+        x = matrix[first, both]
+        y = matrix[second, both]
+        observed = (x == y).mean(axis=0)
+        x_yes = x.mean(axis=0)
+        y_yes = y.mean(axis=0)
+        per_label.append(kappa(observed, x_yes * y_yes +
+                               (1 - x_yes) * (1 - y_yes)))
+        observed = (x == y).mean()
+        x_yes = x.mean()
+        y_yes = y.mean()
+        pooled.append(kappa(observed, x_yes * y_yes +
+                            (1 - x_yes) * (1 - y_yes)))
+    return nan_mean(per_label, axis=0), float(nan_mean(pooled))
+
+
+def fleiss_kappa(matrix, answered):
+    """Returns Fleiss' kappa of every label and of all decisions together,
+    on the entities all annotators answered."""
+    raters = len(matrix)
+    yes = matrix[:, answered.all(axis=0)].sum(axis=0)
+    no = raters - yes
+    # The agreement on an entity: the part of the pairs of annotators that
+    # made the same decision.
+    agreement = (yes * (yes - 1) + no * (no - 1)) / (raters * (raters - 1))
+    p_yes = yes.mean(axis=0) / raters
+    per_label = kappa(agreement.mean(axis=0), p_yes ** 2 + (1 - p_yes) ** 2)
+    p_yes = yes.mean() / raters
+    pooled = kappa(agreement.mean(), p_yes ** 2 + (1 - p_yes) ** 2)
+    return per_label, float(pooled)
+
+
+def set_distance(intersection, first_size, second_size, distance='masi'):
+    """Returns the Jaccard or MASI distance between label sets, given the
+    size of their intersection and their sizes."""
+    union = first_size + second_size - intersection
+    jaccard = np.where(union > 0, intersection / np.maximum(union, 1), 1.0)
+    if distance == 'jaccard':
+        return 1 - jaccard
+    # MASI weighs the Jaccard similarity by how the sets relate: equal 1,
+    # one a subset of the other 2/3, overlapping 1/3, disjoint 0.
+    monotonicity = np.select(
+        [(intersection == first_size) & (intersection == second_size),
+         intersection == np.minimum(first_size, second_size),
+         intersection > 0],
+        [1.0, 2 / 3, 1 / 3], 0.0)
+    return 1 - jaccard * monotonicity
+
+
+def pair_weights(matrix, answered, block_size=1024):
+    """Counts the pairs of label sets that Krippendorff's alpha compares, per
+    combination of the size of the first set, the size of the intersection
+    and the size of the second set, since both distances only depend on
+    these sizes. Returns the weights of the observed pairs (within an
+    entity, divided by the number of annotators of the entity minus one),
+    of the expected pairs (over all entities), the number of pairable
+    values and the number of sizes. The last weight is that of the pairs
+    without a common label that are not both empty."""
+    counts = answered.sum(axis=0)
+    pairable = counts >= 2
+    sizes = matrix.sum(axis=2)
+    size = int(sizes.max()) + 1
+    observed = np.zeros(size ** 3 + 1)
+    for first, second in itertools.permutations(range(len(matrix)), 2):
+        both = answered[first] & answered[second] & pairable
+        intersection = (matrix[first, both] & matrix[second, both]).sum(axis=1)
+        key = (sizes[first, both] * size + intersection) * size + \
+            sizes[second, both]
+        observed += np.bincount(key, 1 / (counts[both] - 1),
+                                minlength=size ** 3 + 1)
+
+    # Two sets without a common label are at distance 1, so of the distinct
+    # sets only the pairs that share a label are counted, from the sparse
+    # product of the sets with themselves; the rest follows from the total.
+    sets = matrix[answered & pairable[np.newaxis]]
+    packed = np.ascontiguousarray(np.packbits(sets, axis=1))
+    _, first, frequency = np.unique(
+        packed.view(np.dtype((np.void, packed.shape[1]))).ravel(),
+        return_index=True, return_counts=True)
+    sets = sparse.csr_matrix(sets[first], dtype=np.int32)
+    transposed = sets.T.tocsc()
+    set_sizes = np.asarray(sets.sum(axis=1)).ravel()
+    expected = np.zeros(size ** 3 + 1)
+    for start in range(0, sets.shape[0], block_size):
+        # Only the pairs with the second set at or after the first are
+        # computed; the other half is the same with the sets swapped.
+        block = (sets[start:start + block_size] @
+                 transposed[:, start:]).tocoo()
+        upper = block.col >= block.row
+        rows = block.row[upper] + start
+        columns = block.col[upper] + start
+        weight = frequency[rows] * frequency[columns] * \
+            np.where(rows == columns, 1.0, 2.0)
+        key = (set_sizes[rows] * size + block.data[upper]) * size + \
+            set_sizes[columns]
+        expected += np.bincount(key, weight, minlength=size ** 3 + 1)
+    # Two empty sets share no label but are equal, so they are not in the
+    # product; they keep the key of two empty sets.
+    expected[0] = float(frequency[set_sizes == 0].sum()) ** 2
+    values = counts[pairable].sum()
+    # The disjoint pairs: all pairs of values minus the ones counted above,
+    # in their own last slot (distance 1 is set below).
+    expected[-1] = float(values) ** 2 - expected.sum()
+    return observed, expected, values, size
+
+
+def krippendorff_alphas(matrix, answered, distances=('masi', 'jaccard')):
+    """Returns Krippendorff's alpha over the label sets of the annotators
+    for every distance. Entities answered by fewer than two annotators are
+    left out."""
+    observed, expected, values, size = pair_weights(matrix, answered)
+    alphas = {}
+    for distance in distances:
+        first_size, intersection, second_size = np.unravel_index(
+            np.arange(size ** 3), (size, size, size))
+        table = np.append(set_distance(intersection, first_size,
+                                       second_size, distance), 1.0)
+        disagreement = expected @ table
+        if values < 2 or disagreement == 0:
+            alphas[distance] = float('nan')
+        else:
+            alphas[distance] = float(1 - (observed @ table / values) /
+                                     (disagreement / (values * (values - 1))))
+    return alphas
+
+
+def krippendorff_alpha(matrix, answered, distance='masi'):
+    """Returns Krippendorff's alpha with the Jaccard or MASI distance."""
+    return krippendorff_alphas(matrix, answered, (distance,))[distance]
+
+
+def gold_standards(matrix, answered):
+    """Returns the labels of the union, intersection and majority gold
+    standards as boolean matrices (entities, labels). The intersection and
+    the majority only count the annotators that answered an entity."""
+    votes = matrix.sum(axis=0)
+    counts = answered.sum(axis=0)[:, np.newaxis]
+    return {'union': votes > 0,
+            'intersection': (votes == counts) & (counts > 0),
+            'majority': 2 * votes > counts}
+
+
+def write_gold_standards(entities, labels, golds, prefix):
+    """Writes every gold standard to PREFIX_NAME.txt in one pass over the
+    entities, in the format that flair_inference.py reads."""
+    files = {name: open('{0}_{1}.txt'.format(prefix, name), 'w')
+             for name in golds}
+    try:
+        previous = None
+        for row, (number, sentence, entity) in enumerate(entities):
+            for name, file in files.items():
+                if number != previous:
+                    file.write('SENTENCE:\t{0}\n'.format(sentence))
+                file.write('ENTITY:\t{0}\n'.format(entity))
+                file.write('ANSWER:\t')
+                for column in np.flatnonzero(golds[name][row]):
+                    file.write('{0}\t'.format(labels[column]))
+                file.write('\n')
+            previous = number
+    finally:
+        for file in files.values():
+            file.close()
+    return [file.name for file in files.values()]
+
+
+def agreement(matrix, answered):
+    """Returns all agreement measures as a dictionary."""
+    cohen, cohen_pooled = cohen_kappa(matrix, answered)
+    fleiss, fleiss_pooled = fleiss_kappa(matrix, answered)
+    alphas = krippendorff_alphas(matrix, answered)
+    return {'overlap_agreement': overlap_agreement(matrix, answered),
+            'cohen_kappa': cohen_pooled,
+            'cohen_kappa_macro': float(nan_mean(cohen)),
+            'cohen_kappa_per_label': cohen,
+            'fleiss_kappa': fleiss_pooled,
+            'fleiss_kappa_macro': float(nan_mean(fleiss)),
+            'fleiss_kappa_per_label': fleiss,
+            'alpha_masi': alphas['masi'],
+            'alpha_jaccard': alphas['jaccard']}
+
+
+def print_agreement(scores, labels):
+    print('OVERLAP AGREEMENT: {0:.4f}'.format(scores['overlap_agreement']))
+    print("COHEN'S KAPPA: {0:.4f} (MACRO {1:.4f})".format(
+        scores['cohen_kappa'], scores['cohen_kappa_macro']))
+    print("FLEISS' KAPPA: {0:.4f} (MACRO {1:.4f})".format(
+        scores['fleiss_kappa'], scores['fleiss_kappa_macro']))
+    print("KRIPPENDORFF'S ALPHA (MASI): {0:.4f}".format(scores['alpha_masi']))
+    print("KRIPPENDORFF'S ALPHA (JACCARD): {0:.4f}\n".format(
+        scores['alpha_jaccard']))
+    print("{0:35}{1:>15}{2:>15}\n".format('LABEL:', "COHEN'S KAPPA:",
+                                          "FLEISS' KAPPA:"))
+    for label, cohen, fleiss in zip(labels, scores['cohen_kappa_per_label'],
+                                    scores['fleiss_kappa_per_label']):
+        print("{0:35}{1:>15.4f}{2:>15.4f}".format(label, cohen, fleiss))
+    print()
+
+
+def main():
+    if len(sys.argv) < 3:
+        print('USAGE: python3 annotation_agreement.py ANNOTATIONS_1.txt '
+              'ANNOTATIONS_2.txt [ANNOTATIONS_3.txt ...]')
+        sys.exit(1)
+    prefix = 'gold_standard'
+    entities, labels, matrix, answered = annotation_matrices(sys.argv[1:])
+    print('ANNOTATORS: {0}, ENTITIES: {1}, LABELS: {2}\n'.format(
+        len(matrix), len(entities), len(labels)))
+    print_agreement(agreement(matrix, answered), labels)
+    for file_name in write_gold_standards(
+            entities, labels, gold_standards(matrix, answered), prefix):
+        print('GOLD STANDARD WRITTEN TO {0}'.format(file_name))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,162 @@
+#!/usr/bin/python3
+# student: J.F.P. (Richard) Scholtens
+# studentnr.: s2956586
+# datum: 18/10/2026
+# Runs the baselines of pre-processing_and_baseline.py on the training,
+# development and test files of dataset_split.py. The texts are turned into
+# sparse features only once: a HashingVectorizer needs no vocabulary, so
+# every file is vectorized on its own and the CSR matrix is stored on disk
+# next to its labels. A following run, or another baseline, loads the
+# matrices instead of vectorizing again. The one-vs-rest classifiers train
+# their estimators in parallel.
+#
+# For datasets that do not fit in memory a model can also be trained in
+# batches with partial_fit, streamed record by record from the JSONL dataset
+# shards (see dataset_records.py).
+
+
+import os
+import json
+import hashlib
+import numpy as np
+import scipy.sparse as sparse
+from sklearn.svm import LinearSVC
+from sklearn.dummy import DummyClassifier
+from sklearn.naive_bayes import MultinomialNB
+from sklearn.linear_model import LogisticRegression
+from sklearn.multiclass import OneVsRestClassifier
+from sklearn.feature_extraction.text import (HashingVectorizer,
+                                             TfidfTransformer)
+from dataset_split import split_file_names
+from dataset_records import read_records
+from flair_corpus import FlairFile
+from flair_writer import clean_text
+
+
+N_FEATURES = 2 ** 20
+
+
+def baseline_models(n_jobs=-1):
+    """Returns the baselines by name. The one-vs-rest classifiers fit one
+    estimator per label, n_jobs at the same time."""
+    return {
+        'DUMMYCLASSIFIER': DummyClassifier(strategy='most_frequent'),
+        'NB_PIPLINE': OneVsRestClassifier(MultinomialNB(
+            fit_prior=True, class_prior=None), n_jobs=n_jobs),
+        'LINEAR_SVM': OneVsRestClassifier(LinearSVC(), n_jobs=n_jobs),
+        'LOGISTIC_REGRESSION': OneVsRestClassifier(LogisticRegression(
+            max_iter=1000), n_jobs=n_jobs),
+    }
+
+
+def make_vectorizer(stop_words=None, n_features=N_FEATURES):
+    """Returns the vectorizer that counts the words of a text. It keeps no
+    state, so every file and batch can be vectorized on its own."""
+    return HashingVectorizer(n_features=n_features, alternate_sign=False,
+                             norm=None, stop_words=stop_words)
+
+
+def iterate_flair_batches(file_names, batch_size=10000):
+    """Yields the texts and labels of Flair files in batches, read through
+    their indexes (see flair_corpus.py)."""
+    for file_name in file_names:
+        with FlairFile(file_name) as flair_file:
+            yield from flair_file.batches(batch_size)
+
+
+def iterate_record_batches(file_names, batch_size=10000):
+    """Yields the cleaned abstracts and topics of dataset shards in batches,
+    reading the shards one record at a time."""
+    texts, labels = [], []
+    for file_name in file_names:
+        for record in read_records(file_name):
+            texts.append(clean_text(record['abstract']))
+            labels.append(record['topic'])
+            if len(texts) == batch_size:
+                yield texts, labels
+                texts, labels = [], []
+    if texts:
+        yield texts, labels
+
+
+def cache_key(file_name, vectorizer):
+    """Returns a key that changes when the file or the vectorizer
+    changes."""
+    status = os.stat(file_name)
+    settings = json.dumps([os.path.abspath(file_name), status.st_size,
+                           status.st_mtime_ns, vectorizer.n_features,
+                           sorted(vectorizer.stop_words or [])])
+    return hashlib.sha1(settings.encode('utf-8')).hexdigest()[:16]
+
+
+def file_features(file_name, vectorizer, cache_dir='feature_cache',
+                  batch_size=10000):
+    """Returns the word counts of a Flair file as CSR matrix together with
+    the labels. The result is stored in the cache directory and loaded from
+    there as long as the file does not change."""
+    os.makedirs(cache_dir, exist_ok=True)
+    path = os.path.join(cache_dir, '{0}_{1}'.format(
+        os.path.basename(file_name), cache_key(file_name, vectorizer)))
+    if os.path.exists(path + '.npz'):
+        with open(path + '.labels.json') as file:
+            return sparse.load_npz(path + '.npz'), json.load(file)
+    matrices = []
+    labels = []
+    for texts, batch_labels in iterate_flair_batches([file_name],
+                                                     batch_size):
+        matrices.append(vectorizer.transform(texts))
+        labels.extend(batch_labels)
+    if matrices:
+        matrix = sparse.vstack(matrices, format='csr')
+    else:
+        matrix = sparse.csr_matrix((0, vectorizer.n_features))
+    sparse.save_npz(path + '.npz', matrix)
+    with open(path + '.labels.json', 'w') as file:
+        json.dump(labels, file)
+    return matrix, labels
+
+
+def load_features(prefix, stop_words=None, cache_dir='feature_cache'):
+    """Returns the tf-idf features and labels of the training, development
+    and test files of a prefix (see dataset_split.py) as a dictionary with
+    the sets as keys. The idf weights are learned on the training set."""
+    vectorizer = make_vectorizer(stop_words)
+    counts = {split: file_features(file_name, vectorizer, cache_dir)
+              for split, file_name in split_file_names(prefix).items()}
+    tfidf = TfidfTransformer().fit(counts['train'][0])
+    return {split: (tfidf.transform(matrix), labels)
+            for split, (matrix, labels) in counts.items()}
+
+
+def fit_baselines(features, names=None, n_jobs=-1):
+    """Fits the baselines on the training features and yields the name of
+    every baseline with its predictions for the development and test
+    set."""
+    models = baseline_models(n_jobs)
+    X_train, Y_train = features['train']
+    for name in names or models:
+        model = models[name].fit(X_train, Y_train)
+        yield (name, model.predict(features['dev'][0]),
+               model.predict(features['test'][0]))
+
+
+def stream_fit(model, file_names, classes, stop_words=None,
+               batch_size=10000):
+    """Trains a model that has partial_fit, such as MultinomialNB or
+    SGDClassifier, on JSONL dataset shards in batches, so the shards never
+    have to fit in memory. Every record is one sample with its topic as
+    label. The classes are all topics the model will see. The model learns
+    from word counts, without idf weights."""
+    vectorizer = make_vectorizer(stop_words)
+    for texts, labels in iterate_record_batches(file_names, batch_size):
+        model.partial_fit(vectorizer.transform(texts), np.array(labels),
+                          classes=classes)
+    return model
+
+
+def record_topics(file_names):
+    """Returns the sorted topics of dataset shards, for stream_fit."""
+    topics = set()
+    for file_name in file_names:
+        topics.update(record['topic'] for record in read_records(file_name))
+    return sorted(topics)
@@ -0,0 +1,260 @@
+#!/usr/bin/python3
+# student: J.F.P. (Richard) Scholtens
+# studentnr.: s2956586
+# datum: 18/10/2026
+# Checkpoints a crawl of retrieve_information.py to an append-only log, so
+# an interrupted crawl can be resumed where it stopped. Every line of the log
+# is a JSON record with one of the following events:
+#
+# {"event": "topic", "topic": ..., "fingerprint": ..., "order": [3, 1, 4, 2]}
+#                                     a topic is started with this order of
+#                                     strategies, or "order": null for the
+#                                     cascade 1, 2, 3, 4 without a planner
+# {"event": "strategy", "topic": ..., "strategy": 2, "counter": 120}
+# {"event": "abstract", "topic": ..., "category": ..., "entity": ...,
+#  "abstract": ...}                                       an abstract arrived
+# {"event": "done", "topic": ..., "counter": 357, "check": true}
+# {"event": "resume", "topic": ...}   abstracts of the unfinished strategy
+#                                     are discarded, the strategy is rerun
+# {"event": "reset", "topic": ...}    the topic is collected again
+# {"event": "translation", "entity": ..., "language": "en", "abstracts": [...]}
+#                                     the abstracts of an entity in another
+#                                     language (see language_abstracts.py)
+#
+# The abstracts of an unfinished strategy are kept in a lookup table, so when
+# the strategy is rerun these abstracts do not have to be retrieved again.
+
+
+import os
+import json
+
+
+class CheckpointLog:
+    """Appends crawl events to a log file. Every record is flushed to disk
+    as soon as it is written."""
+
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path, 'a', encoding='utf-8')
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def write(self, event, **fields):
+        fields['event'] = event
+        self.file.write(json.dumps(fields, ensure_ascii=False) + '\n')
+        self.file.flush()
+        os.fsync(self.file.fileno())
+
+    def topic(self, topic, fingerprint, order=None):
+        self.write('topic', topic=topic, fingerprint=fingerprint, order=order)
+
+    def strategy(self, topic, strategy, counter):
+        self.write('strategy', topic=topic, strategy=strategy,
+                   counter=counter)
+
+    def abstract(self, topic, category, entity, abstract):
+        self.write('abstract', topic=topic, category=category, entity=entity,
+                   abstract=abstract)
+
+    def done(self, topic, counter, check):
+        self.write('done', topic=topic, counter=counter, check=check)
+
+    def resume(self, topic):
+        self.write('resume', topic=topic)
+
+    def reset(self, topic):
+        self.write('reset', topic=topic)
+
+    def translation(self, entity, language, abstracts):
+        self.write('translation', entity=entity, language=language,
+                   abstracts=abstracts)
+
+    def close(self):
+        self.file.close()
+
+
+class MemoryLog(CheckpointLog):
+    """Keeps crawl events in a list instead of writing them to a file. The
+    worker processes of parallel_crawl.py use it to send the events of a
+    topic back, so they can be written to the real log in order."""
+
+    def __init__(self):
+        self.records = []
+
+    def write(self, event, **fields):
+        fields['event'] = event
+        self.records.append(fields)
+
+    def close(self):
+        pass
+
+
+class CrawlState:
+    """The state of a crawl after replaying its log. The dataset has the
+    architecture dictionary[topic][category][entity] = abstract and only
+    holds abstracts of finished strategies. For every topic the progress
+    holds the strategy that was running, the counter at its start, the
+    strategies that were started in order, the planned order of the
+    strategies, the fingerprint of the topic and whether the topic is done.
+    The abstracts table holds every abstract that was ever logged per
+    entity, and the translations table the abstracts per entity in the
+    other languages."""
+
+    def __init__(self):
+        self.dataset = {}
+        self.progress = {}
+        self.pending = {}
+        self.abstracts = {}
+        self.sources = {}
+        self.translations = {}
+
+    def commit(self, topic):
+        """Moves the pending abstracts of a topic into the dataset."""
+        for category, entity, abstract, strategy in self.pending.pop(topic,
+                                                                     []):
+            categories = self.dataset.setdefault(topic, {})
+            categories.setdefault(category, {})[entity] = abstract
+            self.sources[(topic, category, entity)] = strategy
+
+
+def replay_log(path):
+    """Reads a checkpoint log and returns the CrawlState. A last line that
+    was only partly written when the crawl stopped is skipped."""
+    state = CrawlState()
+    if not os.path.exists(path):
+        return state
+    with open(path, encoding='utf-8') as file:
+        for line in file:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            event = record['event']
+            if event == 'translation':
+                state.translations.setdefault(record['entity'], {})[
+                    record['language']] = set(record['abstracts'])
+                continue
+            topic = record['topic']
+            if event == 'topic':
+                state.progress[topic] = {'strategy': 1, 'counter': 0,
+                                         'strategies': [],
+                                         'order': record.get('order'),
+                                         'fingerprint': record['fingerprint'],
+                                         'done': False, 'check': False}
+            elif event == 'strategy':
+                state.commit(topic)
+                state.progress[topic]['strategy'] = record['strategy']
+                state.progress[topic]['counter'] = record['counter']
+                state.progress[topic]['strategies'].append(record['strategy'])
+            elif event == 'abstract':
+                strategy = state.progress[topic]['strategy']
+                state.pending.setdefault(topic, []).append(
+                    (record['category'], record['entity'], record['abstract'],
+                     strategy))
+                state.abstracts.setdefault(record['entity'],
+                                           set()).add(record['abstract'])
+            elif event == 'done':
+                state.commit(topic)
+                state.progress[topic].update(done=True,
+                                             counter=record['counter'],
+                                             check=record['check'])
+            elif event == 'resume':
+                state.pending.pop(topic, None)
+            elif event == 'reset':
+                state.pending.pop(topic, None)
+                state.dataset.pop(topic, None)
+                state.progress.pop(topic, None)
+    return state
+
+
+class CheckpointedEntities(dict):
+    """The entities of one category. Every new abstract is written to the
+    log before it is stored."""
+
+    def __init__(self, log, topic, category):
+        super().__init__()
+        self.log = log
+        self.topic = topic
+        self.category = category
+
+    def __setitem__(self, entity, abstract):
+        if self.get(entity) != abstract:
+            self.log.abstract(self.topic, self.category, entity, abstract)
+        super().__setitem__(entity, abstract)
+
+
+class CheckpointedCategories(dict):
+    """The categories of one topic."""
+
+    def __init__(self, log, topic):
+        super().__init__()
+        self.log = log
+        self.topic = topic
+
+    def __missing__(self, category):
+        entities = CheckpointedEntities(self.log, self.topic, category)
+        dict.__setitem__(self, category, entities)
+        return entities
+
+
+class CheckpointedDataset(dict):
+    """Can be used instead of the nested defaultdict of
+    retrieve_information.main(). Abstracts that are stored in it with
+    dictionary[topic][category][entity] = abstract are written to the log
+    as they arrive. The dataset is filled with the abstracts of a replayed
+    crawl without writing them to the log again."""
+
+    def __init__(self, log, dataset=None):
+        super().__init__()
+        self.log = log
+        for topic, categories in (dataset or {}).items():
+            for category, entities in categories.items():
+                for entity, abstract in entities.items():
+                    dict.__setitem__(self[topic][category], entity, abstract)
+
+    def __missing__(self, topic):
+        categories = CheckpointedCategories(self.log, topic)
+        dict.__setitem__(self, topic, categories)
+        return categories
+
+
+class ReplayEngine:
+    """Wraps an engine and answers abstract lookups of entities that are
+    already in the log from the abstracts table of the replayed crawl. All
+    other lookups are passed on to the engine."""
+
+    def __init__(self, engine, abstracts):
+        self.engine = engine
+        self.abstracts = abstracts
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    @property
+    def queries(self):
+        return self.engine.queries
+
+    def collect(self, kind, entities):
+        if kind != 'dbo_abstract':
+            return self.engine.collect(kind, entities)
+        unknown = [entity for entity in entities
+                   if entity not in self.abstracts]
+        found = dict(zip(unknown, self.engine.collect(kind, unknown)))
+        return [self.abstracts[entity] if entity in self.abstracts
+                else found[entity] for entity in entities]
+
+    def count(self, kind, entities):
+        return self.engine.count(kind, entities)
+
+    def stream(self, kind, entity, page_size):
+        return self.engine.stream(kind, entity, page_size)
+
+    def close(self):
+        self.engine.close()
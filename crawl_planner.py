@@ -0,0 +1,164 @@
+#!/usr/bin/python3
+# student: J.F.P. (Richard) Scholtens
+# studentnr.: s2956586
+# datum: 18/10/2026
+# Plans in which order the collection strategies of retrieve_information.py
+# run for a topic. The fixed cascade 1 -> 2 -> 3 -> 4 often spends thousands
+# of queries on the two-hop expansion of strategy 2 for a handful of new
+# abstracts, while strategy 3 could have filled the topic with a few batched
+# abstract lookups. The planner estimates per strategy how many abstracts it
+# will gain and how many queries it will cost, and runs the strategy with the
+# best yield per query first.
+#
+# The estimates are cheap: the subcategories and entities of the topic are
+# already known from its fingerprint, and the number of members of every
+# subcategory and of categories per entity are asked with COUNT-queries. The
+# yields of strategies 2 and 4 cannot be counted up front, so they are
+# estimated from the abstracts per query that the strategy reached on the
+# topics before. After every strategy the planner records the queries it
+# issued and the abstracts it gained, which are written to a cost report.
+
+
+import json
+import math
+from sparql_queries import BATCH_SIZES
+
+
+# Share of candidate entities that has a Dutch abstract, used until a
+# strategy has been measured.
+PRIOR_ABSTRACT_RATIO = 0.5
+
+# Abstracts per query of the strategies whose candidates cannot be counted,
+# used until the strategy has been measured.
+PRIOR_YIELD = {2: 0.05, 4: 0.5}
+
+STRATEGY_NUMBERS = (1, 2, 3, 4)
+
+
+def batches(size, batch_size):
+    """Returns the number of batches needed for size entities."""
+    return math.ceil(size / batch_size)
+
+
+class CrawlPlanner:
+    """Orders the strategies of every topic by their expected abstracts per
+    query and records what every strategy really cost."""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.totals = {number: {'queries': 0, 'abstracts': 0,
+                                'candidates': 0, 'candidate_abstracts': 0}
+                       for number in STRATEGY_NUMBERS}
+        self.planning_queries = 0
+        self.topics = {}
+
+    def abstract_ratio(self, number):
+        """Returns the measured share of candidates with an abstract."""
+        totals = self.totals[number]
+        if totals['candidates']:
+            return totals['candidate_abstracts'] / totals['candidates']
+        return PRIOR_ABSTRACT_RATIO
+
+    def yield_rate(self, number):
+        """Returns the measured abstracts per query of a strategy."""
+        totals = self.totals[number]
+        if totals['queries']:
+            return totals['abstracts'] / totals['queries']
+        return PRIOR_YIELD.get(number, PRIOR_ABSTRACT_RATIO)
+
+    def estimate(self, topic, need):
+        """Returns the estimated abstracts and queries of every strategy
+        for a topic that still needs the given number of abstracts."""
+        queries = self.engine.queries
+        broader = sorted(self.engine.collect('is_skos_broader_of',
+                                             [topic])[0])
+        members = sorted(self.engine.collect('is_subject_of', [topic])[0])
+        member_count = sum(self.engine.count('is_subject_of', broader))
+        subject_count = sum(self.engine.count('dct_subject', members))
+        self.planning_queries += self.engine.queries - queries
+
+        def windows(candidates):
+            return max(1, batches(min(candidates, need),
+                                  BATCH_SIZES['dbo_abstract']))
+
+        # Strategy 1 needs at least one abstract lookup for every
+        # subcategory it goes through before the topic is full.
+        per_category = member_count / len(broader) if broader else 0
+        categories = min(len(broader),
+                         math.ceil(need / per_category) if per_category else 0)
+        estimates = {
+            1: {'candidates': member_count,
+                'queries': (batches(len(broader),
+                                    BATCH_SIZES['is_subject_of']) +
+                            max(categories, windows(member_count)))},
+            2: {'candidates': None,
+                'queries': (batches(len(broader),
+                                    BATCH_SIZES['is_subject_of']) +
+                            len(broader) +
+                            batches(member_count,
+                                    BATCH_SIZES['is_skos_broader_of']))},
+            3: {'candidates': len(members),
+                'queries': windows(len(members))},
+            4: {'candidates': None,
+                'queries': (batches(len(members),
+                                    BATCH_SIZES['dct_subject']) +
+                            len(members) + windows(subject_count))},
+        }
+        for number, estimate in estimates.items():
+            if estimate['candidates'] is None:
+                abstracts = estimate['queries'] * self.yield_rate(number)
+            else:
+                abstracts = (estimate['candidates'] *
+                             self.abstract_ratio(number))
+            estimate['abstracts'] = min(need, abstracts)
+        return estimates
+
+    def plan(self, topic, need):
+        """Returns the strategy numbers for a topic, ordered by expected
+        abstracts per query. Ties keep the order of the cascade."""
+        estimates = self.estimate(topic, need)
+        order = sorted(STRATEGY_NUMBERS, key=lambda number: (
+            -estimates[number]['abstracts'] /
+            max(1, estimates[number]['queries']), number))
+        self.topics[topic] = {'order': order, 'estimates': estimates,
+                              'runs': {}}
+        return order
+
+    def record(self, topic, number, queries, abstracts, complete):
+        """Records the queries and abstracts of one strategy of a topic. A
+        strategy that did not stop early went through all its candidates,
+        so only then the share of candidates with an abstract is
+        measured."""
+        totals = self.totals[number]
+        totals['queries'] += queries
+        totals['abstracts'] += abstracts
+        topic_plan = self.topics.setdefault(topic, {'order': None,
+                                                    'estimates': {},
+                                                    'runs': {}})
+        topic_plan['runs'][number] = {'queries': queries,
+                                      'abstracts': abstracts}
+        candidates = topic_plan['estimates'].get(number, {}).get('candidates')
+        if complete and candidates is not None:
+            totals['candidates'] += candidates
+            totals['candidate_abstracts'] += abstracts
+
+    def report(self):
+        """Returns the cost report: the plan and the runs of every topic
+        and the totals per strategy."""
+        return {'topics': self.topics,
+                'totals': self.totals,
+                'planning_queries': self.planning_queries}
+
+
+def write_cost_report(report, file_name='crawl_cost_report.json'):
+    """Prints the totals of a cost report and writes it to a JSON file."""
+    print("{0:15}{1:15}{2:15}{3:15}\n".format('STRATEGY:', 'QUERIES:',
+                                              'ABSTRACTS:', 'PER QUERY:'))
+    for number, totals in sorted(report['totals'].items()):
+        rate = totals['abstracts'] / max(1, totals['queries'])
+        print("{0:<15}{1:<15}{2:<15}{3:<15.2f}".format(
+            number, totals['queries'], totals['abstracts'], rate))
+    print('\nPLANNING QUERIES: {0}'.format(report['planning_queries']))
+    with open(file_name, 'w') as file:
+        json.dump(report, file, indent=1, ensure_ascii=False)
+    print('COST REPORT WRITTEN TO {0}\n'.format(file_name))
@@ -0,0 +1,193 @@
+#!/usr/bin/python3
+# student: J.F.P. (Richard) Scholtens
+# studentnr.: s2956586
+# datum: 18/10/2026
+# Reads and writes the dataset as one JSON record per line instead of one
+# nested JSON file. Every line holds one abstract:
+#
+# {"topic": "Category:Science", "category": "Category:Physics",
+#  "entity": "Natuurkunde", "abstract": "Natuurkunde is ...", "strategy": 1}
+#
+# The strategy is the collection strategy of retrieve_information.py that
+# found the abstract, or null if it is not known. Because the records are
+# read and written one at a time, a stage never has to hold the whole
+# dictionary[topic][category][entity] = abstract tree in memory. Files that
+# end in .gz or .zst are compressed with gzip or zstandard. A crawl in
+# several languages writes one file per language.
+#
+# Usage: python3 dataset_records.py DATASET.json DATASET.jsonl.gz
+# converts a nested JSON file of an earlier crawl to records.
+
+
+import io
+import sys
+import gzip
+import json
+import hashlib
+
+
+FIELDS = ('topic', 'category', 'entity', 'abstract', 'strategy')
+
+
+def open_text(file_name, mode='r'):
+    """Opens a (compressed) text file for reading ('r') or writing ('w').
+    The compression is chosen by the extension of the file."""
+    if file_name.endswith('.gz'):
+        return gzip.open(file_name, mode + 't', encoding='utf-8')
+    if file_name.endswith('.zst'):
+        import zstandard
+        if mode == 'w':
+            stream = zstandard.ZstdCompressor().stream_writer(
+                open(file_name, 'wb'))
+        else:
+            stream = zstandard.ZstdDecompressor().stream_reader(
+                open(file_name, 'rb'))
+        return io.TextIOWrapper(stream, encoding='utf-8')
+    return open(file_name, mode, encoding='utf-8')
+
+
+def create_record(topic, category, entity, abstract, strategy=None):
+    """Returns the record of one abstract."""
+    return dict(zip(FIELDS, (topic, category, entity, abstract, strategy)))
+
+
+class RecordWriter:
+    """Writes records to a (compressed) file, one JSON record per line."""
+
+    def __init__(self, file_name):
+        self.file_name = file_name
+        self.file = open_text(file_name, 'w')
+        self.count = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def write(self, record):
+        self.file.write(json.dumps(record, ensure_ascii=False) + '\n')
+        self.count += 1
+
+    def write_all(self, records):
+        for record in records:
+            self.write(record)
+
+    def close(self):
+        self.file.close()
+
+
+def read_records(file_name):
+    """Yields the records of a (compressed) file one at a time."""
+    with open_text(file_name) as file:
+        for line in file:
+            if line.strip():
+                yield json.loads(line)
+
+
+def write_records(records, file_name):
+    """Writes records to a file and returns the number of records."""
+    with RecordWriter(file_name) as writer:
+        writer.write_all(records)
+    return writer.count
+
+
+def dataset_records(dictionary, sources=None):
+    """Yields the records of a dictionary with the architecture
+    dictionary[topic][category][entity] = abstract. The sources are the
+    strategies per (topic, category, entity), as kept by
+    crawl_checkpoint.CrawlState."""
+    sources = sources or {}
+    for topic, categories in dictionary.items():
+        for category, entities in categories.items():
+            for entity, abstract in entities.items():
+                yield create_record(topic, category, entity, abstract,
+                                    sources.get((topic, category, entity)))
+
+
+def write_dataset(dictionary, file_name, sources=None):
+    """Writes a nested dataset dictionary to a record file and returns the
+    number of records."""
+    count = write_records(dataset_records(dictionary, sources), file_name)
+    print('{0} RECORDS WRITTEN TO {1}\n'.format(count, file_name))
+    return count
+
+
+def language_records(records, translations, language):
+    """Yields the records of a dataset in another language: the abstract of
+    every record is replaced by the abstract of the entity in that
+    language. Entities without such an abstract are left out."""
+    for record in records:
+        abstracts = translations.get(record['entity'], {}).get(language)
+        if abstracts:
+            yield dict(record, abstract=sorted(abstracts)[0])
+
+
+def write_language_shards(dictionary, file_name, languages, translations,
+                          sources=None):
+    """Writes a dataset once per language. The file name holds {0} for the
+    language, for example dataset_{0}.jsonl.gz. The dataset itself is in the
+    first language, the translations table holds the abstracts of the other
+    languages per entity."""
+    write_dataset(dictionary, file_name.format(languages[0].upper()), sources)
+    for language in languages[1:]:
+        shard = file_name.format(language.upper())
+        count = write_records(language_records(
+            dataset_records(dictionary, sources), translations, language),
+            shard)
+        print('{0} RECORDS WRITTEN TO {1}\n'.format(count, shard))
+
+
+def read_dataset(file_name):
+    """Reads a record file back into a dictionary with the architecture
+    dictionary[topic][category][entity] = abstract, for the stages that
+    still need the whole tree."""
+    dictionary = {}
+    for record in read_records(file_name):
+        categories = dictionary.setdefault(record['topic'], {})
+        categories.setdefault(record['category'],
+                              {})[record['entity']] = record['abstract']
+    return dictionary
+
+
+def abstract_digest(abstract):
+    """Returns a short hash of an abstract, so abstracts can be grouped
+    without keeping their text in memory."""
+    return hashlib.sha1(abstract.encode('utf-8')).digest()
+
+
+def group_labels(file_name):
+    """First pass over a record file for multi-label data. Returns a
+    dictionary with the hash of every abstract as key and the list of its
+    topics as value."""
+    labels = {}
+    for record in read_records(file_name):
+        labels.setdefault(abstract_digest(record['abstract']),
+                          []).append(record['topic'])
+    return labels
+
+
+def iterate_multi_label(file_name, labels):
+    """Second pass over a record file for multi-label data. Yields every
+    distinct abstract once, at its first occurrence, together with the
+    list of its topics from group_labels."""
+    seen = set()
+    for record in read_records(file_name):
+        digest = abstract_digest(record['abstract'])
+        if digest not in seen:
+            seen.add(digest)
+            yield record['abstract'], labels[digest]
+
+
+def main():
+    if len(sys.argv) != 3:
+        print('USAGE: python3 dataset_records.py DATASET.json '
+              'DATASET.jsonl.gz')
+        sys.exit(1)
+    with open(sys.argv[1]) as file:
+        dictionary = json.load(file)
+    write_dataset(dictionary, sys.argv[2])
+
+
+if __name__ == '__main__':
+    main()
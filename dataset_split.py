@@ -0,0 +1,146 @@
+#!/usr/bin/python3
+# student: J.F.P. (Richard) Scholtens
+# studentnr.: s2956586
+# datum: 18/10/2026
+# Divides the abstracts over a training, development and test set. The
+# split is made per source abstract and not per line of a Flair file, so all
+# chunks of an abstract, and all records that share an abstract, end up in
+# the same set and no text of the test set is seen during training.
+#
+# Every abstract is assigned when it is seen for the first time, with
+# iterative stratification over its labels: the abstract goes to the set
+# that is furthest below its share of the rarest label of the abstract. The
+# hash of the abstract breaks ties, so the split does not depend on random
+# state. The assignments and the label counts per set are kept in a ledger
+# on disk. Splitting a grown dataset again keeps the old abstracts in their
+# set and only assigns the new ones.
+
+
+import sqlite3
+
+
+SPLITS = ('train', 'dev', 'test')
+
+# The share of the abstracts per set: 0.8 x 0.75 = 0.6 for training, as in
+# the two train_test_splits of pre-processing_and_baseline.py before.
+FRACTIONS = (0.6, 0.2, 0.2)
+
+
+def hash_split(digest, fractions=FRACTIONS):
+    """Returns the set of an abstract chosen by its hash alone."""
+    position = int.from_bytes(digest[:8], 'big') / 2 ** 64
+    for split, fraction in enumerate(fractions):
+        position -= fraction
+        if position < 0:
+            return split
+    return len(fractions) - 1
+
+
+class SplitLedger:
+    """Assigns abstracts, given by their hash (see
+    dataset_records.abstract_digest), to a set and remembers the assignment
+    on disk."""
+
+    def __init__(self, path='split_ledger.sqlite', fractions=FRACTIONS):
+        self.path = path
+        self.fractions = fractions
+        self.new = 0
+        self.connection = sqlite3.connect(path, timeout=60)
+        self.connection.execute("""CREATE TABLE IF NOT EXISTS splits (
+                                       digest BLOB PRIMARY KEY,
+                                       split INTEGER NOT NULL)""")
+        self.connection.execute("""CREATE TABLE IF NOT EXISTS label_counts (
+                                       label TEXT NOT NULL,
+                                       split INTEGER NOT NULL,
+                                       count INTEGER NOT NULL,
+                                       PRIMARY KEY (label, split))""")
+        self.counts = {}
+        for label, split, count in self.connection.execute(
+                'SELECT label, split, count FROM label_counts'):
+            self.counts.setdefault(label, [0] * len(SPLITS))[split] = count
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def choose(self, digest, labels):
+        """Returns the set for a new abstract with the given labels."""
+        preferred = hash_split(digest, self.fractions)
+        if not labels:
+            return preferred
+        for label in labels:
+            self.counts.setdefault(label, [0] * len(SPLITS))
+        rarest = min(labels, key=lambda label: (sum(self.counts[label]),
+                                                label))
+
+        def need(label, split):
+            total = sum(self.counts[label]) + 1
+            return self.fractions[split] * total - self.counts[label][split]
+
+        return max(range(len(SPLITS)), key=lambda split: (
+            round(need(rarest, split), 9),
+            round(sum(need(label, split) for label in labels), 9),
+            split == preferred, -split))
+
+    def assign(self, digest, labels):
+        """Returns the set (train, dev or test) of an abstract. An abstract
+        that is in the ledger keeps its set."""
+        row = self.connection.execute(
+            'SELECT split FROM splits WHERE digest = ?', (digest,)).fetchone()
+        if row is not None:
+            return SPLITS[row[0]]
+        labels = sorted(set(labels))
+        split = self.choose(digest, labels)
+        for label in labels:
+            self.counts[label][split] += 1
+        self.connection.execute(
+            'INSERT INTO splits (digest, split) VALUES (?, ?)',
+            (digest, split))
+        self.new += 1
+        if self.new % 10000 == 0:
+            self.save()
+        return SPLITS[split]
+
+    def save(self):
+        self.connection.executemany(
+            """INSERT OR REPLACE INTO label_counts (label, split, count)
+               VALUES (?, ?, ?)""",
+            [(label, split, count) for label, counts in self.counts.items()
+             for split, count in enumerate(counts)])
+        self.connection.commit()
+
+    def report(self):
+        """Prints the number of abstracts per label and set."""
+        print("{0:40}{1:>10}{2:>10}{3:>10}\n".format('LABEL:', *(
+            split.upper() + ':' for split in SPLITS)))
+        for label, counts in sorted(self.counts.items()):
+            print("{0:40}{1:>10}{2:>10}{3:>10}".format(label, *counts))
+        print('\nNEW ABSTRACTS ASSIGNED: {0}\n'.format(self.new))
+
+    def close(self):
+        self.save()
+        self.connection.close()
+
+
+def split_file_names(prefix):
+    """Returns the file names of the sets, for example flair_train.txt."""
+    return {split: '{0}_{1}.txt'.format(prefix, split) for split in SPLITS}
+
+
+def read_split(prefix):
+    """Reads the sets written with a prefix back and returns X_train,
+    Y_train, X_val, Y_val, X_test and Y_test, with the texts as X and the
+    labels as Y."""
+    data = []
+    for file_name in split_file_names(prefix).values():
+        X = []
+        Y = []
+        with open(file_name) as file:
+            for line in file:
+                label, text = line.split('\t', 1)
+                X.append(text)
+                Y.append(label)
+        data.extend((X, Y))
+    return data
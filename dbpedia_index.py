@@ -0,0 +1,344 @@
+#!/usr/bin/python3
+# student: J.F.P. (Richard) Scholtens
+# studentnr.: s2956586
+# datum: 18/10/2026
+# Builds a local graph index from DBpedia dump files so the collection
+# strategies in retrieve_information.py can run without the live endpoint.
+# The dumps (skos:broader, dct:subject and dbo:abstract) are streamed from
+# compressed N-Triples files; the Turtle dumps of DBpedia can be used as well
+# as long as every triple is written on one line. The index holds:
+#
+# - the names of all resources, sorted, so a name is found with a binary
+#   search and its position is its integer ID;
+# - CSR adjacency arrays (indptr and indices) for both directions of
+#   skos:broader and dct:subject;
+# - an offset table into one blob with all abstracts, which is memory-mapped.
+#
+# Usage: python3 dbpedia_index.py INDEX_DIRECTORY DUMP [DUMP ...]
+
+
+import io
+import os
+import re
+import sys
+import bz2
+import gzip
+import lzma
+import json
+import numpy as np
+from array import array
+from sparql_queries import RESOURCE, resource_value
+
+
+SKOS_BROADER = 'http://www.w3.org/2004/02/skos/core#broader'
+DCT_SUBJECT = 'http://purl.org/dc/terms/subject'
+DBO_ABSTRACT = 'http://dbpedia.org/ontology/abstract'
+
+ESCAPES = re.compile(r'\\(u[0-9A-Fa-f]{4}|U[0-9A-Fa-f]{8}|.)')
+ESCAPE_CHARACTERS = {'t': '\t', 'b': '\b', 'n': '\n', 'r': '\r', 'f': '\f',
+                     '"': '"', "'": "'", '\\': '\\'}
+
+# The kinds of sparql_queries.py and the adjacency arrays that answer them.
+RELATIONS = {'is_skos_broader_of': 'broader_in',
+             'dct_subject': 'subject_out',
+             'is_subject_of': 'subject_in'}
+
+
+def open_dump(file_name):
+    """Opens a (compressed) dump file as text. The compression is chosen by
+    the extension of the file."""
+    if file_name.endswith('.bz2'):
+        return bz2.open(file_name, 'rt', encoding='utf-8')
+    if file_name.endswith('.gz'):
+        return gzip.open(file_name, 'rt', encoding='utf-8')
+    if file_name.endswith('.xz'):
+        return lzma.open(file_name, 'rt', encoding='utf-8')
+    if file_name.endswith('.zst'):
+        import zstandard
+        stream = zstandard.ZstdDecompressor().stream_reader(
+            open(file_name, 'rb'))
+        return io.TextIOWrapper(stream, encoding='utf-8')
+    return open(file_name, encoding='utf-8')
+
+
+def unescape_literal(text):
+    """Replaces the escape sequences of an N-Triples literal."""
+    def replace(match):
+        escape = match.group(1)
+        if escape[0] in 'uU' and len(escape) > 1:
+            return chr(int(escape[1:], 16))
+        return ESCAPE_CHARACTERS.get(escape, escape)
+    return ESCAPES.sub(replace, text)
+
+
+def resource_name(iri, resource=RESOURCE):
+    """Returns the name of a DBpedia resource in the same way as the SPARQL
+    engine does, or None if the IRI is not a resource of the given
+    namespace. The names of the index and of a live crawl are then the same,
+    so checkpoints and memos of one can be used by the other."""
+    if not iri.startswith(resource):
+        return None
+    return resource_value(iri)
+
+
+def parse_triple(line):
+    """Parses one line of an N-Triples file. Returns the subject, the
+    predicate and the object, or None for comments, prefixes and lines that
+    cannot be parsed. An IRI object is returned as a string, a literal as a
+    tuple with its text and language tag."""
+    if not line.startswith('<'):
+        return None
+    parts = line.rstrip().split(None, 2)
+    if len(parts) < 3 or not parts[1].startswith('<'):
+        return None
+    subject, predicate, rest = parts
+    rest = rest[:-1].rstrip() if rest.endswith('.') else rest
+    if rest.startswith('<'):
+        obj = rest[1:rest.index('>')]
+    elif rest.startswith('"'):
+        end = rest.rindex('"')
+        language = rest[end + 2:] if rest[end + 1:end + 2] == '@' else None
+        obj = (unescape_literal(rest[1:end]), language)
+    else:
+        return None
+    return subject[1:-1], predicate[1:-1], obj
+
+
+def build_csr(sources, targets, nodes):
+    """Builds CSR adjacency arrays for the edges from sources to targets.
+    Returns the indptr and the indices array."""
+    order = np.lexsort((targets, sources))
+    indices = targets[order].astype(np.int32)
+    counts = np.bincount(sources, minlength=nodes)
+    indptr = np.zeros(nodes + 1, dtype=np.int64)
+    np.cumsum(counts, out=indptr[1:])
+    return indptr, indices
+
+
+def build_index(index_path, dump_files, language='nl', resource=RESOURCE):
+    """Streams the dump files and writes the index to the index directory.
+    Only abstracts in the given language are kept, and only resources of
+    the namespace the SPARQL engine asks for (see sparql_queries.py)."""
+    os.makedirs(index_path, exist_ok=True)
+    ids = {}
+    broader = (array('i'), array('i'))
+    subject = (array('i'), array('i'))
+    abstract_ids = array('i')
+    abstract_spans = array('q')
+    triples = 0
+
+    def intern(name):
+        node = ids.get(name)
+        if node is None:
+            node = ids[name] = len(ids)
+        return node
+
+    with open(os.path.join(index_path, 'abstracts.bin'), 'wb') as blob:
+        position = 0
+        for file_name in dump_files:
+            print('READING: {0}'.format(file_name))
+            with open_dump(file_name) as dump:
+                for line in dump:
+                    triple = parse_triple(line)
+                    if triple is None:
+                        continue
+                    subject_iri, predicate, obj = triple
+                    name = resource_name(subject_iri, resource)
+                    if name is None:
+                        continue
+                    if predicate == DBO_ABSTRACT:
+                        if isinstance(obj, tuple) and obj[1] == language:
+                            data = obj[0].encode('utf-8')
+                            blob.write(data)
+                            abstract_ids.append(intern(name))
+                            abstract_spans.extend((position,
+                                                   position + len(data)))
+                            position += len(data)
+                            triples += 1
+                    elif predicate in (SKOS_BROADER, DCT_SUBJECT):
+                        if isinstance(obj, tuple):
+                            continue
+                        target = resource_name(obj, resource)
+                        if target is None:
+                            continue
+                        edges = broader if predicate == SKOS_BROADER \
+                            else subject
+                        edges[0].append(intern(name))
+                        edges[1].append(intern(target))
+                        triples += 1
+    print('TRIPLES: {0}'.format(triples))
+    print('RESOURCES: {0}\n'.format(len(ids)))
+
+    # Give every resource the position of its name in sorted order as ID.
+    names = sorted(ids)
+    remap = np.empty(len(ids), dtype=np.int32)
+    for rank, name in enumerate(names):
+        remap[ids[name]] = rank
+    nodes = len(names)
+    del ids
+
+    encoded = [name.encode('utf-8') for name in names]
+    name_offsets = np.zeros(nodes + 1, dtype=np.int64)
+    np.cumsum([len(name) for name in encoded], out=name_offsets[1:])
+    with open(os.path.join(index_path, 'names.bin'), 'wb') as file:
+        file.write(b''.join(encoded))
+    np.save(os.path.join(index_path, 'names.npy'), name_offsets)
+
+    for relation, (sources, targets) in (('broader', broader),
+                                         ('subject', subject)):
+        sources = remap[np.frombuffer(sources, dtype=np.int32)]
+        targets = remap[np.frombuffer(targets, dtype=np.int32)]
+        for direction, arrays in (('out', build_csr(sources, targets, nodes)),
+                                  ('in', build_csr(targets, sources, nodes))):
+            indptr, indices = arrays
+            prefix = os.path.join(index_path,
+                                  '{0}_{1}'.format(relation, direction))
+            np.save(prefix + '_indptr.npy', indptr)
+            np.save(prefix + '_indices.npy', indices)
+
+    owners = remap[np.frombuffer(abstract_ids, dtype=np.int32)]
+    spans = np.frombuffer(abstract_spans, dtype=np.int64).reshape(-1, 2)
+    order = np.argsort(owners, kind='stable')
+    indptr = np.zeros(nodes + 1, dtype=np.int64)
+    np.cumsum(np.bincount(owners, minlength=nodes), out=indptr[1:])
+    np.save(os.path.join(index_path, 'abstracts_indptr.npy'), indptr)
+    np.save(os.path.join(index_path, 'abstracts_spans.npy'), spans[order])
+
+    with open(os.path.join(index_path, 'meta.json'), 'w') as file:
+        json.dump({'resources': nodes,
+                   'triples': triples,
+                   'language': language,
+                   'dumps': [os.path.basename(name) for name in dump_files]},
+                  file)
+
+
+class DBpediaIndex:
+    """Reads an index built by build_index. All arrays are memory-mapped.
+    The collect method answers the same kinds of lookups as the SPARQL
+    engine, so the index can be given to the collection strategies as
+    engine."""
+
+    def __init__(self, index_path):
+        self.index_path = index_path
+        with open(os.path.join(index_path, 'meta.json')) as file:
+            self.meta = json.load(file)
+        self.names = self._memmap('names.bin')
+        self.name_offsets = self._load('names.npy')
+        self.arrays = {}
+        for relation in ('broader', 'subject'):
+            for direction in ('out', 'in'):
+                prefix = '{0}_{1}'.format(relation, direction)
+                self.arrays[prefix] = (self._load(prefix + '_indptr.npy'),
+                                       self._load(prefix + '_indices.npy'))
+        self.abstracts = self._memmap('abstracts.bin')
+        self.abstract_indptr = self._load('abstracts_indptr.npy')
+        self.abstract_spans = self._load('abstracts_spans.npy')
+        self.queries = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _memmap(self, file_name):
+        """Memory-maps a blob. An empty blob cannot be mapped, so an empty
+        array is returned instead."""
+        path = os.path.join(self.index_path, file_name)
+        if os.path.getsize(path) == 0:
+            return np.zeros(0, dtype=np.uint8)
+        return np.memmap(path, dtype=np.uint8, mode='r')
+
+    def _load(self, file_name):
+        return np.load(os.path.join(self.index_path, file_name),
+                       mmap_mode='r')
+
+    def __len__(self):
+        return len(self.name_offsets) - 1
+
+    def name(self, node):
+        """Returns the name of the resource with the given ID."""
+        start, end = self.name_offsets[node], self.name_offsets[node + 1]
+        return bytes(self.names[start:end]).decode('utf-8')
+
+    def node_id(self, name):
+        """Returns the ID of a resource with a binary search over the sorted
+        names, or None if the resource is not in the index."""
+        key = name.encode('utf-8')
+        low, high = 0, len(self)
+        while low < high:
+            middle = (low + high) // 2
+            start = self.name_offsets[middle]
+            end = self.name_offsets[middle + 1]
+            if bytes(self.names[start:end]) < key:
+                low = middle + 1
+            else:
+                high = middle
+        if low < len(self) and self.name(low) == name:
+            return low
+        return None
+
+    def neighbours(self, relation, node):
+        """Returns the IDs connected to a node. The relation is one of
+        broader_out, broader_in, subject_out and subject_in."""
+        indptr, indices = self.arrays[relation]
+        return indices[indptr[node]:indptr[node + 1]]
+
+    def abstracts_of(self, node):
+        """Returns the abstracts of the resource with the given ID."""
+        abstracts = []
+        start, end = self.abstract_indptr[node], self.abstract_indptr[node + 1]
+        for first, last in self.abstract_spans[start:end]:
+            abstracts.append(bytes(self.abstracts[first:last]).decode('utf-8'))
+        return abstracts
+
+    def collect(self, kind, entities):
+        """Collects one property for every entity and returns a list of
+        value sets in the same order as the entities. The kinds are the same
+        as in sparql_queries.py."""
+        self.queries += 1
+        values = []
+        for entity in entities:
+            node = self.node_id(entity)
+            if node is None:
+                values.append(set())
+            elif kind == 'dbo_abstract':
+                values.append(set(self.abstracts_of(node)))
+            else:
+                values.append({self.name(neighbour) for neighbour in
+                               self.neighbours(RELATIONS[kind], node)})
+        return values
+
+    def collect_languages(self, entities, languages):
+        """Returns the abstracts of every entity per language, like the
+        SPARQL engine. The index only holds the abstracts of the language it
+        was built with, so the other languages stay empty."""
+        abstracts = self.collect('dbo_abstract', entities)
+        return [{language: (values if language == self.meta['language']
+                            else set()) for language in languages}
+                for values in abstracts]
+
+    def count(self, kind, entities):
+        """Returns the number of values of one property for every entity."""
+        return [len(values) for values in self.collect(kind, entities)]
+
+    def stream(self, kind, entity, page_size=None):
+        """Yields the values of one property of an entity in sorted order,
+        like the stream of the SPARQL engine. The index is never cut off, so
+        the values are not read in pages."""
+        yield from sorted(self.collect(kind, [entity])[0])
+
+    def close(self):
+        pass
+
+
+def main():
+    if len(sys.argv) < 3:
+        print('USAGE: python3 dbpedia_index.py INDEX_DIRECTORY DUMP '
+              '[DUMP ...]')
+        sys.exit(1)
+    build_index(sys.argv[1], sys.argv[2:])
+
+
+if __name__ == '__main__':
+    main()
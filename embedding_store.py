@@ -0,0 +1,158 @@
+#!/usr/bin/python3
+# student: J.F.P. (Richard) Scholtens
+# studentnr.: s2956586
+# datum: 18/10/2026
+# A persistent store for the embeddings of the Flair input texts. Every
+# training run of training_evaluation.ipynb embedded the whole corpus again
+# with BERTje. The embeddings of a text only depend on the text and the
+# embedding model, so they are computed once (see stored_embeddings.py) and
+# kept on disk: the vectors as float16 in one flat file that is read as a
+# memory map, and an SQLite index from the hash of a text to its rows. A
+# text has one row per token, or one row if the tokens were pooled.
+#
+# Every embedding model and pooling gets a directory of its own:
+#
+# embedding_store/wietsedv_bert-base-dutch-cased_tokens/vectors.f16
+# embedding_store/wietsedv_bert-base-dutch-cased_tokens/index.sqlite
+
+
+import os
+import re
+import hashlib
+import sqlite3
+import numpy as np
+
+
+def text_key(text):
+    """Returns the hash of a text, the key of its embeddings."""
+    return hashlib.sha1(text.encode('utf-8')).digest()
+
+
+def store_name(model_name, pooling):
+    """Returns the directory name of the embeddings of a model."""
+    return re.sub(r"[^\w.-]+", '_', model_name) + '_' + pooling
+
+
+class EmbeddingStore:
+    """Stores the embeddings of texts of one embedding model. The pooling
+    is 'tokens' for one vector per token or 'mean' for one vector per text.
+    The dimension is taken from the first embeddings that are stored."""
+
+    def __init__(self, directory, model_name, pooling='tokens'):
+        self.directory = directory
+        self.model_name = model_name
+        self.pooling = pooling
+        self.path = os.path.join(directory, store_name(model_name, pooling))
+        os.makedirs(self.path, exist_ok=True)
+        self.vectors_path = os.path.join(self.path, 'vectors.f16')
+        self.connection = sqlite3.connect(
+            os.path.join(self.path, 'index.sqlite'), timeout=60)
+        self.connection.execute("""CREATE TABLE IF NOT EXISTS entries (
+                                       key BLOB PRIMARY KEY,
+                                       start INTEGER NOT NULL,
+                                       length INTEGER NOT NULL)""")
+        self.connection.execute("""CREATE TABLE IF NOT EXISTS meta (
+                                       name TEXT PRIMARY KEY,
+                                       value TEXT NOT NULL)""")
+        meta = dict(self.connection.execute('SELECT name, value FROM meta'))
+        self.dim = int(meta['dim']) if 'dim' in meta else None
+        self.rows = int(meta.get('rows', 0))
+        self.writer = None
+        self.vectors = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __getstate__(self):
+        # A Flair model that uses the store is saved with torch.save; the
+        # store is opened again from its directory when the model is loaded.
+        return {'directory': self.directory, 'model_name': self.model_name,
+                'pooling': self.pooling}
+
+    def __setstate__(self, state):
+        self.__init__(**state)
+
+    def __contains__(self, text):
+        return self.connection.execute(
+            'SELECT 1 FROM entries WHERE key = ?',
+            (text_key(text),)).fetchone() is not None
+
+    def __len__(self):
+        return self.connection.execute(
+            'SELECT COUNT(*) FROM entries').fetchone()[0]
+
+    def put(self, text, vectors):
+        """Stores the embeddings of a text: a matrix with one row per token,
+        or one row for pooled embeddings."""
+        vectors = np.asarray(vectors, dtype=np.float16)
+        if self.dim is None:
+            self.dim = vectors.shape[1]
+            self.connection.execute(
+                "INSERT OR REPLACE INTO meta VALUES ('dim', ?)",
+                (str(self.dim),))
+        if vectors.shape[1] != self.dim:
+            raise ValueError('EMBEDDINGS OF {0} DIMENSIONS IN A STORE OF {1}'
+                             .format(vectors.shape[1], self.dim))
+        if self.writer is None:
+            self.writer = open(self.vectors_path, 'ab')
+            self.writer.truncate(self.rows * self.dim * 2)
+        self.writer.write(np.ascontiguousarray(vectors).tobytes())
+        self.connection.execute(
+            'INSERT OR REPLACE INTO entries (key, start, length) '
+            'VALUES (?, ?, ?)', (text_key(text), self.rows, len(vectors)))
+        self.rows += len(vectors)
+
+    def commit(self):
+        """Writes the stored vectors and the index to disk. Vectors that
+        were written without commit are overwritten by the next put."""
+        if self.writer is not None:
+            self.writer.flush()
+        self.connection.execute(
+            "INSERT OR REPLACE INTO meta VALUES ('rows', ?)",
+            (str(self.rows),))
+        self.connection.commit()
+
+    def matrix(self):
+        """Returns all vectors as a read-only memory map."""
+        if self.vectors is None or len(self.vectors) < self.rows:
+            if self.writer is not None:
+                self.writer.flush()
+            if not self.rows:
+                return np.zeros((0, self.dim or 0), dtype=np.float16)
+            self.vectors = np.memmap(self.vectors_path, dtype=np.float16,
+                                     mode='r', shape=(self.rows, self.dim))
+        return self.vectors
+
+    def get(self, text):
+        """Returns the embeddings of a text as float16 matrix, or None if
+        the text is not in the store."""
+        row = self.connection.execute(
+            'SELECT start, length FROM entries WHERE key = ?',
+            (text_key(text),)).fetchone()
+        if row is None:
+            return None
+        start, length = row
+        return self.matrix()[start:start + length]
+
+    def pooled(self, texts):
+        """Returns one float32 vector per text, the mean of its token
+        vectors, for example to train a classifier from scikit-learn."""
+        result = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for i, text in enumerate(texts):
+            vectors = self.get(text)
+            if vectors is None:
+                raise KeyError('TEXT NOT IN EMBEDDING STORE: {0}'.format(
+                    text[:50]))
+            if len(vectors):
+                result[i] = vectors.astype(np.float32).mean(axis=0)
+        return result
+
+    def close(self):
+        self.commit()
+        if self.writer is not None:
+            self.writer.close()
+        self.vectors = None
+        self.connection.close()
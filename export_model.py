@@ -0,0 +1,256 @@
+#!/usr/bin/python3
+# student: J.F.P. (Richard) Scholtens
+# studentnr.: s2956586
+# datum: 18/10/2026
+# Exports a trained Flair TextClassifier (TransformerWordEmbeddings inside
+# DocumentRNNEmbeddings, as trained in training_evaluation.ipynb) to a model
+# that runs on CPU without Flair. The transformer, the word pooling, the
+# bidirectional LSTM and the decoder are rebuilt as one plain PyTorch module,
+# the Linear and LSTM layers are quantized dynamically to int8, and the
+# module is saved with TorchScript. Together with the tokenizer and the
+# labels this makes a directory that mtc_runtime.py loads with PyTorch and
+# the tokenizers library only.
+#
+# The LSTM of Flair runs over packed sequences. Here every direction runs as
+# a separate LSTM and the backward direction reads every sentence reversed
+# within its own length, so padded batches give the same result.
+#
+# The benchmark compares the exported model with the Flair model on the gold
+# standard: the time per sentence, the sentences per second and the change
+# of the scores and probabilities.
+#
+# Usage: python3 export_model.py MODEL.pt EXPORT_DIRECTORY [GOLD_STANDARD.txt]
+
+
+import os
+import sys
+import json
+import time
+import numpy as np
+import torch
+from flair.models import TextClassifier
+from transformers import AutoTokenizer
+from flair_inference import read_gold_standard, predict_probabilities
+from mtc_runtime import MTCModel
+from multilabel_metrics import label_matrix, evaluate, predict
+
+
+def reverse_within_length(sequences, lengths):
+    """Reverses every sequence of a padded batch (batch, time, features)
+    within its own length; the padding stays at the end."""
+    steps = torch.arange(sequences.shape[1]).unsqueeze(0)
+    index = torch.where(steps < lengths.unsqueeze(1),
+                        lengths.unsqueeze(1) - 1 - steps, steps)
+    return sequences.gather(1, index.unsqueeze(2).expand_as(sequences))
+
+
+def split_lstm(lstm):
+    """Splits a (bidirectional) Flair LSTM into one single-layer LSTM per
+    layer and direction with the same weights."""
+    directions = 2 if lstm.bidirectional else 1
+    layers = []
+    for layer in range(lstm.num_layers):
+        parts = []
+        for direction in range(directions):
+            suffix = '_l{0}{1}'.format(layer, '_reverse' if direction else '')
+            input_size = (lstm.input_size if layer == 0 else
+                          lstm.hidden_size * directions)
+            part = torch.nn.LSTM(input_size, lstm.hidden_size,
+                                 batch_first=True)
+            for name in ('weight_ih', 'weight_hh', 'bias_ih', 'bias_hh'):
+                if hasattr(lstm, name + suffix):
+                    getattr(part, name + '_l0').data.copy_(
+                        getattr(lstm, name + suffix).data)
+            parts.append(part)
+        layers.append(torch.nn.ModuleList(parts))
+    return torch.nn.ModuleList(layers)
+
+
+class ExportedClassifier(torch.nn.Module):
+    """The embedding, LSTM and decoder of a Flair TextClassifier as one
+    module. The inputs are the subword ids and attention mask of the
+    transformer, the weights that pool the subwords of every word (batch,
+    parts, words, subwords) and the number of words per sentence. The output
+    is the probability of every label."""
+
+    def __init__(self, classifier):
+        super().__init__()
+        document = classifier.document_embeddings
+        word = document.embeddings.embeddings[0]
+        self.transformer = word.model
+        if getattr(word, 'use_scalar_mix', False):
+            raise ValueError('SCALAR MIX OF LAYERS CANNOT BE EXPORTED')
+        self.layers = [int(layer) for layer in word.layer_indexes]
+        self.layer_mean = bool(getattr(word, 'layer_mean', False))
+        self.reproject = (document.word_reprojection_map
+                          if getattr(document, 'reproject_words', False)
+                          else torch.nn.Identity())
+        self.lstm = split_lstm(document.rnn)
+        self.bidirectional = document.rnn.bidirectional
+        self.decoder = classifier.decoder
+        self.multi_label = bool(classifier.multi_label)
+
+    def forward(self, input_ids, attention_mask, word_weights, lengths):
+        hidden_states = self.transformer(input_ids,
+                                         attention_mask=attention_mask)[-1]
+        layers = [hidden_states[layer] for layer in self.layers]
+        if self.layer_mean:
+            hidden = torch.stack(layers).mean(dim=0)
+        else:
+            hidden = torch.cat(layers, dim=2)
+        words = torch.einsum('bpws,bsh->bwph', word_weights, hidden)
+        words = words.reshape(words.shape[0], words.shape[1], -1)
+        outputs = self.reproject(words)
+        for layer in self.lstm:
+            forward_output, _ = layer[0](outputs)
+            if self.bidirectional:
+                backward_output, _ = layer[1](
+                    reverse_within_length(outputs, lengths))
+                backward_output = reverse_within_length(backward_output,
+                                                        lengths)
+                outputs = torch.cat([forward_output, backward_output], dim=2)
+            else:
+                outputs = forward_output
+        # Flair takes the output of the last word, and for a bidirectional
+        # LSTM also of the first word, as embedding of the sentence.
+        batch = torch.arange(outputs.shape[0])
+        embedding = outputs[batch, lengths - 1]
+        if self.bidirectional:
+            embedding = torch.cat([outputs[:, 0], embedding], dim=1)
+        scores = self.decoder(embedding)
+        if self.multi_label:
+            return torch.sigmoid(scores)
+        return torch.softmax(scores, dim=1)
+
+
+def export(classifier, directory, quantize=True, tokenizer_name=None):
+    """Writes the exported model, its tokenizer and its settings to a
+    directory and returns the directory."""
+    os.makedirs(directory, exist_ok=True)
+    word = classifier.document_embeddings.embeddings.embeddings[0]
+    tokenizer_name = tokenizer_name or word.name
+    # The traced transformer returns tuples with all hidden states; the
+    # settings of the Flair model are put back after tracing.
+    config = word.model.config
+    changed = {'output_hidden_states': True, 'torchscript': True,
+               'return_dict': False}
+    original = {name: getattr(config, name) for name in changed
+                if hasattr(config, name)}
+    pooling = getattr(word, 'pooling_operation',
+                      getattr(word, 'subtoken_pooling', 'first'))
+    tokenizer = AutoTokenizer.from_pretrained(tokenizer_name, use_fast=True)
+    tokenizer.backend_tokenizer.save(os.path.join(directory,
+                                                  'tokenizer.json'))
+    settings = {'labels': classifier.label_dictionary.get_items(),
+                'multi_label': bool(classifier.multi_label),
+                'pooling': pooling,
+                'max_length': min(512, tokenizer.model_max_length),
+                'quantized': quantize,
+                'source': tokenizer_name}
+    with open(os.path.join(directory, 'settings.json'), 'w') as file:
+        json.dump(settings, file, indent=1, ensure_ascii=False)
+
+    runtime = MTCModel(None, tokenizer_file=os.path.join(directory,
+                                                         'tokenizer.json'),
+                       settings=settings)
+    example = runtime.encode(['Dit is een voorbeeld van een zin .',
+                              'Nog een zin'])
+    for name, value in changed.items():
+        setattr(config, name, value)
+    try:
+        model = ExportedClassifier(classifier).eval()
+        if quantize:
+            model = torch.quantization.quantize_dynamic(
+                model, {torch.nn.Linear, torch.nn.LSTM}, dtype=torch.qint8)
+        with torch.no_grad():
+            traced = torch.jit.trace(model, example, check_trace=False)
+    finally:
+        for name in changed:
+            if name in original:
+                setattr(config, name, original[name])
+            else:
+                delattr(config, name)
+    traced.save(os.path.join(directory, 'model.pt'))
+    print('MODEL EXPORTED TO {0}\n'.format(directory))
+    return directory
+
+
+def time_predictions(function, texts, repeats=3):
+    """Returns the probabilities of a predict function and the best time
+    in seconds over a number of runs."""
+    best = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        probabilities = function(texts)
+        seconds = time.perf_counter() - start
+        best = seconds if best is None else min(best, seconds)
+    return probabilities, best
+
+
+def benchmark(classifier, runtime, file_name, threshold=0.5, batch_size=32,
+              report_name='export_benchmark.json'):
+    """Compares the Flair model with the exported model on the gold
+    standard and prints and returns the time per sentence, the sentences
+    per second and the scores of both models."""
+    items = read_gold_standard(file_name)
+    texts = list(dict.fromkeys(sentence for sentence, _, _ in items))
+    labels = runtime.labels
+    rows = {text: row for row, text in enumerate(texts)}
+    Y_true = label_matrix([answer for _, _, answer in items], labels)
+    order = [rows[sentence] for sentence, _, _ in items]
+
+    results = {}
+    for name, function in (
+            ('FLAIR FP32', lambda texts: predict_probabilities(
+                classifier, texts, labels, batch_size)),
+            ('EXPORTED', lambda texts: runtime.predict_proba(
+                texts, batch_size))):
+        probabilities, seconds = time_predictions(function, texts)
+        scores = evaluate(Y_true, predict(probabilities[order], threshold))
+        results[name] = {'seconds': seconds,
+                         'ms_per_sentence': 1000 * seconds / len(texts),
+                         'sentences_per_second': len(texts) / seconds,
+                         'micro_f1': float(scores['micro_f1']),
+                         'macro_f1': float(scores['macro_f1']),
+                         'subset_accuracy': float(scores['subset_accuracy'])}
+        results[name]['probabilities'] = probabilities
+    difference = np.abs(results['FLAIR FP32'].pop('probabilities') -
+                        results['EXPORTED'].pop('probabilities'))
+    results['drift'] = {'max_probability_difference': float(difference.max()),
+                        'mean_probability_difference':
+                            float(difference.mean())}
+
+    print("{0:15}{1:>15}{2:>15}{3:>12}{4:>12}{5:>12}\n".format(
+        'MODEL:', 'MS/SENTENCE:', 'SENTENCES/S:', 'MICRO F1:', 'MACRO F1:',
+        'ACCURACY:'))
+    for name in ('FLAIR FP32', 'EXPORTED'):
+        result = results[name]
+        print("{0:15}{1:>15.2f}{2:>15.1f}{3:>12.4f}{4:>12.4f}{5:>12.4f}"
+              .format(name, result['ms_per_sentence'],
+                      result['sentences_per_second'], result['micro_f1'],
+                      result['macro_f1'], result['subset_accuracy']))
+    print('\nSPEED-UP: {0:.2f}'.format(results['FLAIR FP32']['seconds'] /
+                                       results['EXPORTED']['seconds']))
+    print('MAX PROBABILITY DIFFERENCE: {0:.4f}'.format(
+        results['drift']['max_probability_difference']))
+    with open(report_name, 'w') as file:
+        json.dump(results, file, indent=1)
+    print('BENCHMARK WRITTEN TO {0}\n'.format(report_name))
+    return results
+
+
+def main():
+    if len(sys.argv) not in (3, 4):
+        print('USAGE: python3 export_model.py MODEL.pt EXPORT_DIRECTORY '
+              '[GOLD_STANDARD.txt]')
+        sys.exit(1)
+    gold_standard = 'MISC_sentences_100_gold_standard_union.txt'
+    if len(sys.argv) == 4:
+        gold_standard = sys.argv[3]
+    classifier = TextClassifier.load(sys.argv[1]).eval()
+    export(classifier, sys.argv[2])
+    benchmark(classifier, MTCModel(sys.argv[2]), gold_standard)
+
+
+if __name__ == '__main__':
+    main()
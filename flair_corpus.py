@@ -0,0 +1,261 @@
+#!/usr/bin/python3
+# student: J.F.P. (Richard) Scholtens
+# studentnr.: s2956586
+# datum: 18/10/2026
+# Reads the Flair files (__label__X TAB TEXT per line) without loading them
+# into memory. The first time a file is read an index is built and stored
+# in corpus_index: the byte offsets where every line starts and ends and the
+# labels of every line as a bitset, one bit per label. These are NumPy files
+# that are opened as memory maps, and the file itself is read as a memory map
+# as well, so opening a file takes the same time and memory however large it
+# is. The index is built again when the file changes. The bitsets of a file
+# have a column per label of that file, so the columns of different files
+# are not the same; compare labels by name.
+#
+# FlairFile gives the lines by position, as stream or in batches, and the
+# labels of all lines as a matrix without reading the texts, for the
+# baselines and the statistics. FlairSentences turns the lines into Flair
+# sentences, so flair_corpus can take the place of ClassificationCorpus.
+#
+# Usage: python3 flair_corpus.py [FILE.txt ...]
+
+
+import os
+import sys
+import json
+import mmap
+import array
+import inspect
+import hashlib
+import numpy as np
+from dataset_split import split_file_names
+
+
+LABEL_PREFIX = '__label__'
+
+# Changes when the files of an index change, so old indexes are built again.
+INDEX_VERSION = 2
+
+
+def index_key(file_name):
+    """Returns a key that changes when the file changes."""
+    status = os.stat(file_name)
+    settings = json.dumps([os.path.abspath(file_name), status.st_size,
+                           status.st_mtime_ns, INDEX_VERSION])
+    return hashlib.sha1(settings.encode('utf-8')).hexdigest()[:16]
+
+
+def build_index(file_name, path):
+    """Reads a Flair file once and writes the start and end offsets of its
+    lines, the bitsets of their labels and the labels to a directory. Lines
+    without tab, such as empty lines, are left out, as Flair does."""
+    starts = array.array('q')
+    ends = array.array('q')
+    rows = array.array('I')
+    ids = array.array('I')
+    labels = {}
+    position = 0
+    with open(file_name, 'rb') as file:
+        for line in file:
+            tab = line.find(b'\t')
+            if tab != -1:
+                for label in line[:tab].decode('utf-8').split():
+                    rows.append(len(starts))
+                    ids.append(labels.setdefault(label, len(labels)))
+                starts.append(position)
+                ends.append(position + len(line))
+            position += len(line)
+
+    # The labels of this file are numbered in sorted order. Files with other
+    # labels, such as a dev file without some label, get other columns.
+    names = sorted(labels)
+    order = np.zeros(len(names), dtype=np.int64)
+    for column, name in enumerate(names):
+        order[labels[name]] = column
+    columns = order[np.frombuffer(ids, dtype=np.uint32).astype(np.int64)]
+    rows = np.frombuffer(rows, dtype=np.uint32).astype(np.int64)
+    bitsets = np.zeros((len(starts), (len(names) + 7) // 8),
+                       dtype=np.uint8)
+    np.bitwise_or.at(bitsets, (rows, columns // 8),
+                     (1 << (columns % 8)).astype(np.uint8))
+
+    temporary = path + '.tmp'
+    os.makedirs(temporary, exist_ok=True)
+    np.save(os.path.join(temporary, 'starts.npy'),
+            np.frombuffer(starts, dtype=np.int64))
+    np.save(os.path.join(temporary, 'ends.npy'),
+            np.frombuffer(ends, dtype=np.int64))
+    np.save(os.path.join(temporary, 'bitsets.npy'), bitsets)
+    with open(os.path.join(temporary, 'labels.json'), 'w') as file:
+        json.dump(names, file, ensure_ascii=False)
+    os.replace(temporary, path)
+
+
+class FlairFile:
+    """A Flair file read through its index. A line is returned as a list
+    of its labels and its text."""
+
+    def __init__(self, file_name, index_dir='corpus_index'):
+        self.file_name = file_name
+        self.index_dir = index_dir
+        path = os.path.join(index_dir, '{0}_{1}'.format(
+            os.path.basename(file_name), index_key(file_name)))
+        if not os.path.exists(path):
+            os.makedirs(index_dir, exist_ok=True)
+            build_index(file_name, path)
+        self.starts = np.load(os.path.join(path, 'starts.npy'),
+                              mmap_mode='r')
+        self.ends = np.load(os.path.join(path, 'ends.npy'), mmap_mode='r')
+        self.bitsets = np.load(os.path.join(path, 'bitsets.npy'),
+                               mmap_mode='r')
+        with open(os.path.join(path, 'labels.json')) as file:
+            self.labels = json.load(file)
+        self.file = open(file_name, 'rb')
+        self.size = os.fstat(self.file.fileno()).st_size
+        # An empty file cannot be mapped.
+        self.data = (mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+                     if self.size else b'')
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __getstate__(self):
+        # A DataLoader with workers sends the dataset to other processes;
+        # the file and the index are opened again there.
+        return {'file_name': self.file_name, 'index_dir': self.index_dir}
+
+    def __setstate__(self, state):
+        self.__init__(**state)
+
+    def __len__(self):
+        return len(self.starts)
+
+    def line(self, position):
+        """Returns the label field and the text of a line."""
+        if position < 0:
+            position += len(self)
+        if not 0 <= position < len(self):
+            raise IndexError('LINE {0} NOT IN {1}'.format(position,
+                                                          self.file_name))
+        line = self.data[self.starts[position]:self.ends[position]]
+        field, text = line.rstrip(b'\r\n').split(b'\t', 1)
+        return field.decode('utf-8'), text.decode('utf-8')
+
+    def __getitem__(self, position):
+        field, text = self.line(position)
+        return field.split(), text
+
+    def __iter__(self):
+        for position in range(len(self)):
+            yield self[position]
+
+    def text(self, position):
+        return self.line(position)[1]
+
+    def label_ids(self, position):
+        """Returns the columns of the labels of a line."""
+        return np.flatnonzero(np.unpackbits(
+            self.bitsets[position], count=len(self.labels),
+            bitorder='little'))
+
+    def label_matrix(self, positions=None):
+        """Returns a boolean matrix with a row per line (all lines or the
+        given positions) and a column per label, in the order of labels.
+        The columns belong to this file only; to compare files, match the
+        columns by their names in labels."""
+        bitsets = (self.bitsets if positions is None
+                   else self.bitsets[np.asarray(positions)])
+        return np.unpackbits(bitsets, axis=1, count=len(self.labels),
+                             bitorder='little').astype(bool)
+
+    def label_counts(self, batch_size=100000):
+        """Returns the number of lines of every label, reading the bitsets
+        in batches."""
+        counts = np.zeros(len(self.labels), dtype=np.int64)
+        for start in range(0, len(self), batch_size):
+            counts += self.label_matrix(
+                np.arange(start, min(start + batch_size, len(self)))
+            ).sum(axis=0)
+        return dict(zip(self.labels, counts.tolist()))
+
+    def batches(self, batch_size=10000):
+        """Yields the texts and label fields of the lines in batches."""
+        for start in range(0, len(self), batch_size):
+            lines = [self.line(position) for position in
+                     range(start, min(start + batch_size, len(self)))]
+            yield [text for _, text in lines], [field for field, _ in lines]
+
+    def statistics(self):
+        """Returns the number of lines, the size of the texts and the number
+        of lines per label."""
+        counts = self.label_counts()
+        return {'lines': len(self),
+                'bytes': self.size,
+                'labels_per_line': sum(counts.values()) / max(1, len(self)),
+                'label_counts': counts}
+
+    def close(self):
+        if isinstance(self.data, mmap.mmap):
+            self.data.close()
+        self.file.close()
+
+
+def make_sentence(text, labels):
+    """Returns a Flair sentence with labels; adding a label changed between
+    Flair versions."""
+    from flair.data import Sentence
+    sentence = Sentence(text)
+    parameters = inspect.signature(sentence.add_label).parameters
+    for label in labels:
+        if label.startswith(LABEL_PREFIX):
+            label = label[len(LABEL_PREFIX):]
+        if 'label_type' in parameters:
+            sentence.add_label('class', label)
+        else:
+            sentence.add_label(label)
+    return sentence
+
+
+class FlairSentences:
+    """The lines of a Flair file as Flair sentences, made when they are
+    asked for, as dataset for a Flair corpus."""
+
+    def __init__(self, flair_file):
+        self.flair_file = flair_file
+
+    def __len__(self):
+        return len(self.flair_file)
+
+    def __getitem__(self, position):
+        labels, text = self.flair_file[position]
+        return make_sentence(text, labels)
+
+
+def flair_corpus(prefix, index_dir='corpus_index'):
+    """Returns a Flair corpus of the training, development and test files
+    of a prefix (see dataset_split.py), read through their indexes."""
+    from flair.data import Corpus
+    sets = [FlairSentences(FlairFile(file_name, index_dir))
+            for file_name in split_file_names(prefix).values()]
+    return Corpus(*sets, name=prefix)
+
+
+def main():
+    file_names = sys.argv[1:] or list(split_file_names('flair').values())
+    for file_name in file_names:
+        with FlairFile(file_name) as flair_file:
+            statistics = flair_file.statistics()
+        print('{0}: {1} LINES, {2} BYTES, {3:.2f} LABELS PER LINE'.format(
+            file_name.upper(), statistics['lines'], statistics['bytes'],
+            statistics['labels_per_line']))
+        for label, count in sorted(statistics['label_counts'].items(),
+                                   key=lambda item: -item[1]):
+            print('{0:50}{1:>10}'.format(label, count))
+        print()
+
+
+if __name__ == '__main__':
+    main()
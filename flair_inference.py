@@ -0,0 +1,138 @@
+#!/usr/bin/python3
+# student: J.F.P. (Richard) Scholtens
+# studentnr.: s2956586
+# datum: 18/10/2026
+# Evaluates a trained Flair TextClassifier on the gold standard. The
+# evaluation of training_evaluation.ipynb predicted one sentence at a time and
+# predicted a sentence again for every entity in it. Here every distinct
+# sentence is predicted once, in mini-batches of sentences of about the same
+# length so little padding is needed, without keeping gradients. The model
+# gives a probability for every label, and a label is predicted if its
+# probability reaches the threshold of that label (see multilabel_metrics.py).
+#
+# A gold standard file, as made by gold_standard.py, has the format:
+#
+# SENTENCE: TAB PDF -bestand over de rivier
+# ENTITY: TAB PDF
+# ANSWER: TAB Category:Technology TAB Category:Science
+#
+# Usage: python3 flair_inference.py MODEL.pt [GOLD_STANDARD.txt]
+
+
+import sys
+import inspect
+import numpy as np
+import torch
+from flair.data import Sentence
+from flair.models import TextClassifier
+from mtc_runtime import length_batches
+from multilabel_metrics import (label_matrix, evaluate, threshold_sweep,
+                                best_thresholds, predict, print_sweep)
+
+
+def read_gold_standard(file_name):
+    """Reads a gold standard file and returns a list of (sentence, entity,
+    answer labels) tuples. Entities without answer are left out, as in the
+    evaluation of the notebook. Labels never contain spaces, so labels that
+    were separated by a space instead of a tab are split as well, as in
+    annotation_agreement.py."""
+    items = []
+    sentence = entity = None
+    with open(file_name) as file:
+        for line in file:
+            line = line.strip().split('\t')
+            if line[0] == 'SENTENCE:':
+                sentence = line[1]
+            elif line[0][:6] == 'ENTITY':
+                entity = line[1]
+            elif line[0][:6] == 'ANSWER':
+                answer = ' '.join(line[1:]).split()
+                if answer:
+                    items.append((sentence, entity, answer))
+    return items
+
+
+def predict_arguments(classifier):
+    """Returns the argument of predict that gives the probabilities of all
+    labels; its name changed between Flair versions."""
+    parameters = inspect.signature(classifier.predict).parameters
+    if 'return_probabilities_for_all_classes' in parameters:
+        return {'return_probabilities_for_all_classes': True}
+    return {'multi_class_prob': True}
+
+
+def predict_probabilities(classifier, texts, labels, batch_size=32):
+    """Returns a matrix with the probability of every label (the columns)
+    for every text (the rows). Every distinct text is predicted once."""
+    distinct = list(dict.fromkeys(texts))
+    rows = {text: row for row, text in enumerate(distinct)}
+    columns = {label: column for column, label in enumerate(labels)}
+    probabilities = np.zeros((len(distinct), len(labels)), dtype=np.float32)
+    arguments = predict_arguments(classifier)
+    classifier.eval()
+    with torch.inference_mode():
+        for batch in length_batches(distinct, batch_size):
+            sentences = [Sentence(distinct[i]) for i in batch]
+            classifier.predict(sentences, mini_batch_size=len(sentences),
+                               embedding_storage_mode='none', **arguments)
+            for i, sentence in zip(batch, sentences):
+                for label in sentence.labels:
+                    if label.value in columns:
+                        probabilities[i, columns[label.value]] = label.score
+    return probabilities[[rows[text] for text in texts]]
+
+
+def evaluate_gold_standard(classifier, file_name, thresholds=0.5,
+                           batch_size=32, sweep=True):
+    """Predicts the labels of the gold standard and prints and returns the
+    scores. The thresholds are one threshold or one per label of the gold
+    standard (in sorted order). The labels of the gold standard are the
+    columns, as with the MultiLabelBinarizer of the notebook. With sweep the
+    scores of a grid of thresholds are printed as well."""
+    items = read_gold_standard(file_name)
+    labels = sorted({label for _, _, answer in items for label in answer})
+    Y_true = label_matrix([answer for _, _, answer in items], labels)
+    probabilities = predict_probabilities(
+        classifier, [sentence for sentence, _, _ in items], labels,
+        batch_size)
+    Y_pred = predict(probabilities, thresholds)
+    scores = evaluate(Y_true, Y_pred)
+    # An entity is correct if at least one predicted label is right.
+    correct = int(np.sum(np.any(Y_true & Y_pred, axis=1)))
+
+    print('RECALL MICRO: ', scores['micro_recall'])
+    print('PRECISION MICRO: ', scores['micro_precision'])
+    print('F1-SCORE MICRO: ', scores['micro_f1'])
+    print('\n')
+    print('RECALL MACRO: ', scores['macro_recall'])
+    print('PRECISION MACRO: ', scores['macro_precision'])
+    print('F1-SCORE MACRO: ', scores['macro_f1'])
+    print('\nTOTAL: ', len(items))
+    print('CORRECT: ', correct)
+    print('FALSE: ', len(items) - correct)
+    print('ACCURACY: ', correct / max(1, len(items)))
+    print('SUBSET ACCURACY: ', scores['subset_accuracy'], '\n')
+    if sweep:
+        scores['sweep'] = threshold_sweep(Y_true, probabilities)
+        print_sweep(scores['sweep'])
+        threshold, _ = best_thresholds(scores['sweep'])
+        print('BEST THRESHOLD: {0:.2f}\n'.format(threshold))
+    scores['labels'] = labels
+    scores['probabilities'] = probabilities
+    return scores
+
+
+def main():
+    if len(sys.argv) not in (2, 3):
+        print('USAGE: python3 flair_inference.py MODEL.pt '
+              '[GOLD_STANDARD.txt]')
+        sys.exit(1)
+    gold_standard = 'MISC_sentences_100_gold_standard_union.txt'
+    if len(sys.argv) == 3:
+        gold_standard = sys.argv[2]
+    classifier = TextClassifier.load(sys.argv[1])
+    evaluate_gold_standard(classifier, gold_standard)
+
+
+if __name__ == '__main__':
+    main()
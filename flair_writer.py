@@ -0,0 +1,183 @@
+#!/usr/bin/python3
+# student: J.F.P. (Richard) Scholtens
+# studentnr.: s2956586
+# datum: 18/10/2026
+# Writes the Flair input files of pre-processing_and_baseline.py in one pass
+# over a record file (see dataset_records.py). Every abstract is cleaned and
+# split into words once, and that one result is used for all four outputs:
+#
+# NAME_multiclass.txt          one line per record with its topic
+# NAME_multiclass_BERT.txt     the same, chopped into chunks
+# NAME.txt                     one line per distinct abstract with all topics
+# NAME_BERT.txt                the same, chopped into chunks
+#
+# Each line has the format __label__LABELNAME TAB TEXT, or with multiple
+# labels __label__LABELNAME __label__LABELNAME TAB TEXT. Cleaning and
+# chunking run in a pool of worker processes; the results come back in the
+# order of the records, so the files are the same for any number of workers.
+# If a local BERT model directory is given, the chunks are made with the
+# subword tokenizer of that model so they fit its maximum input length (see
+# token_chunker.py); otherwise they are windows of 200 words. The lines of an
+# output can at the same time be divided over a training, development and
+# test file per source abstract (see dataset_split.py).
+#
+# Usage: python3 flair_writer.py DATASET.jsonl.gz NAME [MODEL_DIRECTORY]
+
+
+import re
+import sys
+import multiprocessing
+from multiprocessing.util import Finalize
+from token_chunker import TokenChunker
+from dataset_split import SplitLedger, split_file_names
+from dataset_records import read_records, group_labels, abstract_digest
+
+
+PUNCTUATION = re.compile(r"[^\.a-zA-Z0-9]+")
+
+# A chunk holds at most CHUNK_SIZE words and the next chunk starts
+# CHUNK_STRIDE words later, so chunks overlap by 50 words.
+CHUNK_SIZE = 200
+CHUNK_STRIDE = 150
+
+# The token chunker of a process, created by init_worker. None means chunks
+# of CHUNK_SIZE words.
+CHUNKER = None
+
+
+def clean_text(text):
+    """Removes punctuation of a text and returns it."""
+    return PUNCTUATION.sub(' ', text.strip())
+
+
+def split_words(words, size=CHUNK_SIZE, stride=CHUNK_STRIDE):
+    """Splits a list of words in chunks of size words, starting every stride
+    words, and returns the chunks as texts. The text is split only once,
+    so the time is linear in the length of the text."""
+    n = max(1, len(words) // stride)
+    return [' '.join(words[w * stride:w * stride + size]) for w in range(n)]
+
+
+def close_chunker():
+    global CHUNKER
+    if CHUNKER is not None:
+        CHUNKER.close()
+        CHUNKER = None
+
+
+def init_worker(settings):
+    """Creates the token chunker of a process if a model directory is set.
+    Every worker process opens the token count cache itself."""
+    global CHUNKER
+    if settings['model_dir']:
+        CHUNKER = TokenChunker(settings['model_dir'], settings['cache_path'],
+                               settings['max_length'])
+        Finalize(None, close_chunker, exitpriority=10)
+
+
+def prepare_record(record):
+    """Cleans and chunks the abstract of a record. Returns the topic, the
+    hash of the abstract, the cleaned abstract and its chunks."""
+    line = clean_text(record['abstract'])
+    words = line.split()
+    chunks = CHUNKER(words) if CHUNKER is not None else split_words(words)
+    return record['topic'], abstract_digest(record['abstract']), line, chunks
+
+
+def flair_line(labels, text):
+    """Returns one line of Flair input."""
+    return ' '.join(labels) + '\t' + text + '\n'
+
+
+def prepared_records(records, settings, workers=None, chunksize=64):
+    """Yields the prepared records in the order of the records. With more
+    than one worker the records are prepared in a process pool."""
+    if workers == 1:
+        init_worker(settings)
+        try:
+            yield from map(prepare_record, records)
+        finally:
+            close_chunker()
+        return
+    with multiprocessing.Pool(workers, init_worker, (settings,)) as pool:
+        yield from pool.imap(prepare_record, records, chunksize)
+
+
+def write_flair_inputs(file_name, name, workers=None, chunksize=64,
+                       model_dir=None, cache_path='token_counts.sqlite',
+                       max_length=None, splits=None,
+                       ledger_path='split_ledger.sqlite'):
+    """Writes the multi-class and multi-label Flair inputs of a record file,
+    both unchunked and chunked, in one pass. A first, cheap pass collects
+    the topics of every distinct abstract. With a model directory the chunks
+    fit the maximum length of that model (by default the maximum of its
+    tokenizer).
+
+    The splits map outputs to a prefix, for example
+    {'multilabel_BERT': 'flair'}. The lines of those outputs are also
+    written to a training, development and test file with that prefix
+    (flair_train.txt, flair_dev.txt and flair_test.txt), divided per
+    abstract by the ledger of dataset_split.py. Returns the number of lines
+    per output file."""
+    settings = {'model_dir': model_dir, 'cache_path': cache_path,
+                'max_length': max_length}
+    labels = group_labels(file_name)
+    names = {'multiclass': name + '_multiclass.txt',
+             'multiclass_BERT': name + '_multiclass_BERT.txt',
+             'multilabel': name + '.txt',
+             'multilabel_BERT': name + '_BERT.txt'}
+    files = {output: open(file, 'w') for output, file in names.items()}
+    split_files = {output: {split: open(file, 'w') for split, file in
+                            split_file_names(prefix).items()}
+                   for output, prefix in (splits or {}).items()}
+    ledger = SplitLedger(ledger_path) if split_files else None
+    counts = dict.fromkeys(names, 0)
+    seen = set()
+
+    def write(output, label, texts, split):
+        lines = [flair_line(label, text) for text in texts]
+        files[output].writelines(lines)
+        if output in split_files:
+            split_files[output][split].writelines(lines)
+        counts[output] += len(lines)
+
+    try:
+        for topic, digest, line, chunks in prepared_records(
+                read_records(file_name), settings, workers, chunksize):
+            split = ledger.assign(digest, labels[digest]) if ledger else None
+            label = ['__label__' + topic]
+            write('multiclass', label, [line], split)
+            write('multiclass_BERT', label, chunks, split)
+            if digest in seen:
+                continue
+            seen.add(digest)
+            label = ['__label__' + topic
+                     for topic in dict.fromkeys(labels[digest])]
+            write('multilabel', label, [line], split)
+            write('multilabel_BERT', label, chunks, split)
+    finally:
+        for file in files.values():
+            file.close()
+        for output in split_files.values():
+            for file in output.values():
+                file.close()
+        if ledger:
+            ledger.close()
+    for output, file in names.items():
+        print('{0} LINES WRITTEN TO {1}'.format(counts[output], file))
+    if ledger:
+        ledger.report()
+    return counts
+
+
+def main():
+    if len(sys.argv) not in (3, 4):
+        print('USAGE: python3 flair_writer.py DATASET.jsonl.gz NAME '
+              '[MODEL_DIRECTORY]')
+        sys.exit(1)
+    model_dir = sys.argv[3] if len(sys.argv) == 4 else None
+    write_flair_inputs(sys.argv[1], sys.argv[2], model_dir=model_dir)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,97 @@
+#!/usr/bin/python3
+# student: J.F.P. (Richard) Scholtens
+# studentnr.: s2956586
+# datum: 18/10/2026
+# A crawl-wide memo of the category graph. The collection strategies expand
+# the same categories again and again, for different topics and different
+# strategies. The memo wraps an engine and remembers every lookup, so each
+# category expansion and each abstract is retrieved only once per run no
+# matter how many Main Topic Classifications reach it. A streamed lookup is
+# only remembered when it was read to the end.
+
+
+from sparql_queries import PAGE_SIZE
+
+
+class GraphMemo:
+    """Wraps an engine and remembers the result of every lookup per kind and
+    entity. The abstracts table holds the abstracts per entity."""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.memo = {}
+        self.counts = {}
+        self.hits = 0
+        self.misses = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    @property
+    def queries(self):
+        return self.engine.queries
+
+    @property
+    def abstracts(self):
+        return self.memo.get('dbo_abstract', {})
+
+    def collect(self, kind, entities):
+        """Collects one property for every entity and returns a list of value
+        sets in the same order as the entities. Only entities that were not
+        looked up before are passed on to the engine, each of them once."""
+        memo = self.memo.setdefault(kind, {})
+        unknown = list(dict.fromkeys(entity for entity in entities
+                                     if entity not in memo))
+        self.misses += len(unknown)
+        self.hits += len(entities) - len(unknown)
+        for entity, values in zip(unknown, self.engine.collect(kind,
+                                                               unknown)):
+            memo[entity] = frozenset(values)
+        return [set(memo[entity]) for entity in entities]
+
+    def count(self, kind, entities):
+        """Returns the number of values of every entity. Entities that were
+        looked up or counted before are not asked again."""
+        memo = self.memo.setdefault(kind, {})
+        counts = self.counts.setdefault(kind, {})
+        unknown = list(dict.fromkeys(entity for entity in entities
+                                     if entity not in memo and
+                                     entity not in counts))
+        counts.update(zip(unknown, self.engine.count(kind, unknown)))
+        return [len(memo[entity]) if entity in memo else counts[entity]
+                for entity in entities]
+
+    def stream(self, kind, entity, page_size=PAGE_SIZE):
+        """Yields the values of one entity in sorted order. If the entity
+        was looked up before, the values come from the memo. Otherwise they
+        are streamed from the engine and remembered, in the order of the
+        engine, once all of them have been read. A cold and a warm run then
+        give the values in the same order and cut them off at the same
+        place."""
+        memo = self.memo.setdefault(kind, {})
+        if entity in memo:
+            self.hits += 1
+            values = memo[entity]
+            # Values of collect have no order; sorting their text is the
+            # STR(?value) order of the keyset pagination of the engine.
+            yield from values if isinstance(values, tuple) else sorted(values)
+            return
+        self.misses += 1
+        values = {}
+        for value in self.engine.stream(kind, entity, page_size):
+            if value not in values:
+                values[value] = None
+                yield value
+        memo[entity] = tuple(values)
+
+    def statistics(self):
+        """Prints and returns the number of hits and misses of the memo."""
+        print('MEMO HITS: {0}'.format(self.hits))
+        print('MEMO MISSES: {0}\n'.format(self.misses))
+        return self.hits, self.misses
+
+    def close(self):
+        self.engine.close()
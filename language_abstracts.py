@@ -0,0 +1,60 @@
+#!/usr/bin/python3
+# student: J.F.P. (Richard) Scholtens
+# studentnr.: s2956586
+# datum: 18/10/2026
+# Retrieves the abstracts of several languages in one crawl. The collection
+# strategies of retrieve_information.py select entities on their Dutch
+# abstract, so the traversal of the category graph stays the same as in a
+# Dutch crawl. Every abstract lookup is replaced by one language query that
+# also brings back the abstracts in the other languages. These are kept per
+# entity and written to the checkpoint log, and at the end of the crawl the
+# dataset is written once per language (see dataset_records.py).
+
+
+class MultiLanguageEngine:
+    """Wraps an engine and looks up abstracts in all languages at once. The
+    first language is the language of the crawl: its abstracts are given to
+    the strategies. The abstracts of the other languages are kept in the
+    translations table per entity and language, and are written to the log
+    if one is given."""
+
+    def __init__(self, engine, languages, log=None, translations=None):
+        self.engine = engine
+        self.languages = list(languages)
+        self.log = log
+        self.translations = translations if translations is not None else {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    @property
+    def queries(self):
+        return self.engine.queries
+
+    def collect(self, kind, entities):
+        if kind != 'dbo_abstract':
+            return self.engine.collect(kind, entities)
+        primary = self.languages[0]
+        values = []
+        for entity, abstracts in zip(entities, self.engine.collect_languages(
+                entities, self.languages)):
+            translations = self.translations.setdefault(entity, {})
+            for language in self.languages[1:]:
+                translations[language] = abstracts[language]
+                if self.log is not None:
+                    self.log.translation(entity, language,
+                                         sorted(abstracts[language]))
+            values.append(abstracts[primary])
+        return values
+
+    def count(self, kind, entities):
+        return self.engine.count(kind, entities)
+
+    def stream(self, kind, entity, page_size):
+        return self.engine.stream(kind, entity, page_size)
+
+    def close(self):
+        self.engine.close()
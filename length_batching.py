@@ -0,0 +1,208 @@
+#!/usr/bin/python3
+# student: J.F.P. (Richard) Scholtens
+# studentnr.: s2956586
+# datum: 18/10/2026
+# Trains a Flair TextClassifier on mini-batches of texts of about the same
+# length. The chunks of flair_train.txt have from a few up to 200 words, so
+# with random mini-batches of 32 texts about 40% of every LSTM step is
+# padding. Here the shuffled texts are divided into buckets, the texts of a
+# bucket are sorted by length and cut into mini-batches of at most a number
+# of (padded) tokens instead of a number of texts: many short texts or a few
+# long ones. The order of the mini-batches is shuffled again every epoch.
+#
+# The shuffling draws its seed from the random generator of PyTorch, like
+# the DataLoader of PyTorch does, so set_seed of the notebook makes every run
+# the same.
+#
+# Usage: python3 length_batching.py [flair_train.txt] [MAX_TOKENS]
+
+
+import sys
+import time
+import numpy as np
+import torch
+from torch.utils.data import DataLoader, Sampler
+
+
+def padding_fraction(lengths, batches):
+    """Returns the part of the padded tokens of mini-batches that is
+    padding."""
+    lengths = np.asarray(lengths)
+    padded = sum(len(batch) * lengths[batch].max() for batch in batches)
+    return 1.0 - lengths.sum() / max(1, padded)
+
+
+def budget_batches(lengths, order, max_tokens, bucket_size):
+    """Cuts the texts in the given order into buckets, sorts every bucket by
+    length (longest first) and cuts it into mini-batches whose number of
+    texts times the longest length is at most max_tokens."""
+    lengths = np.asarray(lengths)
+    batches = []
+    for start in range(0, len(order), bucket_size):
+        bucket = order[start:start + bucket_size]
+        bucket = bucket[np.argsort(-lengths[bucket], kind='stable')]
+        batch = []
+        for index in bucket:
+            # The first text of a batch is its longest.
+            longest = lengths[batch[0]] if batch else lengths[index]
+            if batch and (len(batch) + 1) * max(1, longest) > max_tokens:
+                batches.append(batch)
+                batch = []
+            batch.append(int(index))
+        if batch:
+            batches.append(batch)
+    return batches
+
+
+class TokenBudgetSampler(Sampler):
+    """Gives the mini-batches (lists of positions in the dataset) of one
+    epoch, for the batch_sampler of a DataLoader. The lengths are the number
+    of tokens of every text; a bucket holds bucket_size texts."""
+
+    def __init__(self, lengths, max_tokens=4000, bucket_size=1024,
+                 shuffle=True):
+        self.lengths = np.asarray(lengths, dtype=np.int64)
+        self.max_tokens = max_tokens
+        self.bucket_size = bucket_size
+        self.shuffle = shuffle
+        self.batches = None
+
+    def epoch_batches(self):
+        """Returns new mini-batches for an epoch."""
+        if not self.shuffle:
+            return budget_batches(self.lengths, np.arange(len(self.lengths)),
+                                  self.max_tokens, len(self.lengths) or 1)
+        seed = int(torch.empty((), dtype=torch.int64).random_().item())
+        generator = np.random.default_rng(seed)
+        batches = budget_batches(self.lengths,
+                                 generator.permutation(len(self.lengths)),
+                                 self.max_tokens, self.bucket_size)
+        return [batches[i] for i in generator.permutation(len(batches))]
+
+    def __iter__(self):
+        batches = self.batches or self.epoch_batches()
+        self.batches = None
+        return iter(batches)
+
+    def __len__(self):
+        # The batches of the next epoch are made here already, so the number
+        # of batches is exactly what the DataLoader gets.
+        if self.batches is None:
+            self.batches = self.epoch_batches()
+        return len(self.batches)
+
+
+def sentence_lengths(dataset):
+    """Returns the number of tokens of every sentence of a Flair dataset."""
+    return [len(dataset[i]) for i in range(len(dataset))]
+
+
+def batch_loader(dataset, max_tokens=4000, bucket_size=1024, shuffle=True):
+    """Returns a DataLoader over a Flair dataset that gives lists of
+    sentences of at most max_tokens padded tokens."""
+    sampler = TokenBudgetSampler(sentence_lengths(dataset), max_tokens,
+                                 bucket_size, shuffle)
+    return DataLoader(dataset, batch_sampler=sampler, collate_fn=list)
+
+
+def average_loss(classifier, loader):
+    """Returns the loss of a classifier per sentence, without training."""
+    total = count = 0
+    classifier.eval()
+    with torch.no_grad():
+        for batch in loader:
+            loss = classifier.forward_loss(batch)
+            total += loss.item() * len(batch)
+            count += len(batch)
+            for sentence in batch:
+                sentence.clear_embeddings()
+    return total / max(1, count)
+
+
+def train(classifier, corpus, base_path, learning_rate=0.1, max_tokens=4000,
+          max_epochs=10, bucket_size=1024, patience=3, anneal_factor=0.5,
+          min_learning_rate=0.0001, optimizer=torch.optim.SGD):
+    """Trains a Flair TextClassifier on the train set of a corpus with
+    length-bucketed mini-batches, in the way of the ModelTrainer of Flair:
+    the learning rate is annealed when the loss on the dev set does not
+    improve for a number of epochs, and the model with the lowest dev loss
+    is saved as best-model.pt in base_path. The losses are written to
+    loss.tsv, which the Plotter of Flair can draw. Returns the lowest dev
+    loss."""
+    base_path = str(base_path).rstrip('/')
+    train_loader = batch_loader(corpus.train, max_tokens, bucket_size)
+    dev_loader = batch_loader(corpus.dev, max_tokens, bucket_size,
+                              shuffle=False)
+    sampler = train_loader.batch_sampler
+    print('MINI-BATCHES: {0}, PADDING: {1:.3f}'.format(
+        len(sampler), padding_fraction(sampler.lengths, sampler.batches)))
+
+    optimizer = optimizer(classifier.parameters(), lr=learning_rate)
+    scheduler = torch.optim.lr_scheduler.ReduceLROnPlateau(
+        optimizer, factor=anneal_factor, patience=patience)
+    best_loss = None
+    with open(base_path + '/loss.tsv', 'w') as log:
+        log.write('EPOCH\tTIMESTAMP\tLEARNING_RATE\tTRAIN_LOSS\tDEV_LOSS\n')
+        for epoch in range(1, max_epochs + 1):
+            rate = optimizer.param_groups[0]['lr']
+            if rate < min_learning_rate:
+                print('LEARNING RATE TOO SMALL, STOPPING')
+                break
+            classifier.train()
+            start = time.perf_counter()
+            total = count = 0
+            for batch in train_loader:
+                optimizer.zero_grad()
+                loss = classifier.forward_loss(batch)
+                loss.backward()
+                torch.nn.utils.clip_grad_norm_(classifier.parameters(), 5.0)
+                optimizer.step()
+                total += loss.item() * len(batch)
+                count += len(batch)
+                for sentence in batch:
+                    sentence.clear_embeddings()
+            seconds = time.perf_counter() - start
+            train_loss = total / max(1, count)
+            dev_loss = average_loss(classifier, dev_loader)
+            scheduler.step(dev_loss)
+            print('EPOCH {0}: TRAIN LOSS {1:.4f}, DEV LOSS {2:.4f}, LEARNING '
+                  'RATE {3:.4f}, {4:.1f} SENTENCES/S'.format(
+                      epoch, train_loss, dev_loss, rate, count / seconds))
+            log.write('{0}\t{1}\t{2:.4f}\t{3:.4f}\t{4:.4f}\n'.format(
+                epoch, time.strftime('%H:%M:%S'), rate, train_loss,
+                dev_loss))
+            log.flush()
+            if best_loss is None or dev_loss < best_loss:
+                best_loss = dev_loss
+                classifier.save(base_path + '/best-model.pt')
+    return best_loss
+
+
+def main():
+    file_name = 'flair_train.txt'
+    max_tokens = 4000
+    if len(sys.argv) > 1:
+        file_name = sys.argv[1]
+    if len(sys.argv) > 2:
+        max_tokens = int(sys.argv[2])
+    with open(file_name) as file:
+        lengths = [len(line.rstrip('\n').split('\t', 1)[-1].split())
+                   for line in file]
+
+    # The padding of random mini-batches of 32 texts against the
+    # mini-batches of this module.
+    torch.manual_seed(42)
+    order = torch.randperm(len(lengths)).numpy()
+    random_batches = [order[start:start + 32]
+                      for start in range(0, len(order), 32)]
+    sampler = TokenBudgetSampler(lengths, max_tokens)
+    batches = sampler.epoch_batches()
+    print('TEXTS: {0}'.format(len(lengths)))
+    print('RANDOM BATCHES: {0}, PADDING: {1:.3f}'.format(
+        len(random_batches), padding_fraction(lengths, random_batches)))
+    print('BUCKETED BATCHES: {0}, PADDING: {1:.3f}\n'.format(
+        len(batches), padding_fraction(lengths, batches)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,300 @@
+#!/usr/bin/python3
+# student: J.F.P. (Richard) Scholtens
+# studentnr.: s2956586
+# datum: 18/10/2026
+# A local HTTP stand-in for the DBpedia SPARQL endpoint. It serves canned
+# SPARQL JSON results so the retrieval engine and the collection strategies
+# can be tried out without network access. The canned results are stored in
+# a JSON file with the following format:
+#
+# {"is_subject_of": {"Category:Science": ["Physics", "Chemistry"]},
+#  "dbo_abstract": {"Physics": ["Natuurkunde is ..."]},
+#  "dbo_abstract_en": {"Physics": ["Physics is ..."]}}
+#
+# The Dutch abstracts are under dbo_abstract, the abstracts of every other
+# language under dbo_abstract_ followed by the language.
+#
+# The single, the batched, the paged, the count and the language queries of
+# sparql_queries.py are understood. Queries that are not in the file get an
+# empty result.
+#
+# To try out how the crawl handles a failing endpoint, faults can be
+# injected: extra latency, a share of requests that is throttled with HTTP 429,
+# a share that fails with HTTP 503, and entities whose queries always fail.
+
+
+import re
+import sys
+import json
+import time
+import random
+import threading
+from urllib.parse import urlparse, parse_qs
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from sparql_queries import (QUERIES, BATCH_QUERIES, PAGE_QUERIES,
+                            COUNT_QUERY, LANGUAGE_QUERY, ABSTRACT_KINDS,
+                            RESOURCE, normalize_query)
+
+
+def template_pattern(template):
+    """Turns a query template into a regular expression that captures the
+    entity or the VALUES block."""
+    parts = normalize_query(template).split('%s')
+    return re.compile('(.*?)'.join(re.escape(part) for part in parts) + '$')
+
+
+PATTERNS = ([(kind, False, template_pattern(template))
+             for kind, template in QUERIES.items()] +
+            [(kind, True, template_pattern(template))
+             for kind, template in BATCH_QUERIES.items()])
+
+
+COUNT_PATTERN = template_pattern(COUNT_QUERY)
+
+LANGUAGE_PATTERN = template_pattern(LANGUAGE_QUERY)
+
+PAGE_PATTERNS = [(kind, template_pattern(template))
+                 for kind, template in PAGE_QUERIES.items()]
+
+
+def unescape_literal(text):
+    """Undoes sparql_queries.escape_literal."""
+    return re.sub(r'\\(.)', r'\1', text)
+
+
+def match_page_query(query):
+    """Returns the kind of a paged query, the entity, the value after which
+    the page starts and the page size. Returns None if the query is not a
+    paged query."""
+    query = normalize_query(query)
+    for kind, pattern in PAGE_PATTERNS:
+        match = pattern.match(query)
+        if match:
+            return (kind, match.group(1), unescape_literal(match.group(2)),
+                    int(match.group(3)))
+    return None
+
+
+def resource_entities(values):
+    """Returns the entities of a VALUES block."""
+    return re.findall('<' + re.escape(RESOURCE) + '([^>]*)>', values)
+
+
+def match_language_query(query):
+    """Returns the entities and the languages of a language query, or None
+    if the query is not a language query."""
+    match = LANGUAGE_PATTERN.match(normalize_query(query))
+    if match is None:
+        return None
+    return (resource_entities(match.group(1)),
+            re.findall(r"langMatches\(lang\(\?value\),'([^']*)'\)",
+                       match.group(2)))
+
+
+def match_count_query(query):
+    """Returns the batched query inside a count query, or None if the query
+    is not a count query."""
+    match = COUNT_PATTERN.match(normalize_query(query))
+    return match.group(1) if match else None
+
+
+def match_query(query):
+    """Returns the kind of the query, the entities it asks for and whether
+    it is a batched query. Returns None if the query is unknown."""
+    inner = match_count_query(query)
+    if inner is not None:
+        return match_query(inner)
+    languages = match_language_query(query)
+    if languages is not None:
+        return 'dbo_abstract', languages[0], True
+    page = match_page_query(query)
+    if page is not None:
+        return page[0], [page[1]], False
+    query = normalize_query(query)
+    for kind, batched, pattern in PATTERNS:
+        match = pattern.match(query)
+        if match:
+            if batched:
+                entities = resource_entities(match.group(1))
+            else:
+                entities = [match.group(1)]
+            return kind, entities, batched
+    return None
+
+
+def create_binding(kind, value):
+    """Creates the SPARQL JSON binding of one value."""
+    if kind in ABSTRACT_KINDS:
+        return {'type': 'literal', 'xml:lang': 'nl', 'value': value}
+    return {'type': 'uri', 'value': RESOURCE + value}
+
+
+def page_bindings(canned, kind, entity, after, page_size):
+    """Returns one page of bindings: the values after the given value,
+    sorted in the same way as ORDER BY STR(?value)."""
+    bindings = sorted((create_binding(kind, value)
+                       for value in canned.get(kind, {}).get(entity, [])),
+                      key=lambda binding: binding['value'])
+    return [{'value': binding} for binding in bindings
+            if binding['value'] > after][:page_size]
+
+
+def count_bindings(canned, query):
+    """Returns the bindings of a count query: one row with the number of
+    values per entity that has values."""
+    kind, entities, batched = match_query(query)
+    bindings = []
+    for entity in entities:
+        count = len(canned.get(kind, {}).get(entity, []))
+        if count:
+            bindings.append({'e': {'type': 'uri', 'value': RESOURCE + entity},
+                             'count': {'type': 'typed-literal',
+                                       'datatype': 'http://www.w3.org/2001/'
+                                                   'XMLSchema#integer',
+                                       'value': str(count)}})
+    return bindings
+
+
+def language_bindings(canned, entities, languages):
+    """Returns the bindings of a language query: the abstracts of every
+    entity in all asked languages."""
+    bindings = []
+    for entity in entities:
+        for language in languages:
+            kind = 'dbo_abstract' if language == 'nl' else \
+                'dbo_abstract_' + language
+            for value in canned.get(kind, {}).get(entity, []):
+                bindings.append({'e': {'type': 'uri',
+                                       'value': RESOURCE + entity},
+                                 'value': {'type': 'literal',
+                                           'xml:lang': language,
+                                           'value': value}})
+    return bindings
+
+
+def canned_bindings(canned, query):
+    """Returns the SPARQL JSON bindings of a query using the canned
+    values."""
+    page = match_page_query(query)
+    if page is not None:
+        return page_bindings(canned, *page)
+    inner = match_count_query(query)
+    if inner is not None:
+        return count_bindings(canned, inner)
+    languages = match_language_query(query)
+    if languages is not None:
+        return language_bindings(canned, *languages)
+    matched = match_query(query)
+    if matched is None:
+        return []
+    kind, entities, batched = matched
+    bindings = []
+    for entity in entities:
+        for value in canned.get(kind, {}).get(entity, []):
+            binding = {'value': create_binding(kind, value)}
+            if batched:
+                binding['e'] = {'type': 'uri', 'value': RESOURCE + entity}
+            bindings.append(binding)
+    return bindings
+
+
+class SPARQLHandler(BaseHTTPRequestHandler):
+    """Answers GET and POST requests with the canned result of the query."""
+
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def _query(self):
+        if self.command == 'POST':
+            length = int(self.headers.get('Content-Length', 0))
+            params = parse_qs(self.rfile.read(length).decode('utf-8'))
+        else:
+            params = parse_qs(urlparse(self.path).query)
+        return params.get('query', [''])[0]
+
+    def _fault(self, query):
+        """Returns the HTTP status of an injected fault or None."""
+        faults = self.server.faults
+        with self.server.lock:
+            draw = self.server.random.random()
+        if faults.get('latency'):
+            time.sleep(faults['latency'])
+        matched = match_query(query)
+        if matched and set(matched[1]) & set(faults.get('fail_entities', [])):
+            return 503
+        if draw < faults.get('throttle_rate', 0):
+            return 429
+        if draw < faults.get('throttle_rate', 0) + faults.get('error_rate', 0):
+            return 503
+        return None
+
+    def _respond(self):
+        self.server.requests += 1
+        query = self._query()
+        status = self._fault(query)
+        if status is not None:
+            self.server.faulted += 1
+            self.send_response(status)
+            self.send_header('Retry-After', str(self.server.faults.get(
+                'retry_after', 0)))
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        bindings = canned_bindings(self.server.canned, query)
+        body = json.dumps({'head': {'vars': ['e', 'value']},
+                           'results': {'bindings': bindings}})
+        body = body.encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/sparql-results+json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    do_GET = _respond
+    do_POST = _respond
+
+
+def create_server(canned, host='127.0.0.1', port=0, faults=None, seed=1):
+    """Creates a threaded HTTP server that serves the canned results. Port
+    0 lets the operating system pick a free port. The faults are a
+    dictionary with the optional keys latency (seconds), throttle_rate,
+    error_rate, retry_after (seconds) and fail_entities (a list). The seed
+    makes the injected faults reproducible."""
+    server = ThreadingHTTPServer((host, port), SPARQLHandler)
+    server.daemon_threads = True
+    server.canned = canned
+    server.faults = faults or {}
+    server.random = random.Random(seed)
+    server.lock = threading.Lock()
+    server.requests = 0
+    server.faulted = 0
+    return server
+
+
+def start_in_thread(canned, host='127.0.0.1', port=0, faults=None, seed=1):
+    """Starts the server in a background thread and returns the server and
+    the endpoint URL. Call server.shutdown() to stop it."""
+    server = create_server(canned, host, port, faults, seed)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    endpoint = 'http://{0}:{1}/sparql'.format(*server.server_address[:2])
+    return server, endpoint
+
+
+def main():
+    with open(sys.argv[1]) as file:
+        canned = json.load(file)
+    port = int(sys.argv[2]) if len(sys.argv) > 2 else 8890
+    faults = None
+    if len(sys.argv) > 3:
+        with open(sys.argv[3]) as file:
+            faults = json.load(file)
+    server = create_server(canned, port=port, faults=faults)
+    print('SERVING CANNED RESULTS ON PORT {0}.'.format(port))
+    server.serve_forever()
+
+
+if __name__ == '__main__':
+    main()
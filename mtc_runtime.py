@@ -0,0 +1,154 @@
+#!/usr/bin/python3
+# student: J.F.P. (Richard) Scholtens
+# studentnr.: s2956586
+# datum: 18/10/2026
+# Loads a classifier exported by export_model.py and predicts the Main Topic
+# Classifications of texts on CPU. Only PyTorch, the tokenizers library and
+# segtok (the word tokenizer of Flair) are needed, not Flair or
+# transformers. The texts are split into words as Flair does, the words into
+# subwords with the tokenizer of the model, and the texts are predicted in
+# mini-batches of texts of about the same length.
+#
+# Usage: python3 mtc_runtime.py EXPORT_DIRECTORY \
+#        "Een zin om te classificeren ."
+
+
+import os
+import sys
+import json
+import numpy as np
+import torch
+from tokenizers import Tokenizer
+from segtok.segmenter import split_single
+from segtok.tokenizer import split_contractions, word_tokenizer
+
+
+def split_words(text):
+    """Splits a text into words like the segtok tokenizer of Flair."""
+    words = []
+    for sentence in split_single(text):
+        words.extend(split_contractions(word_tokenizer(sentence)))
+    return [word for word in words if word]
+
+
+def length_batches(texts, batch_size=32):
+    """Returns the positions of the texts in batches of texts of about the
+    same length, longest first."""
+    order = sorted(range(len(texts)), key=lambda i: -len(texts[i].split()))
+    return [order[start:start + batch_size]
+            for start in range(0, len(order), batch_size)]
+
+
+class MTCModel:
+    """An exported classifier. The directory holds model.pt, tokenizer.json
+    and settings.json. Without directory only the encoding of texts can be
+    used, which export_model.py needs to trace the model."""
+
+    def __init__(self, directory, tokenizer_file=None, settings=None):
+        if directory:
+            tokenizer_file = os.path.join(directory, 'tokenizer.json')
+            with open(os.path.join(directory, 'settings.json')) as file:
+                settings = json.load(file)
+        self.settings = settings
+        self.labels = settings['labels']
+        self.tokenizer = Tokenizer.from_file(tokenizer_file)
+        self.tokenizer.no_padding()
+        self.tokenizer.no_truncation()
+        self.pad_id = self.tokenizer.token_to_id('[PAD]') or 0
+        self.model = None
+        if directory:
+            self.model = torch.jit.load(os.path.join(directory, 'model.pt'),
+                                        map_location='cpu').eval()
+
+    def subwords(self, words):
+        """Returns the subword ids of words and the word of every subword
+        (None for special tokens), cut off at the maximum length."""
+        encoding = self.tokenizer.encode(words, is_pretokenized=True)
+        ids = list(encoding.ids)
+        word_ids = list(encoding.word_ids)
+        max_length = self.settings['max_length']
+        if len(ids) > max_length:
+            ids = ids[:max_length - 1] + ids[-1:]
+            word_ids = word_ids[:max_length - 1] + [None]
+        return ids, word_ids
+
+    def pooling_parts(self, word_ids, words):
+        """Returns the weights that pool the subwords of every word, one
+        matrix (words, subwords) per part of the pooling."""
+        positions = [[] for _ in range(words)]
+        for position, word in enumerate(word_ids):
+            if word is not None:
+                positions[word].append(position)
+        pooling = self.settings['pooling']
+        parts = {'first': ['first'], 'last': ['last'], 'mean': ['mean'],
+                 'first_last': ['first', 'last']}[pooling]
+        weights = np.zeros((len(parts), words, len(word_ids)),
+                           dtype=np.float32)
+        for part, kind in enumerate(parts):
+            for word, subwords in enumerate(positions):
+                if not subwords:
+                    continue
+                if kind == 'first':
+                    weights[part, word, subwords[0]] = 1.0
+                elif kind == 'last':
+                    weights[part, word, subwords[-1]] = 1.0
+                else:
+                    weights[part, word, subwords] = 1.0 / len(subwords)
+        return weights
+
+    def encode(self, texts):
+        """Returns the inputs of the exported model for a batch of texts:
+        subword ids, attention mask, pooling weights and word counts."""
+        encoded = []
+        for text in texts:
+            words = split_words(text) or ['.']
+            ids, word_ids = self.subwords(words)
+            encoded.append((ids, self.pooling_parts(word_ids, len(words))))
+        subwords = max(len(ids) for ids, _ in encoded)
+        words = max(weights.shape[1] for _, weights in encoded)
+        parts = encoded[0][1].shape[0]
+        input_ids = np.full((len(texts), subwords), self.pad_id,
+                            dtype=np.int64)
+        attention_mask = np.zeros((len(texts), subwords), dtype=np.int64)
+        word_weights = np.zeros((len(texts), parts, words, subwords),
+                                dtype=np.float32)
+        lengths = np.zeros(len(texts), dtype=np.int64)
+        for row, (ids, weights) in enumerate(encoded):
+            input_ids[row, :len(ids)] = ids
+            attention_mask[row, :len(ids)] = 1
+            word_weights[row, :, :weights.shape[1], :len(ids)] = weights
+            lengths[row] = weights.shape[1]
+        return (torch.from_numpy(input_ids), torch.from_numpy(attention_mask),
+                torch.from_numpy(word_weights), torch.from_numpy(lengths))
+
+    def predict_proba(self, texts, batch_size=32):
+        """Returns a matrix with the probability of every label (the
+        columns, in the order of labels) for every text (the rows)."""
+        probabilities = np.zeros((len(texts), len(self.labels)),
+                                 dtype=np.float32)
+        with torch.inference_mode():
+            for batch in length_batches(texts, batch_size):
+                output = self.model(*self.encode([texts[i] for i in batch]))
+                probabilities[batch] = output.numpy()
+        return probabilities
+
+    def predict(self, texts, thresholds=0.5, batch_size=32):
+        """Returns the labels of every text whose probability reaches the
+        threshold, one for all labels or one per label."""
+        predictions = (self.predict_proba(texts, batch_size) >=
+                       np.asarray(thresholds))
+        return [[label for label, chosen in zip(self.labels, row) if chosen]
+                for row in predictions]
+
+
+def main():
+    if len(sys.argv) < 3:
+        print('USAGE: python3 mtc_runtime.py EXPORT_DIRECTORY TEXT [TEXT ...]')
+        sys.exit(1)
+    model = MTCModel(sys.argv[1])
+    for text, labels in zip(sys.argv[2:], model.predict(sys.argv[2:])):
+        print('{0}\t{1}'.format(text, '\t'.join(labels)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,196 @@
+#!/usr/bin/python3
+# student: J.F.P. (Richard) Scholtens
+# studentnr.: s2956586
+# datum: 18/10/2026
+# Calculates the scores of multi-label predictions with NumPy. The gold
+# labels and predictions are matrices with one row per text and one column
+# per label. The true positives, false positives and false negatives of all
+# labels are counted once, and precision, recall, F1-score (micro and macro)
+# and accuracy all follow from these counts.
+#
+# A model gives a probability per label, and a label is predicted if its
+# probability is at least a threshold. Instead of one fixed threshold of
+# 0.5, threshold_sweep calculates the scores for a whole grid of thresholds
+# in one pass over the probabilities, so the best threshold, also per label,
+# can be chosen on the development set.
+
+
+import numpy as np
+
+
+THRESHOLDS = np.round(np.arange(0.05, 1.0, 0.05), 2)
+
+
+def label_matrix(label_lists, labels):
+    """Returns the 0/1 matrix of lists of labels, with the columns in the
+    order of labels. Unknown labels are left out."""
+    columns = {label: column for column, label in enumerate(labels)}
+    matrix = np.zeros((len(label_lists), len(labels)), dtype=bool)
+    for row, label_list in enumerate(label_lists):
+        for label in label_list:
+            if label in columns:
+                matrix[row, columns[label]] = True
+    return matrix
+
+
+def confusion_counts(Y_true, Y_pred):
+    """Returns the true positives, false positives and false negatives per
+    label."""
+    Y_true = np.asarray(Y_true, dtype=bool)
+    Y_pred = np.asarray(Y_pred, dtype=bool)
+    tp = np.sum(Y_true & Y_pred, axis=0)
+    fp = np.sum(~Y_true & Y_pred, axis=0)
+    fn = np.sum(Y_true & ~Y_pred, axis=0)
+    return tp, fp, fn
+
+
+def divide(numerator, denominator, zero_division=1.0):
+    """Divides element-wise and gives zero_division where the denominator
+    is 0, as scikit-learn does."""
+    numerator = np.asarray(numerator, dtype=float)
+    denominator = np.asarray(denominator, dtype=float)
+    result = np.full(np.broadcast(numerator, denominator).shape,
+                     zero_division)
+    np.divide(numerator, denominator, out=result, where=denominator != 0)
+    return result
+
+
+def scores_from_counts(tp, fp, fn, zero_division=1.0):
+    """Returns the precision, recall and F1-score per label and their micro
+    and macro averages. The counts have the labels on the last axis, so the
+    scores of many thresholds can be calculated at once."""
+    precision = divide(tp, tp + fp, zero_division)
+    recall = divide(tp, tp + fn, zero_division)
+    f1 = divide(2 * tp, 2 * tp + fp + fn, zero_division)
+    tp_sum = np.sum(tp, axis=-1)
+    fp_sum = np.sum(fp, axis=-1)
+    fn_sum = np.sum(fn, axis=-1)
+    return {
+        'precision': precision,
+        'recall': recall,
+        'f1': f1,
+        'macro_precision': np.mean(precision, axis=-1),
+        'macro_recall': np.mean(recall, axis=-1),
+        'macro_f1': np.mean(f1, axis=-1),
+        'micro_precision': divide(tp_sum, tp_sum + fp_sum, zero_division),
+        'micro_recall': divide(tp_sum, tp_sum + fn_sum, zero_division),
+        'micro_f1': divide(2 * tp_sum, 2 * tp_sum + fp_sum + fn_sum,
+                           zero_division),
+    }
+
+
+def evaluate(Y_true, Y_pred, zero_division=1.0):
+    """Returns all scores of a 0/1 prediction matrix, together with the
+    subset accuracy (the share of texts with exactly the right labels) and
+    the number of gold texts per label."""
+    Y_true = np.asarray(Y_true, dtype=bool)
+    Y_pred = np.asarray(Y_pred, dtype=bool)
+    tp, fp, fn = confusion_counts(Y_true, Y_pred)
+    scores = scores_from_counts(tp, fp, fn, zero_division)
+    scores['subset_accuracy'] = (np.mean(np.all(Y_true == Y_pred, axis=1))
+                                 if len(Y_true) else 0.0)
+    scores['support'] = tp + fn
+    return scores
+
+
+def threshold_sweep(Y_true, probabilities, thresholds=THRESHOLDS,
+                    zero_division=1.0):
+    """Calculates the scores of a probability matrix for every threshold of
+    a grid at once. For every probability the number of thresholds it
+    reaches is looked up once; the counts per threshold then follow from
+    cumulative sums. Returns the scores with the thresholds on the first
+    axis, and the counts per threshold and label."""
+    Y_true = np.asarray(Y_true, dtype=bool)
+    probabilities = np.asarray(probabilities, dtype=float)
+    thresholds = np.sort(np.asarray(thresholds, dtype=float))
+    steps = len(thresholds)
+    # reached[i, j] is the number of thresholds that probability [i, j]
+    # reaches, so label j of text i is predicted for threshold k < reached.
+    reached = np.searchsorted(thresholds, probabilities, side='right')
+    columns = np.broadcast_to(np.arange(Y_true.shape[1]), Y_true.shape)
+
+    def predicted(mask):
+        # Counts per (reached, label), turned into the number of entries
+        # that are predicted per threshold.
+        histogram = np.zeros((steps + 1, Y_true.shape[1]), dtype=np.int64)
+        np.add.at(histogram, (reached[mask], columns[mask]), 1)
+        return np.cumsum(histogram[::-1], axis=0)[::-1][1:]
+
+    tp = predicted(Y_true)
+    fp = predicted(~Y_true)
+    fn = np.sum(Y_true, axis=0) - tp
+    scores = scores_from_counts(tp, fp, fn, zero_division)
+
+    # A text is exactly right for the thresholds that all its negative
+    # labels miss and all its positive labels reach: from the highest reach
+    # of a negative label up to the lowest reach of a positive label.
+    lowest = np.where(Y_true, reached, steps).min(axis=1, initial=steps)
+    highest = np.where(~Y_true, reached, 0).max(axis=1, initial=0)
+    exact = np.zeros(steps + 1, dtype=np.int64)
+    valid = highest < lowest
+    np.add.at(exact, highest[valid], 1)
+    np.add.at(exact, lowest[valid], -1)
+    scores['subset_accuracy'] = (np.cumsum(exact)[:steps] /
+                                 max(1, len(Y_true)))
+    scores['thresholds'] = thresholds
+    scores['counts'] = (tp, fp, fn)
+    return scores
+
+
+def best_thresholds(sweep, score='micro_f1'):
+    """Returns the global threshold with the best score of a sweep and the
+    threshold per label with the best F1-score of that label. The lowest
+    threshold wins ties."""
+    thresholds = sweep['thresholds']
+    return (thresholds[np.argmax(sweep[score])],
+            thresholds[np.argmax(sweep['f1'], axis=0)])
+
+
+def predict(probabilities, thresholds):
+    """Returns the 0/1 predictions of a probability matrix for a global
+    threshold or one threshold per label."""
+    return np.asarray(probabilities) >= np.asarray(thresholds)
+
+
+def print_sweep(sweep):
+    """Prints the micro and macro scores and the subset accuracy of every
+    threshold of a sweep."""
+    print("{0:12}{1:12}{2:12}{3:12}{4:12}\n".format(
+        'THRESHOLD:', 'MICRO F1:', 'MACRO F1:', 'MICRO P:', 'ACCURACY:'))
+    for k, threshold in enumerate(sweep['thresholds']):
+        print("{0:<12.2f}{1:<12.4f}{2:<12.4f}{3:<12.4f}{4:<12.4f}".format(
+            threshold, sweep['micro_f1'][k], sweep['macro_f1'][k],
+            sweep['micro_precision'][k], sweep['subset_accuracy'][k]))
+    print()
+
+
+def print_report(labels, scores, digits=4):
+    """Prints the precision, recall, F1-score and support per label and
+    their averages, like the classification report of scikit-learn."""
+    width = max([len(label) for label in labels] + [len('weighted avg')])
+    row = '{0:>{width}} {1:>9} {2:>9} {3:>9} {4:>9}'
+    number = '{0:.{digits}f}'
+    print(row.format('', 'precision', 'recall', 'f1-score', 'support',
+                     width=width) + '\n')
+    for column, label in enumerate(labels):
+        print(row.format(label, *(number.format(scores[name][column],
+                                                digits=digits)
+                                  for name in ('precision', 'recall', 'f1')),
+                         scores['support'][column], width=width))
+    support = np.sum(scores['support'])
+    weights = scores['support'] / max(1, support)
+    print()
+    print(row.format('micro avg', *(number.format(scores['micro_' + name],
+                                                  digits=digits)
+                                    for name in ('precision', 'recall',
+                                                 'f1')),
+                     support, width=width))
+    print(row.format('macro avg', *(number.format(scores['macro_' + name],
+                                                  digits=digits)
+                                    for name in ('precision', 'recall',
+                                                 'f1')),
+                     support, width=width))
+    print(row.format('weighted avg', *(number.format(
+        np.sum(scores[name] * weights), digits=digits)
+        for name in ('precision', 'recall', 'f1')), support, width=width))
+    print()
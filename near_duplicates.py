@@ -0,0 +1,159 @@
+#!/usr/bin/python3
+# student: J.F.P. (Richard) Scholtens
+# studentnr.: s2956586
+# datum: 18/10/2026
+# Finds abstracts that are nearly the same and merges them, between
+# remove_merge_mtcs.py and pre-processing_and_baseline.py. DBpedia often
+# holds an abstract more than once with other whitespace or with one more
+# sentence at the end. Only byte-identical abstracts get their labels merged,
+# so these near-duplicates become separate training rows and can end up in
+# both the training and the test set.
+#
+# Every abstract gets a MinHash signature over its shingles of three words.
+# The signatures are cut into bands and abstracts that share a band are
+# candidates; a candidate is a near-duplicate if the signatures estimate a
+# Jaccard similarity of at least the threshold. This takes time linear in
+# the number of abstracts instead of comparing all pairs. Every cluster of
+# near-duplicates is replaced by its first abstract, so the later stages
+# merge the labels of the cluster, and a record is left out if its topic was
+# already written for the cluster. The clusters are written to a report.
+
+
+import re
+import json
+import zlib
+import numpy as np
+from dataset_records import read_records, RecordWriter, abstract_digest
+
+
+WORD = re.compile(r"\w+")
+
+# A prime above 2 ** 32, so (a * hash + b) % PRIME fits in 64 bits.
+PRIME = (1 << 32) + 15
+
+SHINGLE_SIZE = 3
+
+
+def shingle_hashes(abstract, size=SHINGLE_SIZE):
+    """Returns the 32-bit hashes of the shingles of size words of an
+    abstract. Case and punctuation are left out."""
+    words = WORD.findall(abstract.lower())
+    shingles = {' '.join(words[i:i + size])
+                for i in range(max(1, len(words) - size + 1))}
+    return np.fromiter((zlib.crc32(shingle.encode('utf-8'))
+                        for shingle in shingles), dtype=np.uint64,
+                       count=len(shingles))
+
+
+class MinHasher:
+    """Makes MinHash signatures of num_perm values. The seed fixes the hash
+    functions, so signatures are the same in every run."""
+
+    def __init__(self, num_perm=128, seed=1):
+        random_state = np.random.RandomState(seed)
+        self.a = random_state.randint(1, 1 << 32, num_perm).astype(np.uint64)
+        self.b = random_state.randint(0, 1 << 32, num_perm).astype(np.uint64)
+
+    def signature(self, hashes):
+        if not len(hashes):
+            return np.full(len(self.a), PRIME, dtype=np.uint64)
+        return ((np.outer(hashes, self.a) + self.b) % PRIME).min(axis=0)
+
+
+def find_clusters(signatures, bands=16, threshold=0.8):
+    """Groups the signatures, given in the order of the abstracts, into
+    clusters of near-duplicates. Returns for every abstract the position of
+    the first abstract of its cluster."""
+    parents = list(range(len(signatures)))
+
+    def find(i):
+        while parents[i] != i:
+            parents[i] = parents[parents[i]]
+            i = parents[i]
+        return i
+
+    if not len(signatures):
+        return parents
+    rows = signatures.shape[1] // bands
+    for band in range(bands):
+        buckets = {}
+        columns = signatures[:, band * rows:(band + 1) * rows]
+        for i, key in enumerate(map(bytes, columns)):
+            first = buckets.setdefault(key, i)
+            if first == i:
+                continue
+            root, other = find(first), find(i)
+            if root != other and np.mean(signatures[first] ==
+                                         signatures[i]) >= threshold:
+                parents[max(root, other)] = min(root, other)
+    return [find(i) for i in range(len(signatures))]
+
+
+def deduplicate(file_name, output_name, report_name='near_duplicates.json',
+                threshold=0.8, num_perm=128, bands=16):
+    """Writes the records of a record file without near-duplicates and
+    writes the clusters of near-duplicates to a report. Returns the number
+    of records read and written."""
+    hasher = MinHasher(num_perm)
+    positions = {}
+    signatures = []
+    for record in read_records(file_name):
+        digest = abstract_digest(record['abstract'])
+        if digest not in positions:
+            positions[digest] = len(signatures)
+            signatures.append(hasher.signature(
+                shingle_hashes(record['abstract'])))
+    representatives = find_clusters(np.array(signatures), bands, threshold)
+    sizes = {}
+    for representative in representatives:
+        sizes[representative] = sizes.get(representative, 0) + 1
+
+    texts = {}
+    clusters = {}
+    written = set()
+    read = 0
+    with RecordWriter(output_name) as writer:
+        for record in read_records(file_name):
+            read += 1
+            representative = representatives[positions[abstract_digest(
+                record['abstract'])]]
+            if sizes[representative] > 1:
+                text = texts.setdefault(representative, record['abstract'])
+                # Dictionaries keep the order of the entities and topics
+                # and find them without searching a list.
+                cluster = clusters.setdefault(representative, {
+                    'abstract': text[:200], 'entities': {}, 'topics': {}})
+                cluster['entities'][record['entity']] = None
+                cluster['topics'][record['topic']] = None
+                record = dict(record, abstract=text)
+            if (representative, record['topic']) in written:
+                continue
+            written.add((representative, record['topic']))
+            writer.write(record)
+
+    print('RECORDS READ: {0}'.format(read))
+    print('DISTINCT ABSTRACTS: {0}'.format(len(signatures)))
+    print('CLUSTERS OF NEAR-DUPLICATES: {0}'.format(len(clusters)))
+    print('ABSTRACTS AFTER MERGING: {0}'.format(len(sizes)))
+    print('RECORDS WRITTEN TO {0}: {1}\n'.format(output_name, writer.count))
+    with open(report_name, 'w') as file:
+        json.dump([{'abstract': cluster['abstract'],
+                    'entities': list(cluster['entities']),
+                    'topics': list(cluster['topics'])}
+                   for cluster in clusters.values()],
+                  file, indent=1, ensure_ascii=False)
+    print('CLUSTERS WRITTEN TO {0}\n'.format(report_name))
+    return read, writer.count
+
+
+def main():
+    # The language of the dataset shard, see the languages of
+    # retrieve_information.main().
+    language = 'NL'
+    deduplicate('dataset_range_strategy3_{0}_merged.jsonl.gz'.format(language),
+                'dataset_range_strategy3_{0}_dedup.jsonl.gz'.format(language),
+                'near_duplicates_{0}.json'.format(language))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,191 @@
+#!/usr/bin/python3
+# student: J.F.P. (Richard) Scholtens
+# studentnr.: s2956586
+# datum: 18/10/2026
+# Crawls the Main Topic Classifications in parallel. The topics of
+# get_categories() are independent of each other, so they are shared out over
+# a pool of worker processes that each run the strategy cascade of
+# retrieve_information.py for one topic at a time. All workers take their
+# requests from one shared token bucket and split the concurrency between
+# them, so together they stay within what the endpoint allows. The results
+# are merged into the same dictionary[topic][category][entity] = abstract
+# architecture, in the same order, as the serial crawl, and written to the
+# same record file.
+#
+# Every topic runs the fixed cascade 1, 2, 3, 4. The crawl planner learns
+# from the topics that were crawled before, which in parallel depends on
+# which worker finishes first, so with a planner the result could differ
+# from the serial crawl and from one run to the next.
+#
+# Every finished topic is written to the checkpoint log of the serial crawl.
+# Topics that were still running when the crawl stopped are collected again.
+# The queries that were lost after all retries are written to a report.
+
+
+import multiprocessing
+from multiprocessing.util import Finalize
+from graph_memo import GraphMemo
+from dataset_records import write_language_shards
+from language_abstracts import MultiLanguageEngine
+from rate_limit import TokenBucket
+from sparql_cache import SPARQLCache
+from dbpedia_index import DBpediaIndex
+from sparql_engine import AsyncSPARQLEngine
+from request_scheduler import RequestScheduler, write_lost_report
+from crawl_checkpoint import (CheckpointLog, MemoryLog, CheckpointedDataset,
+                              replay_log)
+from retrieve_information import (get_categories, check_size, crawl_topic,
+                                  topic_fingerprint)
+
+
+# The engine, the scheduler and the multi-language engine of a worker
+# process, created by init_worker.
+ENGINE = None
+SCHEDULER = None
+LANGUAGES = None
+
+
+def close_engine():
+    ENGINE.close()
+
+
+def init_worker(settings, limiter):
+    """Creates the engine of a worker process. The settings are the ones
+    given to crawl_parallel. The scheduler of every worker takes its tokens
+    from the shared token bucket, so when one worker is throttled the rate
+    goes down for all of them."""
+    global ENGINE, SCHEDULER, LANGUAGES
+    if settings['index_path']:
+        engine = DBpediaIndex(settings['index_path'])
+    else:
+        cache = None
+        if settings['cache_path']:
+            cache = SPARQLCache(settings['cache_path'], ttl=settings['ttl'])
+        SCHEDULER = RequestScheduler(
+            limiter, max_concurrency=settings['concurrency'])
+        engine = AsyncSPARQLEngine(settings['endpoint'],
+                                   concurrency=settings['concurrency'],
+                                   cache=cache, scheduler=SCHEDULER)
+    if len(settings['languages']) > 1:
+        engine = LANGUAGES = MultiLanguageEngine(engine,
+                                                 settings['languages'])
+    ENGINE = GraphMemo(engine)
+    Finalize(None, close_engine, exitpriority=10)
+
+
+def crawl_worker(task):
+    """Crawls one topic in a worker process. If the fingerprint of a done
+    topic is given and the topic did not change, nothing is collected.
+    Returns the topic, its fingerprint, the crawl events of the topic (or
+    None if nothing was collected), the check, the counter and the queries
+    that were lost."""
+    topic, max_range, known_fingerprint = task
+    fingerprint = topic_fingerprint(topic, ENGINE)
+    if known_fingerprint is not None and fingerprint == known_fingerprint:
+        return topic, fingerprint, None, True, 0, take_lost()
+    log = MemoryLog()
+    dic = CheckpointedDataset(log)
+    if LANGUAGES is not None:
+        LANGUAGES.log = log
+    dic, check, counter = crawl_topic(topic, dic, max_range, ENGINE, log=log)
+    return topic, fingerprint, log.records, check, counter, take_lost()
+
+
+def take_lost():
+    """Returns the queries the scheduler of this worker lost so far."""
+    return SCHEDULER.take_lost() if SCHEDULER is not None else []
+
+
+def crawl_parallel(classifications, max_range, min_range, log_path,
+                   workers=4, concurrency=16, rate=10.0, max_requests=None,
+                   endpoint='http://dbpedia.org/sparql',
+                   cache_path='sparql_cache.sqlite', ttl=30 * 24 * 60 * 60,
+                   index_path=None, incremental=False, languages=('nl',)):
+    """Crawls all topics with a pool of worker processes and returns the
+    dictionary. The concurrency is split between the workers and rate is the
+    total number of requests per second of all workers together. The events
+    of every finished topic are written to the checkpoint log in the order
+    they happened in the worker, so the log can be resumed by the serial
+    crawl as well. Every topic runs the strategies in the fixed order 1, 2,
+    3, 4, so the dictionary is the same as that of the serial crawl without
+    a planner. The abstracts of all languages are retrieved in the same
+    queries."""
+    state = replay_log(log_path)
+    classifications = [classification.strip()
+                       for classification in classifications]
+    tasks = []
+    for topic in classifications:
+        progress = state.progress.get(topic)
+        if progress is not None and progress['done']:
+            if not incremental:
+                continue
+            known = progress['fingerprint'] \
+                if progress['counter'] >= min_range else None
+            tasks.append((topic, max_range, known))
+        else:
+            tasks.append((topic, max_range, None))
+
+    settings = {'index_path': index_path,
+                'cache_path': cache_path,
+                'ttl': ttl,
+                'endpoint': endpoint,
+                'concurrency': max(1, concurrency // workers),
+                'languages': list(languages)}
+    limiter = TokenBucket(rate, max_requests=max_requests)
+    lost = []
+
+    with CheckpointLog(log_path) as log:
+        dic = CheckpointedDataset(log, state.dataset)
+        with multiprocessing.Pool(workers, init_worker,
+                                  (settings, limiter)) as pool:
+            for (topic, fingerprint, records, check, counter,
+                 topic_lost) in pool.imap_unordered(crawl_worker, tasks):
+                lost.extend(topic_lost)
+                if records is None:
+                    print("TOPIC {0} HAS NOT CHANGED.\n".format(topic))
+                    continue
+                if topic in state.progress:
+                    log.reset(topic)
+                    dic.pop(topic, None)
+                log.topic(topic, fingerprint)
+                for record in records:
+                    if record['event'] == 'strategy':
+                        log.strategy(topic, record['strategy'],
+                                     record['counter'])
+                    elif record['event'] == 'translation':
+                        log.translation(record['entity'], record['language'],
+                                        record['abstracts'])
+                    elif record['event'] == 'abstract':
+                        dic[topic][record['category']][record['entity']] = \
+                            record['abstract']
+                log.done(topic, counter, check)
+                print("TOPIC {0} IS DONE WITH {1} ENTITIES.\n".format(
+                    topic, counter))
+        print('TOTAL REQUESTS: {0}\n'.format(limiter.used))
+    write_lost_report(lost)
+
+    # Put the topics back in the order of the serial crawl.
+    return {topic: dic[topic] for topic in classifications if topic in dic}
+
+
+def main():
+    min_range = 79
+    max_range = 357
+    classifications = get_categories()
+
+    log_path = 'crawl_checkpoint.jsonl'
+    languages = ['nl']
+
+    dic = crawl_parallel(classifications, max_range, min_range, log_path,
+                         workers=4, concurrency=16, rate=10.0,
+                         languages=languages)
+    check_size(dic, min_range)
+
+    state = replay_log(log_path)
+    write_language_shards(dic,
+                          'dataset_max_range_357_all_strategies_{0}.jsonl.gz',
+                          languages, state.translations, state.sources)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+#!/usr/bin/python3
+# student: J.F.P. (Richard) Scholtens
+# studentnr.: s2956586
+# datum: 18/10/2026
+# A token bucket that limits the rate of requests to the SPARQL endpoint.
+# The state of the bucket lives in shared memory, so the worker processes of
+# parallel_crawl.py all take their tokens from the same bucket and together
+# stay within the rate and the request budget that the endpoint allows.
+
+
+import time
+import asyncio
+import multiprocessing
+
+
+class BudgetExhausted(Exception):
+    """Raised when the maximum number of requests has been used."""
+
+
+class TokenBucket:
+    """Hands out one token per request. The bucket refills with rate tokens
+    per second up to its capacity. When max_requests is given, no more than
+    that many tokens are handed out in total."""
+
+    def __init__(self, rate, capacity=None, max_requests=None):
+        self.capacity = capacity or rate
+        self.max_requests = max_requests
+        self._rate = multiprocessing.Value('d', rate, lock=False)
+        self._tokens = multiprocessing.Value('d', self.capacity)
+        self._updated = multiprocessing.Value('d', time.time(), lock=False)
+        self._used = multiprocessing.Value('q', 0, lock=False)
+
+    @property
+    def rate(self):
+        return self._rate.value
+
+    @property
+    def used(self):
+        return self._used.value
+
+    def set_rate(self, rate):
+        """Changes the number of tokens per second."""
+        with self._tokens.get_lock():
+            self._rate.value = rate
+
+    def reserve(self):
+        """Takes one token and returns the number of seconds to wait before
+        the token may be used. Tokens that are not there yet are reserved in
+        order, so waiting requests are served first come, first served."""
+        with self._tokens.get_lock():
+            if (self.max_requests is not None and
+                    self._used.value >= self.max_requests):
+                raise BudgetExhausted('{0} requests have been used.'.format(
+                    self._used.value))
+            now = time.time()
+            tokens = min(self.capacity, self._tokens.value +
+                         (now - self._updated.value) * self._rate.value)
+            tokens -= 1
+            self._tokens.value = tokens
+            self._updated.value = now
+            self._used.value += 1
+        return 0.0 if tokens >= 0 else -tokens / self._rate.value
+
+    def acquire(self):
+        """Waits until a token may be used."""
+        wait = self.reserve()
+        if wait > 0:
+            time.sleep(wait)
+
+    async def acquire_async(self):
+        """Waits until a token may be used without blocking the event
+        loop."""
+        wait = self.reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
@@ -1,58 +1,225 @@
-#!/usr/bin/python3
-# student: J.F.P. (Richard) Scholtens
-# studentnr.: s2956586
-# datum: 25/07/2020
-# A program that removes and merges Main Topic Classifications that are
-# considered too small to work. By removing Main Topic Classifications
-# with a low frequency, one can create a more balanced dataset. By merging
-# Main Topic Classifications one can increase the size of the dataset which
-# helps improve robustness.
-
-
-import json
-
-
-def open_json(file_name):
-    """Opens a json file and returns a dictionary."""
-    with open(file_name + '.json') as file:
-        return json.load(file)
-
-
-def remove_and_merge_dictionaries(dic, remove_list, merge_list):
-    """Removes and merges keys within a dictionary. It then returns
-    the dictionary with updated keys."""
-    for merge_tup in merge_list:
-        dic[merge_tup[0] + '_&_' + merge_tup[1]] = {**dic[merge_tup[0]],
-                                                    **dic[merge_tup[1]]}
-        remove_list.append(merge_tup[0])
-        remove_list.append(merge_tup[1])
-
-    for remove in remove_list:
-        dic.pop(remove, None)
-
-    return dic
-
-
-def main():
-    keys = ['Category:Concepts',
-            'Category:Mind',
-            'Category:Objects',
-            'Category:Organizations',
-            'Category:People',
-            'Category:Policy']
-    merge = [('Category:History', 'Category:Events')]
-    mtc = open_json('dataset_range2_strategy3_NL')
-
-    dictionary = remove_and_merge_dictionaries(mtc, keys, merge)
-
-    print('INCLUDED MAIN TOPIC CLASSIFICATIONS:\n')
-    for label in dictionary.keys():
-        print(label)
-    print('\nTOTAL LABELS: {0}'.format(len(dictionary)))
-
-    with open('dataset_range_strategy3_NL_merged.json', 'w') as file:
-        json.dump(dic, file)
-
-
-if __name__ == '__main__':
-    main()
+#!/usr/bin/python3
+# student: J.F.P. (Richard) Scholtens
+# studentnr.: s2956586
+# datum: 25/07/2020
+# A program that removes and merges Main Topic Classifications that are
+# considered too small to work. By removing Main Topic Classifications
+# with a low frequency, one can create a more balanced dataset. By merging
+# Main Topic Classifications one can increase the size of the dataset which
+# helps improve robustness. The dataset is streamed record by record (see
+# dataset_records.py), so it never has to fit in memory.
+#
+# The changes to the labels are read from a JSON file, mtc_relabel.json:
+#
+# {"rename": {"Category:Old": "Category:New"},
+#  "merge": [["Category:History", "Category:Events"],
+#            {"into": "Category:Society", "labels": ["Category:A", "B"]}],
+#  "drop": ["Category:Concepts"],
+#  "min_frequency": 100}
+#
+# The labels are first renamed, then merged (a merge without name gets the
+# names joined by _&_), then dropped, and finally the labels that are left
+# with fewer than min_frequency records are dropped as well. The same
+# changes can also be applied to Flair files that were already written, so
+# trying another set of labels does not need the pre-processing again.
+#
+# Usage: python3 remove_merge_mtcs.py [CONFIG.json]
+#        python3 remove_merge_mtcs.py CONFIG.json FLAIR_PREFIX OUTPUT_PREFIX
+
+
+import sys
+import json
+import hashlib
+from dataset_records import read_records, RecordWriter, abstract_digest
+from dataset_split import split_file_names
+from flair_corpus import FlairFile
+
+
+CONFIG_KEYS = ('rename', 'merge', 'drop', 'min_frequency')
+LABEL_PREFIX = '__label__'
+
+
+def load_config(file_name):
+    """Reads a relabel configuration and fills in the missing keys."""
+    with open(file_name) as file:
+        config = json.load(file)
+    unknown = set(config) - set(CONFIG_KEYS)
+    if unknown:
+        raise ValueError('UNKNOWN KEYS IN {0}: {1}'.format(
+            file_name, ', '.join(sorted(unknown))))
+    return {'rename': config.get('rename', {}),
+            'merge': config.get('merge', []),
+            'drop': config.get('drop', []),
+            'min_frequency': config.get('min_frequency', 0)}
+
+
+def merge_groups(config):
+    """Returns the name and the labels of every merge of a
+    configuration."""
+    groups = []
+    for merge in config['merge']:
+        if isinstance(merge, dict):
+            groups.append((merge['into'], merge['labels']))
+        else:
+            groups.append(('_&_'.join(merge), merge))
+    return groups
+
+
+def label_mapping(config, frequencies=None):
+    """Returns a dictionary with the new name of every label that changes
+    and None for every label that is removed. Labels that are not in the
+    dictionary stay as they are. For min_frequency the frequencies of the
+    original labels are needed."""
+    mapping = dict(config['rename'])
+    for name, labels in merge_groups(config):
+        for label in labels:
+            for old, new in list(mapping.items()):
+                if new == label:
+                    mapping[old] = name
+            mapping.setdefault(label, name)
+    for label in config['drop']:
+        for old, new in list(mapping.items()):
+            if new == label:
+                mapping[old] = None
+        mapping[label] = None
+
+    if config['min_frequency'] and frequencies is not None:
+        counts = {}
+        for label, frequency in frequencies.items():
+            new = mapping.get(label, label)
+            if new is not None:
+                counts[new] = counts.get(new, 0) + frequency
+        small = {label for label, count in counts.items()
+                 if count < config['min_frequency']}
+        for label in frequencies:
+            if mapping.get(label, label) in small:
+                mapping[label] = None
+    return mapping
+
+
+def topic_frequencies(file_name):
+    """Returns the number of records of every topic of a dataset."""
+    frequencies = {}
+    for record in read_records(file_name):
+        frequencies[record['topic']] = frequencies.get(record['topic'], 0) + 1
+    return frequencies
+
+
+def relabel_records(records, mapping):
+    """Changes the topics of a stream of records in place. A record of a
+    removed topic is left out, and so is a record whose abstract already
+    has the new topic through a record of another original topic, which
+    happens when two merged topics share an abstract, whichever of them
+    comes first. Every kept abstract and new topic is remembered with the
+    original topic of its first record."""
+    seen = {}
+    for record in records:
+        topic = mapping.get(record['topic'], record['topic'])
+        if topic is None:
+            continue
+        key = (abstract_digest(record['abstract']), topic)
+        if seen.setdefault(key, record['topic']) != record['topic']:
+            continue
+        record['topic'] = topic
+        yield record
+
+
+def relabel_dataset(file_name, output_name, config):
+    """Applies a relabel configuration to a dataset file and returns the
+    number of records of every topic that is left."""
+    frequencies = (topic_frequencies(file_name)
+                   if config['min_frequency'] else None)
+    mapping = label_mapping(config, frequencies)
+    labels = {}
+    with RecordWriter(output_name) as writer:
+        for record in relabel_records(read_records(file_name), mapping):
+            labels[record['topic']] = labels.get(record['topic'], 0) + 1
+            writer.write(record)
+    return labels
+
+
+def relabel_line(line, mapping):
+    """Returns a line of a Flair file with its labels changed, or None if
+    none of its labels are left."""
+    field, text = line.split('\t', 1)
+    labels = []
+    for label in field.split():
+        label = mapping.get(label[len(LABEL_PREFIX):],
+                            label[len(LABEL_PREFIX):])
+        if label is not None and LABEL_PREFIX + label not in labels:
+            labels.append(LABEL_PREFIX + label)
+    if not labels:
+        return None
+    return ' '.join(labels) + '\t' + text
+
+
+def relabel_flair_files(file_names, output_names, config):
+    """Applies a relabel configuration to Flair files, for example the
+    training, development and test file, with one mapping for all files.
+    The frequencies for min_frequency are the number of lines of every label
+    in all files, read from their indexes (see flair_corpus.py). Lines that
+    become the same as an earlier line of their file are left out. Returns
+    the number of lines of every label that is left."""
+    frequencies = {}
+    if config['min_frequency']:
+        for file_name in file_names:
+            with FlairFile(file_name) as flair_file:
+                for label, count in flair_file.label_counts().items():
+                    label = label[len(LABEL_PREFIX):]
+                    frequencies[label] = frequencies.get(label, 0) + count
+    mapping = label_mapping(config, frequencies)
+    labels = {}
+    for file_name, output_name in zip(file_names, output_names):
+        seen = set()
+        with open(file_name) as file, open(output_name, 'w') as output:
+            for line in file:
+                if '\t' not in line:
+                    continue
+                new = relabel_line(line, mapping)
+                if new is None:
+                    continue
+                if new != line:
+                    # A digest of the line, so the memory does not grow
+                    # with the length of the texts.
+                    digest = hashlib.blake2b(new.encode('utf-8'),
+                                             digest_size=16).digest()
+                    if digest in seen:
+                        continue
+                    seen.add(digest)
+                for label in new.split('\t', 1)[0].split():
+                    labels[label] = labels.get(label, 0) + 1
+                output.write(new)
+    return labels
+
+
+def print_labels(labels):
+    print('INCLUDED MAIN TOPIC CLASSIFICATIONS:\n')
+    for label, frequency in labels.items():
+        print('{0:40}{1}'.format(label, frequency))
+    print('\nTOTAL LABELS: {0}'.format(len(labels)))
+
+
+def main():
+    config = load_config(sys.argv[1] if len(sys.argv) > 1
+                         else 'mtc_relabel.json')
+    if len(sys.argv) == 4:
+        # Relabels the training, development and test file of a prefix,
+        # for example flair to flair_merged.
+        file_names = split_file_names(sys.argv[2])
+        output_names = split_file_names(sys.argv[3])
+        print_labels(relabel_flair_files(
+            [file_names[split] for split in file_names],
+            [output_names[split] for split in file_names], config))
+        return
+
+    # The language of the dataset shard, see the languages of
+    # retrieve_information.main().
+    language = 'NL'
+    print_labels(relabel_dataset(
+        'dataset_range2_strategy3_{0}.jsonl.gz'.format(language),
+        'dataset_range_strategy3_{0}_merged.jsonl.gz'.format(language),
+        config))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,213 @@
+#!/usr/bin/python3
+# student: J.F.P. (Richard) Scholtens
+# studentnr.: s2956586
+# datum: 18/10/2026
+# Schedules the requests of the asynchronous engine in sparql_engine.py.
+# A throttled or failing endpoint should slow the crawl down instead of
+# silently dropping parts of the category graph. The scheduler therefore:
+#
+# - takes a token from a token bucket (rate_limit.py) for every request;
+# - adapts the number of requests in flight and the request rate to the
+#   observed latency and to HTTP 429/503 responses;
+# - retries failed requests with jittered exponential backoff and honours
+#   the Retry-After header;
+# - stops sending requests for a while after many failures in a row
+#   (circuit breaker) and then lets one probe request through;
+# - keeps a list of the queries that were lost after all retries, which can
+#   be written to a report.
+
+
+import json
+import time
+import random
+import asyncio
+import aiohttp
+from rate_limit import TokenBucket
+
+
+# HTTP statuses that mean the endpoint wants us to slow down.
+THROTTLE_STATUSES = {429, 503}
+
+
+def describe_error(error):
+    """Returns a short description of a failed request for the report."""
+    if isinstance(error, aiohttp.ClientResponseError):
+        return 'HTTP {0} {1}'.format(error.status, error.message)
+    return '{0}: {1}'.format(type(error).__name__, error)
+
+
+class CircuitBreaker:
+    """Opens after threshold failures in a row. While open, requests wait
+    until the cooldown has passed. Then one request is let through as a
+    probe: if it succeeds the breaker closes, otherwise it opens again."""
+
+    def __init__(self, threshold=5, cooldown=30.0):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.open_until = 0.0
+        self.probing = False
+        self.opened = 0
+
+    async def wait(self):
+        """Waits until a request may be sent."""
+        while self.failures >= self.threshold:
+            now = time.monotonic()
+            if now < self.open_until:
+                await asyncio.sleep(self.open_until - now)
+            elif not self.probing:
+                self.probing = True
+                return
+            else:
+                await asyncio.sleep(0.1)
+
+    def success(self):
+        self.failures = 0
+        self.probing = False
+
+    def failure(self):
+        self.failures += 1
+        self.probing = False
+        if self.failures >= self.threshold:
+            if self.failures == self.threshold:
+                self.opened += 1
+            self.open_until = time.monotonic() + self.cooldown
+
+
+class RequestScheduler:
+    """Runs requests under a token bucket, an adaptive concurrency limit,
+    retries and a circuit breaker. The concurrency grows by one request per
+    window of successful requests that are faster than the target latency
+    and is halved on throttling; the rate of the token bucket follows the
+    same pattern between min_rate and max_rate."""
+
+    def __init__(self, bucket=None, min_concurrency=1, max_concurrency=32,
+                 target_latency=2.0, min_rate=0.5, max_rate=None,
+                 max_retries=6, base_delay=0.5, max_delay=60.0,
+                 breaker=None):
+        self.bucket = bucket if bucket is not None else TokenBucket(10.0)
+        self.min_concurrency = min_concurrency
+        self.max_concurrency = max_concurrency
+        self.concurrency = float(max(min_concurrency, max_concurrency // 2))
+        self.target_latency = target_latency
+        self.min_rate = min_rate
+        self.max_rate = max_rate or self.bucket.rate
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.breaker = breaker if breaker is not None else CircuitBreaker()
+        self.in_flight = 0
+        self.condition = None
+        self.requests = 0
+        self.retries = 0
+        self.throttled = 0
+        self.lost = []
+
+    async def _enter(self):
+        if self.condition is None:
+            self.condition = asyncio.Condition()
+        async with self.condition:
+            await self.condition.wait_for(
+                lambda: self.in_flight < int(self.concurrency))
+            self.in_flight += 1
+
+    async def _leave(self):
+        async with self.condition:
+            self.in_flight -= 1
+            self.condition.notify_all()
+
+    def _speed_up(self, latency):
+        if latency <= self.target_latency:
+            self.concurrency = min(self.max_concurrency,
+                                   self.concurrency + 1 / self.concurrency)
+            rate = self.bucket.rate
+            if rate < self.max_rate:
+                self.bucket.set_rate(min(self.max_rate, rate * 1.01))
+        else:
+            self.concurrency = max(self.min_concurrency,
+                                   self.concurrency * 0.9)
+
+    def _slow_down(self):
+        self.throttled += 1
+        self.concurrency = max(self.min_concurrency, self.concurrency / 2)
+        self.bucket.set_rate(max(self.min_rate, self.bucket.rate / 2))
+
+    def _backoff(self, attempt, retry_after=None):
+        """Returns the delay before the next attempt: a random delay between
+        zero and the exponential backoff, but never less than the
+        Retry-After of the endpoint."""
+        delay = random.uniform(0, min(self.max_delay,
+                                      self.base_delay * 2 ** attempt))
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+        return delay
+
+    async def run(self, query, request):
+        """Runs request(query) and returns its result. Returns None if the
+        query was lost after all retries."""
+        for attempt in range(self.max_retries + 1):
+            await self.breaker.wait()
+            await self.bucket.acquire_async()
+            await self._enter()
+            self.requests += 1
+            start = time.monotonic()
+            try:
+                results = await request(query)
+            except (aiohttp.ClientError, asyncio.TimeoutError,
+                    ValueError) as error:
+                await self._leave()
+                self.breaker.failure()
+                status = getattr(error, 'status', None)
+                retry_after = None
+                if status in THROTTLE_STATUSES:
+                    self._slow_down()
+                    headers = getattr(error, 'headers', None) or {}
+                    try:
+                        retry_after = float(headers.get('Retry-After'))
+                    except (TypeError, ValueError):
+                        retry_after = None
+                retryable = status is None or status in THROTTLE_STATUSES \
+                    or status >= 500
+                if not retryable or attempt == self.max_retries:
+                    self.lost.append({'query': query,
+                                      'status': status,
+                                      'error': describe_error(error),
+                                      'attempts': attempt + 1})
+                    return None
+                self.retries += 1
+                await asyncio.sleep(self._backoff(attempt, retry_after))
+                continue
+            await self._leave()
+            self.breaker.success()
+            self._speed_up(time.monotonic() - start)
+            return results
+
+    def take_lost(self):
+        """Returns the lost queries and empties the list."""
+        lost, self.lost = self.lost, []
+        return lost
+
+    def statistics(self):
+        """Prints and returns the statistics of the scheduler."""
+        print('REQUESTS: {0}'.format(self.requests))
+        print('RETRIES: {0}'.format(self.retries))
+        print('THROTTLED: {0}'.format(self.throttled))
+        print('CIRCUIT BREAKER OPENED: {0}'.format(self.breaker.opened))
+        print('CONCURRENCY: {0:.1f}'.format(self.concurrency))
+        print('RATE: {0:.2f} REQUESTS PER SECOND'.format(self.bucket.rate))
+        print('LOST QUERIES: {0}\n'.format(len(self.lost)))
+        return {'requests': self.requests,
+                'retries': self.retries,
+                'throttled': self.throttled,
+                'breaker_opened': self.breaker.opened,
+                'concurrency': self.concurrency,
+                'rate': self.bucket.rate,
+                'lost': len(self.lost)}
+
+
+def write_lost_report(lost, file_name='lost_queries.json'):
+    """Writes the queries that were lost after all retries to a JSON
+    file."""
+    with open(file_name, 'w') as file:
+        json.dump(lost, file, indent=1, ensure_ascii=False)
+    print('{0} LOST QUERIES WRITTEN TO {1}\n'.format(len(lost), file_name))
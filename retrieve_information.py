@@ -1,459 +1,733 @@
-#!/usr/bin/python3
-# student: J.F.P. (Richard) Scholtens
-# studentnr.: s2956586
-# datum: 08/08/2020
-# This program retrieves information about Wikipedia's Main Topic
-# Classification articles by using four different collection strategies.
-# Information is retrieved using SPARQL-queries to extract Dutch abstract data
-# per article from DBpedia. All information retrieved is then converted to a
-# JSON file.
-
-
-from SPARQLWrapper import SPARQLWrapper, JSON
-import json
-from collections import defaultdict
-
-
-def get_categories():
-    """Includes all 41 Main Topic Classifications (MTC) that has subcategories
-    and returns a list of categories."""
-    categories = ["Category:Academic_disciplines",
-                  "Category:Business",
-                  "Category:Concepts",
-                  "Category:Crime",
-                  "Category:Culture",
-                  "Category:Economy",
-                  "Category:Education",
-                  "Category:Energy",
-                  "Category:Engineering",
-                  "Category:Entertainment",
-                  "Category:Events",
-                  "Category:Food_and_drink",
-                  "Category:Geography",
-                  "Category:Government",
-                  "Category:Health",
-                  "Category:History",
-                  "Category:Human_behavior",
-                  "Category:Humanities",
-                  "Category:Industry",
-                  "Category:Knowledge",
-                  "Category:Language",
-                  "Category:Law",
-                  "Category:Life",
-                  "Category:Mass_media",
-                  "Category:Mathematics",
-                  "Category:Military",
-                  "Category:Mind",
-                  "Category:Music",
-                  "Category:Nature",
-                  "Category:Objects",
-                  "Category:Organizations",
-                  "Category:People",
-                  "Category:Philosophy",
-                  "Category:Policy",
-                  "Category:Politics",
-                  "Category:Religion",
-                  "Category:Science",
-                  "Category:Society",
-                  "Category:Sports",
-                  "Category:Technology",
-                  # "Category:Universe", THIS ONE DOES NOT HOLD ANY CATEGORIES
-                  "Category:World"]
-    return categories
-
-
-def get_statistics(sample):
-    """Prints the frequency, sum, mean, standard deviation,
-    variance and margin of error. It then returns these values,
-    including two range points for the margin of error."""
-    frequency = len(sample)
-    total_sum = sum(sample)
-    mean = round(np.mean(sample))
-    sd = round(statistics.stdev(sample))
-    var = round(statistics.variance(sample))
-    range_1 = mean - sd
-    range_2 = mean + sd
-
-    print('FREQUENCY SAMPLES: {0}'.format(frequency))
-    print('SUM OF ALL SAMPLES: {0}'.format(total_sum))
-    print('MEAN: {0}'.format(mean))
-    print('STANDARD DEVIATION: {0}'.format(sd))
-    print('VARIANCE: {0}'.format(var))
-
-    return frequency, total_sum, mean, sd, var, range_1, range_2
-
-
-def retrieve_info(ent, query, abstract=False):
-    """This function returns a set of values according to the given query.
-    If the value is a hyperlink, it slices the last part as
-    and stores it as the value."""
-    sparql = SPARQLWrapper("http://dbpedia.org/sparql")
-    sparql.setQuery(query)
-    sparql.setReturnFormat(JSON)
-    results = sparql.query().convert()
-    values = set()
-    for result in results["results"]["bindings"]:
-        value = result["value"]["value"]
-        if not abstract:
-            value = value.rsplit('/', 1)[-1]
-        values.add(value)
-    return values
-
-
-def collect_is_skos_broader_of(entity):
-    """Creates a SPARQL-query using the following DBpedia property:
-
-        is skos:broader of
-
-        It then returns a list with the information.
-    """
-
-    query = """SELECT * WHERE { <http://dbpedia.org/resource/%s>
-                     ^skos:broader
-                    ?value .}""" % entity
-    info = retrieve_info(entity, query)
-    return info
-
-
-def collect_is_subject_of(entity):
-    """Creates a SPARQL-query using the following DBpedia property:
-
-        is dct:subject of
-
-        It then returns a list with the information.
-    """
-
-    query = """SELECT * WHERE { <http://dbpedia.org/resource/%s>
-            ^<http://purl.org/dc/terms/subject>
-            ?value .}""" % entity
-    info = retrieve_info(entity, query)
-    return info
-
-
-def collect_dbo_abstract(entity):
-    """Creates a SPARQL-query using the following DBpedia property:
-
-        dbo:abstract
-
-        It then returns a list with the information.
-    """
-    query = """SELECT * WHERE { <http://dbpedia.org/resource/%s>
-        <http://dbpedia.org/ontology/abstract> ?value .
-        FILTER langMatches(lang(?value),'nl')}""" % entity
-    info = retrieve_info(entity, query, True)
-    return info
-
-
-def collect_dct_subject(entity):
-    """Creates a SPARQL-query using the following DBpedia property:
-
-        dct:subject
-
-        It then returns a list with the information.
-    """
-    query = """SELECT * WHERE { <http://dbpedia.org/resource/%s>
-      <http://purl.org/dc/terms/subject>
-      ?value .}""" % entity
-    info = retrieve_info(entity, query)
-    return info
-
-
-def check_range(counter, maximum_range):
-    """Checks if the counter is equal to the maximum range.
-    The function then returns a boolean accordingly with True or False."""
-    if counter == maximum_range:
-        print("ENOUGH INFORMATION HAS BEEN GATHERED.\n")
-        return True
-    else:
-        return False
-
-
-def check_size(dictionary, minimum_range=0):
-    """Shows how the data is distributed and checks it meets the minimum
-    range."""
-    print('CHECKING ENTITY FREQUENCY PER TOPIC.')
-    print('MUST BE HIGHER THAN MINIMUM RANGE OF: {0}\n'.format(minimum_range))
-    counter = 0
-    print("{0:30}{1:30}{2:30}\n".format('TOPIC:', 'FREQUENCY:', 'RESULT:'))
-    for topic, cat in dictionary.items():
-        for category, entities in cat.items():
-            for entity, abstract in entities.items():
-                counter += 1
-        if counter >= minimum_range:
-            result = 'SUCCESS'
-        else:
-            result = 'FAILURE'
-        print("{0:30}{1:<30}{2:<30}".format(topic, counter, result))
-        counter = 0
-
-
-def collection_strategy1(topic, dic, counter, max_range=99999999):
-    """Retrieves abstracts of all entities of a specific
-    category of the main topic classification and returns a dictionary
-    with the following architecture:
-
-    dictionary[topic][category][entity] = abstract
-
-    Returns a dictionary and a boolean to see if enough entities were
-    collected.
-
-    MTC topic -> is skos:broader of -> category -> is dct:subject of -> entity
-    -> dbo:abstract -> abstract
-
-    """
-    print("START COLLECTION STRATEGY 1.")
-    print("TOPIC:\t{0}".format(topic))
-
-    info = collect_is_skos_broader_of(topic)
-
-    for category in list(info):
-
-        print("SUBCATEGORY:\t{0}\n".format(category))
-
-        entities = collect_is_subject_of(category)
-
-        for entity in entities:
-
-            if check_range(counter, max_range):
-                return dic, True, counter
-
-            abstracts = collect_dbo_abstract(entity)
-            for abstract in abstracts:
-                print("ENTITY: {0}\n".format(entity))
-                print("ABSTRACT: {0}\n\n".format(abstract))
-                dic[topic][category][entity] = abstract
-                counter += 1
-
-    print("MORE INFORMATION MUST BE RETRIEVED FOR THIS TOPIC.")
-    return dic, False, counter
-
-
-def collection_strategy2(topic, dic, counter, max_range=99999999):
-    """Retrieves abstracts of all entities of a specific
-    category of the main topic classification and returns a dictionary
-    with the following architecture:
-
-    dictionary[topic][category][entity] = abstract
-
-    Returns a dictionary and a boolean to see if enough entities were
-    collected.
-
-    MTC topic -> is skos:broader -> category -> is dct:subject of -> entity
-    -> is skos:broader of -> category -> is dct:subject of -> entity
-    -> dbo:abstract -> abstract
-    """
-
-    print("START COLLECTION STRATEGY 2.")
-    print("TOPIC:\t{0}".format(topic))
-
-    info = collect_is_skos_broader_of(topic)
-
-    for higher_category in list(info):
-        print("SUBCATEGORY:\t{0}\n".format(higher_category))
-        higher_entities = collect_is_subject_of(higher_category)
-        for high_entity in higher_entities:
-            print("HIGHER ENTITY: {0}\n".format(high_entity))
-            try:
-                info = collect_is_skos_broader_of(high_entity)
-                for lower_category in list(info):
-                    if lower_category not in higher_category.keys():
-                        print("SUBCATEGORY:\t{0}\n".format(lower_category))
-                        lower_entities = collect_is_subject_of(lower_category)
-
-                        for low_entity in lower_entities:
-
-                            if check_range(counter, max_range):
-                                return dic, True, counter
-
-                            abstracts = collect_dbo_abstract(low_entity)
-                            for abstract in abstracts:
-                                print("LOWER ENTITY: {0}\n".format(low_entity))
-                                print("ABSTRACT: {0}\n\n".format(abstract))
-                                dic[topic][lower_category][entity2] = abstract
-                                counter += 1
-            except:
-               pass
-
-    print("MORE INFORMATION MUST BE RETRIEVED FOR THIS TOPIC.")
-    return dic, False, counter
-
-
-def collection_strategy3(topic, dic, counter, max_range):
-    """Retrieves abstracts of all entities of a specific
-    category of the main topic classification and returns a dictionary
-    with the following architecture:
-
-    dictionary[topic][category][entity] = abstract
-
-    Returns a dictionary and a boolean to see if enough entities were
-    collected.
-
-    MTC topic -> is dct:subject of -> relational entity -> dbo:abstract
-    -> abstract
-    """
-    print("START COLLECTION STRATEGY 3.")
-    print("TOPIC:\t{0}".format(topic))
-
-    info = collect_is_subject_of(topic)
-    categories = get_categories()
-
-    category_dic = dic[topic]
-    entities = category_dic.values()
-
-    for entity in list(info):
-        if check_range(counter, max_range):
-            return dic, True, counter
-
-        if entity not in entities:
-
-            abstracts = collect_dbo_abstract(entity)
-
-            for abstract in abstracts:
-                print("RELATIONAL ENTITY: {0}\n".format(entity))
-                print("ABSTRACT: {0}\n\n".format(abstract))
-                replace_category = entity + '_' + str(counter)
-                dic[topic][replace_category][entity] = abstract
-                counter += 1
-
-    print("MORE INFORMATION MUST BE RETRIEVED FOR THIS TOPIC.")
-    return dic, False, counter
-
-
-def collection_strategy4(topic, dic, counter, max_range):
-    """Retrieves abstracts of all entities of a specific
-    category of the main topic classification and returns a dictionary
-    with the following architecture:
-
-    dictionary[topic][category][entity] = abstract
-
-    Returns a dictionary and a boolean to see if enough entities were
-    collected.
-
-    MTC topic -> is dct:subject of -> relational entity -> dct:subject
-    -> supercategory -> is dct:subject of -> entity -> dbo:abstract -> abstract
-    """
-    print("START COLLECTION STRATEGY 4.")
-    print("TOPIC:\t{0}".format(topic))
-
-    info = collect_is_subject_of(topic)
-    categories = get_categories()
-
-    category_dic = dic[topic]
-    old_entities = category_dic.values()
-
-    for relational_entity in list(info):
-        print("RELATIONAL ENTITY: {0}\n".format(relational_entity))
-        relational_entities = collect_dct_subject(relational_entity)
-
-        for subject in relational_entities:
-            print("SUPERCATEGORY: {0}\n".format(subject))
-
-            if subject not in old_entities and subject not in categories:
-
-                entities = collect_is_subject_of(subject)
-
-                for entity in entities:
-
-                    if check_range(counter, max_range):
-                        return dic, True, counter
-                    try:
-                        abstracts = collect_dbo_abstract(entity)
-                        for abstract in abstracts:
-                            print("ENTITY: {0}\n".format(entity))
-                            print("ABSTRACT: {0}\n\n".format(abstract))
-                            dic[topic][subject][entity] = abstract
-                            counter += 1
-                    except:
-                        pass
-
-    print("MORE INFORMATION MUST BE RETRIEVED FOR THIS TOPIC.")
-    return dic, False, counter
-
-
-def main():
-    # The sample frequencies below were retrieved without using
-    # a margin error range going through the classifications in the for loop.
-    # sample = sorted([235,
-                        # 511,
-                        # 61,
-                        # 238,
-                        # 365,
-                        # 119,
-                        # 326,
-                        # 184,
-                        # 130,
-                        # 346,
-                        # 77,
-                        # 229,
-                        # 225,
-                        # 447,
-                        # 361,
-                        # 239,
-                        # 595,
-                        # 489,
-                        # 360,
-                        # 295,
-                        # 247,
-                        # 124,
-                        # 98,
-                        # 105,
-                        # 192,
-                        # 95,
-                        # 70,
-                        # 175,
-                        # 130,
-                        # 41,
-                        # 64,
-                        # 50,
-                        # 107,
-                        # 31,
-                        # 311,
-                        # 337,
-                        # 258,
-                        # 177,
-                        # 174,
-                        # 220,
-                        # 99])
-
-    # freq, sum, mean, sd, var, min_range, max_range = get_statistics(sample)
-    # Range has been set by using the commented code above.
-    min_range = 79
-    max_range = 357
-
-    classifications = get_categories()
-    dic = defaultdict(lambda: defaultdict(lambda: defaultdict(str)))
-
-    print("MARGIN OF ERROR RANGE: {0} - {1}\n".format(min_range, max_range))
-
-    for classification in classifications:
-        classification = classification.strip()
-
-        dic, check, counter = collection_strategy1(classification,
-                                                   dic,
-                                                   0,
-                                                   max_range)
-        if not check:
-            dic, check, counter = collection_strategy2(classification,
-                                                       dic,
-                                                       counter,
-                                                       max_range)
-            if not check:
-                dic, check, counter = collection_strategy3(classification,
-                                                           dic,
-                                                           counter,
-                                                           max_range)
-
-                if not check:
-                    dic, check, counter = collection_strategy4(classification,
-                                                               dic,
-                                                               counter,
-                                                               max_range)
-
-    check_size(dic, min_range)
-
-    with open('dataset_max_range_357_all_strategies_NL.json', 'w') as fp:
-        json.dump(dic, fp)
-
-
-if __name__ == '__main__':
-    main()
+#!/usr/bin/python3
+# student: J.F.P. (Richard) Scholtens
+# studentnr.: s2956586
+# datum: 08/08/2020
+# This program retrieves information about Wikipedia's Main Topic
+# Classification articles by using four different collection strategies.
+# Information is retrieved using SPARQL-queries to extract Dutch abstract data
+# per article from DBpedia. All information retrieved is then written to a
+# record file with one JSON record per abstract (see dataset_records.py).
+
+
+from SPARQLWrapper import SPARQLWrapper, JSON
+import hashlib
+from itertools import islice
+from sparql_cache import SPARQLCache
+from dbpedia_index import DBpediaIndex
+from graph_memo import GraphMemo
+from crawl_planner import CrawlPlanner, write_cost_report
+from dataset_records import write_language_shards
+from language_abstracts import MultiLanguageEngine
+from crawl_checkpoint import (CheckpointLog, CheckpointedDataset,
+                              ReplayEngine, replay_log)
+from sparql_engine import AsyncSPARQLEngine
+from request_scheduler import RequestScheduler, write_lost_report
+from rate_limit import TokenBucket
+from sparql_queries import (DBPEDIA_ENDPOINT, ABSTRACT_KINDS, BATCH_SIZES,
+                            PAGE_SIZE, build_batch_query, split_batches,
+                            is_truncated, parse_values, parse_batch_values,
+                            iterate_pages)
+
+
+def get_categories():
+    """Includes all 41 Main Topic Classifications (MTC) that has subcategories
+    and returns a list of categories."""
+    categories = ["Category:Academic_disciplines",
+                  "Category:Business",
+                  "Category:Concepts",
+                  "Category:Crime",
+                  "Category:Culture",
+                  "Category:Economy",
+                  "Category:Education",
+                  "Category:Energy",
+                  "Category:Engineering",
+                  "Category:Entertainment",
+                  "Category:Events",
+                  "Category:Food_and_drink",
+                  "Category:Geography",
+                  "Category:Government",
+                  "Category:Health",
+                  "Category:History",
+                  "Category:Human_behavior",
+                  "Category:Humanities",
+                  "Category:Industry",
+                  "Category:Knowledge",
+                  "Category:Language",
+                  "Category:Law",
+                  "Category:Life",
+                  "Category:Mass_media",
+                  "Category:Mathematics",
+                  "Category:Military",
+                  "Category:Mind",
+                  "Category:Music",
+                  "Category:Nature",
+                  "Category:Objects",
+                  "Category:Organizations",
+                  "Category:People",
+                  "Category:Philosophy",
+                  "Category:Policy",
+                  "Category:Politics",
+                  "Category:Religion",
+                  "Category:Science",
+                  "Category:Society",
+                  "Category:Sports",
+                  "Category:Technology",
+                  # "Category:Universe", THIS ONE DOES NOT HOLD ANY CATEGORIES
+                  "Category:World"]
+    return categories
+
+
+def get_statistics(sample):
+    """Prints the frequency, sum, mean, standard deviation,
+    variance and margin of error. It then returns these values,
+    including two range points for the margin of error."""
+    frequency = len(sample)
+    total_sum = sum(sample)
+    mean = round(np.mean(sample))
+    sd = round(statistics.stdev(sample))
+    var = round(statistics.variance(sample))
+    range_1 = mean - sd
+    range_2 = mean + sd
+
+    print('FREQUENCY SAMPLES: {0}'.format(frequency))
+    print('SUM OF ALL SAMPLES: {0}'.format(total_sum))
+    print('MEAN: {0}'.format(mean))
+    print('STANDARD DEVIATION: {0}'.format(sd))
+    print('VARIANCE: {0}'.format(var))
+
+    return frequency, total_sum, mean, sd, var, range_1, range_2
+
+
+def retrieve_results(query, cache=None):
+    """Returns the SPARQL JSON result of a query. If a cache is given the
+    query is only sent to DBpedia when it is not in the cache."""
+    results = cache.get(query) if cache is not None else None
+    if results is None:
+        sparql = SPARQLWrapper(DBPEDIA_ENDPOINT)
+        sparql.setQuery(query)
+        sparql.setReturnFormat(JSON)
+        results = sparql.query().convert()
+        if cache is not None:
+            cache.put(query, results)
+    return results
+
+
+def retrieve_info(ent, query, abstract=False, cache=None):
+    """This function returns a set of values according to the given query.
+    If the value is a hyperlink, it slices the last part as
+    and stores it as the value."""
+    return parse_values(retrieve_results(query, cache), abstract)
+
+
+def retrieve_batch(kind, entities, cache=None):
+    """Collects one DBpedia property for a batch of entities with one
+    VALUES-query and returns a list of sets in the same order as the
+    entities. If the endpoint cut off the result, the batch is split in two
+    and both halves are asked again. A single entity with too many values is
+    paged through instead."""
+    results = retrieve_results(build_batch_query(kind, entities), cache)
+    if is_truncated(results):
+        if len(entities) > 1:
+            middle = len(entities) // 2
+            return (retrieve_batch(kind, entities[:middle], cache) +
+                    retrieve_batch(kind, entities[middle:], cache))
+        return [set(stream_values(kind, entities[0], cache=cache))]
+    return parse_batch_values(results, entities, kind in ABSTRACT_KINDS)
+
+
+def stream_values(kind, entity, engine=None, page_size=PAGE_SIZE,
+                  cache=None):
+    """Yields the values of one DBpedia property of an entity in sorted
+    order. The values are retrieved one page at a time and the next page is
+    only asked for when the previous one has been used, so a strategy that
+    stops early does not download the rest of a large category."""
+    if engine is None:
+        return iterate_pages(lambda query: retrieve_results(query, cache),
+                             kind, entity, page_size)
+    return engine.stream(kind, entity, page_size)
+
+
+def collect_many(kind, entities, engine=None):
+    """Collects one DBpedia property for a list of entities and returns a
+    list of sets in the same order as the entities. The entities are looked
+    up in batches. Without an engine the batches run one at a time,
+    otherwise the engine runs them concurrently. The kind is one of the
+    queries in sparql_queries.BATCH_QUERIES."""
+    if engine is None:
+        values = []
+        for batch in split_batches(kind, entities):
+            values.extend(retrieve_batch(kind, batch))
+        return values
+    return engine.collect(kind, entities)
+
+
+def collect_dbo_abstract_batch(entities, engine=None):
+    """Collects the dbo:abstract of a list of entities with batched
+    queries and returns a dictionary with the entity as key and a set of
+    abstracts as value."""
+    return dict(zip(entities, collect_many('dbo_abstract', entities,
+                                           engine)))
+
+
+def collect_is_subject_of_batch(entities, engine=None):
+    """Collects the entities that have one of the given categories as
+    dct:subject with batched queries and returns a dictionary with the
+    category as key and a set of entities as value."""
+    return dict(zip(entities, collect_many('is_subject_of', entities,
+                                           engine)))
+
+
+def collect_dct_subject_batch(entities, engine=None):
+    """Collects the dct:subject of a list of entities with batched queries
+    and returns a dictionary with the entity as key and a set of categories
+    as value."""
+    return dict(zip(entities, collect_many('dct_subject', entities,
+                                           engine)))
+
+
+def collect_is_skos_broader_of(entity, engine=None):
+    """Creates a SPARQL-query using the following DBpedia property:
+
+        is skos:broader of
+
+        It then returns a list with the information.
+    """
+    return collect_many('is_skos_broader_of', [entity], engine)[0]
+
+
+def collect_is_subject_of(entity, engine=None):
+    """Creates a SPARQL-query using the following DBpedia property:
+
+        is dct:subject of
+
+        It then returns a list with the information.
+    """
+    return collect_many('is_subject_of', [entity], engine)[0]
+
+
+def collect_dbo_abstract(entity, engine=None):
+    """Creates a SPARQL-query using the following DBpedia property:
+
+        dbo:abstract
+
+        It then returns a list with the information.
+    """
+    return collect_many('dbo_abstract', [entity], engine)[0]
+
+
+def collect_dct_subject(entity, engine=None):
+    """Creates a SPARQL-query using the following DBpedia property:
+
+        dct:subject
+
+        It then returns a list with the information.
+    """
+    return collect_many('dct_subject', [entity], engine)[0]
+
+
+def iterate_abstracts(entities, remaining, engine=None):
+    """Yields every entity together with its set of abstracts, in the order
+    of the given entities. The abstracts are collected with batched queries
+    in windows that are as large as the remaining quota, which is given as a
+    function, so the same entities are selected as when every abstract is
+    asked for separately. The entities can be a stream, of which only as
+    many entities are taken as are needed."""
+    entities = iter(entities)
+    while True:
+        window = list(islice(entities, max(1, remaining())))
+        if not window:
+            return
+        for entity, abstracts in zip(window,
+                                     collect_many('dbo_abstract', window,
+                                                  engine)):
+            yield entity, abstracts
+
+
+def iterate_subjects(entities, engine=None):
+    """Yields every entity of a stream together with its set of dct:subject
+    categories. The categories are collected with one batched query per
+    batch of entities, and a batch is only taken from the stream when the
+    previous one has been used."""
+    entities = iter(entities)
+    while True:
+        batch = list(islice(entities, BATCH_SIZES['dct_subject']))
+        if not batch:
+            return
+        yield from collect_dct_subject_batch(batch, engine).items()
+
+
+def check_range(counter, maximum_range):
+    """Checks if the counter is equal to the maximum range.
+    The function then returns a boolean accordingly with True or False."""
+    if counter == maximum_range:
+        print("ENOUGH INFORMATION HAS BEEN GATHERED.\n")
+        return True
+    else:
+        return False
+
+
+def check_size(dictionary, minimum_range=0):
+    """Shows how the data is distributed and checks it meets the minimum
+    range."""
+    print('CHECKING ENTITY FREQUENCY PER TOPIC.')
+    print('MUST BE HIGHER THAN MINIMUM RANGE OF: {0}\n'.format(minimum_range))
+    counter = 0
+    print("{0:30}{1:30}{2:30}\n".format('TOPIC:', 'FREQUENCY:', 'RESULT:'))
+    for topic, cat in dictionary.items():
+        for category, entities in cat.items():
+            for entity, abstract in entities.items():
+                counter += 1
+        if counter >= minimum_range:
+            result = 'SUCCESS'
+        else:
+            result = 'FAILURE'
+        print("{0:30}{1:<30}{2:<30}".format(topic, counter, result))
+        counter = 0
+
+
+def collected_entities(dic, topic):
+    """Returns a set with all entities that were collected for a topic, so
+    membership can be checked without going through every category."""
+    return {entity for entities in dic.get(topic, {}).values()
+            for entity in entities}
+
+
+def collection_strategy1(topic, dic, counter, max_range=99999999,
+                         engine=None):
+    """Retrieves abstracts of all entities of a specific
+    category of the main topic classification and returns a dictionary
+    with the following architecture:
+
+    dictionary[topic][category][entity] = abstract
+
+    Returns a dictionary and a boolean to see if enough entities were
+    collected.
+
+    MTC topic -> is skos:broader of -> category -> is dct:subject of -> entity
+    -> dbo:abstract -> abstract
+
+    """
+    print("START COLLECTION STRATEGY 1.")
+    print("TOPIC:\t{0}".format(topic))
+
+    info = collect_is_skos_broader_of(topic, engine)
+    collected = collected_entities(dic, topic)
+
+    members = collect_is_subject_of_batch(sorted(info), engine)
+
+    for category, entities in members.items():
+
+        print("SUBCATEGORY:\t{0}\n".format(category))
+
+        entities = [entity for entity in sorted(entities)
+                    if entity not in collected]
+
+        for entity, abstracts in iterate_abstracts(
+                entities, lambda: max_range - counter, engine):
+
+            if check_range(counter, max_range):
+                return dic, True, counter
+
+            for abstract in abstracts:
+                print("ENTITY: {0}\n".format(entity))
+                print("ABSTRACT: {0}\n\n".format(abstract))
+                dic[topic][category][entity] = abstract
+                collected.add(entity)
+                counter += 1
+
+            if check_range(counter, max_range):
+                return dic, True, counter
+
+    print("MORE INFORMATION MUST BE RETRIEVED FOR THIS TOPIC.")
+    return dic, False, counter
+
+
+def collection_strategy2(topic, dic, counter, max_range=99999999,
+                         engine=None):
+    """Retrieves abstracts of all entities of a specific
+    category of the main topic classification and returns a dictionary
+    with the following architecture:
+
+    dictionary[topic][category][entity] = abstract
+
+    Returns a dictionary and a boolean to see if enough entities were
+    collected.
+
+    MTC topic -> is skos:broader -> category -> is dct:subject of -> entity
+    -> is skos:broader of -> category -> is dct:subject of -> entity
+    -> dbo:abstract -> abstract
+    """
+
+    print("START COLLECTION STRATEGY 2.")
+    print("TOPIC:\t{0}".format(topic))
+
+    info = collect_is_skos_broader_of(topic, engine)
+    collected = collected_entities(dic, topic)
+    visited = set(dic.get(topic, {})) | info
+
+    members = collect_is_subject_of_batch(sorted(info), engine)
+
+    for higher_category, higher_entities in members.items():
+        print("SUBCATEGORY:\t{0}\n".format(higher_category))
+        higher_entities = sorted(higher_entities)
+        expansions = collect_many('is_skos_broader_of', higher_entities,
+                                  engine)
+        for high_entity, info in zip(higher_entities, expansions):
+            print("HIGHER ENTITY: {0}\n".format(high_entity))
+            for lower_category in sorted(info):
+                if lower_category not in visited:
+                    visited.add(lower_category)
+                    print("SUBCATEGORY:\t{0}\n".format(lower_category))
+                    lower_entities = stream_values('is_subject_of',
+                                                   lower_category, engine)
+                    lower_entities = (entity for entity in lower_entities
+                                      if entity not in collected)
+
+                    for low_entity, abstracts in iterate_abstracts(
+                            lower_entities, lambda: max_range - counter,
+                            engine):
+
+                        if check_range(counter, max_range):
+                            return dic, True, counter
+
+                        for abstract in abstracts:
+                            print("LOWER ENTITY: {0}\n".format(low_entity))
+                            print("ABSTRACT: {0}\n\n".format(abstract))
+                            dic[topic][lower_category][low_entity] = abstract
+                            collected.add(low_entity)
+                            counter += 1
+
+                        if check_range(counter, max_range):
+                            return dic, True, counter
+
+    print("MORE INFORMATION MUST BE RETRIEVED FOR THIS TOPIC.")
+    return dic, False, counter
+
+
+def collection_strategy3(topic, dic, counter, max_range, engine=None):
+    """Retrieves abstracts of all entities of a specific
+    category of the main topic classification and returns a dictionary
+    with the following architecture:
+
+    dictionary[topic][category][entity] = abstract
+
+    Returns a dictionary and a boolean to see if enough entities were
+    collected.
+
+    MTC topic -> is dct:subject of -> relational entity -> dbo:abstract
+    -> abstract
+    """
+    print("START COLLECTION STRATEGY 3.")
+    print("TOPIC:\t{0}".format(topic))
+
+    collected = collected_entities(dic, topic)
+    new_entities = (entity for entity in stream_values('is_subject_of', topic,
+                                                       engine)
+                    if entity not in collected)
+
+    for entity, abstracts in iterate_abstracts(
+            new_entities, lambda: max_range - counter, engine):
+        if check_range(counter, max_range):
+            return dic, True, counter
+
+        for abstract in abstracts:
+            print("RELATIONAL ENTITY: {0}\n".format(entity))
+            print("ABSTRACT: {0}\n\n".format(abstract))
+            replace_category = entity + '_' + str(counter)
+            dic[topic][replace_category][entity] = abstract
+            collected.add(entity)
+            counter += 1
+
+        if check_range(counter, max_range):
+            return dic, True, counter
+
+    print("MORE INFORMATION MUST BE RETRIEVED FOR THIS TOPIC.")
+    return dic, False, counter
+
+
+def collection_strategy4(topic, dic, counter, max_range, engine=None):
+    """Retrieves abstracts of all entities of a specific
+    category of the main topic classification and returns a dictionary
+    with the following architecture:
+
+    dictionary[topic][category][entity] = abstract
+
+    Returns a dictionary and a boolean to see if enough entities were
+    collected.
+
+    MTC topic -> is dct:subject of -> relational entity -> dct:subject
+    -> supercategory -> is dct:subject of -> entity -> dbo:abstract -> abstract
+    """
+    print("START COLLECTION STRATEGY 4.")
+    print("TOPIC:\t{0}".format(topic))
+
+    info = stream_values('is_subject_of', topic, engine)
+
+    collected = collected_entities(dic, topic)
+    visited = set(dic.get(topic, {})) | set(get_categories())
+
+    for relational_entity, relational_entities in iterate_subjects(info,
+                                                                   engine):
+        print("RELATIONAL ENTITY: {0}\n".format(relational_entity))
+        new_subjects = [subject for subject in sorted(relational_entities)
+                        if subject not in visited]
+        visited.update(new_subjects)
+        members = collect_is_subject_of_batch(new_subjects, engine)
+
+        for subject in sorted(relational_entities):
+            print("SUPERCATEGORY: {0}\n".format(subject))
+
+            if subject in members:
+
+                entities = [entity for entity in sorted(members[subject])
+                            if entity not in collected]
+
+                for entity, abstracts in iterate_abstracts(
+                        entities, lambda: max_range - counter, engine):
+
+                    if check_range(counter, max_range):
+                        return dic, True, counter
+
+                    for abstract in abstracts:
+                        print("ENTITY: {0}\n".format(entity))
+                        print("ABSTRACT: {0}\n\n".format(abstract))
+                        dic[topic][subject][entity] = abstract
+                        collected.add(entity)
+                        counter += 1
+
+                    if check_range(counter, max_range):
+                        return dic, True, counter
+
+    print("MORE INFORMATION MUST BE RETRIEVED FOR THIS TOPIC.")
+    return dic, False, counter
+
+
+STRATEGIES = [collection_strategy1,
+              collection_strategy2,
+              collection_strategy3,
+              collection_strategy4]
+
+
+def crawl_topic(topic, dic, max_range, engine=None, order=None, counter=0,
+                log=None, planner=None):
+    """Runs the collection strategies one after another for a topic until
+    enough information has been gathered. The order is a list of strategy
+    numbers, by default the cascade 1, 2, 3, 4. A resumed crawl gives the
+    strategies that are left with the counter it had at that point. If a
+    checkpoint log is given, the start of every strategy is written to it.
+    If a planner is given, the queries and abstracts of every strategy are
+    recorded in it. Returns the dictionary, a boolean to see if enough
+    entities were collected and the counter."""
+    check = False
+    for number in order or range(1, len(STRATEGIES) + 1):
+        if log is not None:
+            log.strategy(topic, number, counter)
+        queries = engine.queries if planner is not None else 0
+        start = counter
+        dic, check, counter = STRATEGIES[number - 1](topic, dic, counter,
+                                                     max_range, engine)
+        if planner is not None:
+            planner.record(topic, number, engine.queries - queries,
+                           counter - start, not check)
+        if check:
+            break
+    return dic, check, counter
+
+
+def plan_topic(topic, need, planner=None):
+    """Returns the order of the strategies of a topic that the planner
+    chose, or None for the cascade 1, 2, 3, 4 if no planner is given."""
+    if planner is None:
+        return None
+    order = planner.plan(topic, need)
+    print("PLANNED STRATEGY ORDER FOR TOPIC {0}: {1}\n".format(topic, order))
+    return order
+
+
+def remaining_strategies(order, progress):
+    """Returns the strategies of a resumed topic in the planned order: the
+    strategy that was running first, without the ones that had finished.
+    Without a planned order the cascade 1, 2, 3, 4 is used."""
+    finished = progress['strategies'][:-1]
+    return [progress['strategy']] + [
+        number for number in order or range(1, len(STRATEGIES) + 1)
+        if number not in finished and number != progress['strategy']]
+
+
+def topic_fingerprint(topic, engine=None):
+    """Returns a hash of the direct subcategories and entities of a topic.
+    If the fingerprint differs from the one in the checkpoint log, the
+    topic has changed on DBpedia."""
+    broader, subjects = (collect_many(kind, [topic], engine)[0]
+                         for kind in ('is_skos_broader_of', 'is_subject_of'))
+    text = '\n'.join(sorted(broader)) + '\n\n' + '\n'.join(sorted(subjects))
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+
+def crawl(classifications, dic, log, state, max_range, min_range, engine,
+          incremental=False, planner=None):
+    """Crawls all topics and checkpoints the crawl to the log. Topics that
+    are done according to the replayed state are skipped, an unfinished
+    topic continues at the strategy that was running. In incremental mode
+    topics that are done are collected again if they have fewer entities
+    than the minimum range or if they changed. If a planner is given, it
+    decides in which order the strategies of every topic run and the order
+    is written to the log; otherwise the cascade 1, 2, 3, 4 runs."""
+    for classification in classifications:
+        classification = classification.strip()
+        progress = state.progress.get(classification)
+        fingerprint = None
+
+        if progress is not None and progress['done']:
+            if not incremental:
+                print("TOPIC {0} IS ALREADY DONE.\n".format(classification))
+                continue
+            fingerprint = topic_fingerprint(classification, engine)
+            if (progress['counter'] >= min_range and
+                    progress['fingerprint'] == fingerprint):
+                print("TOPIC {0} HAS NOT CHANGED.\n".format(classification))
+                continue
+            print("COLLECTING TOPIC {0} AGAIN.\n".format(classification))
+            log.reset(classification)
+            dic.pop(classification, None)
+            progress = None
+
+        if progress is None:
+            if fingerprint is None:
+                fingerprint = topic_fingerprint(classification, engine)
+            order = plan_topic(classification, max_range, planner)
+            log.topic(classification, fingerprint, order)
+            counter = 0
+        else:
+            print("RESUMING TOPIC {0} AT STRATEGY {1}.\n".format(
+                classification, progress['strategy']))
+            log.resume(classification)
+            counter = progress['counter']
+            order = progress['order'] or plan_topic(
+                classification, max_range - counter, planner)
+            order = remaining_strategies(order, progress)
+
+        dic, check, counter = crawl_topic(classification, dic, max_range,
+                                          engine, order, counter, log,
+                                          planner)
+        log.done(classification, counter, check)
+    return dic
+
+
+def main():
+    # The sample frequencies below were retrieved without using
+    # a margin error range going through the classifications in the for loop.
+    # sample = sorted([235,
+                        # 511,
+                        # 61,
+                        # 238,
+                        # 365,
+                        # 119,
+                        # 326,
+                        # 184,
+                        # 130,
+                        # 346,
+                        # 77,
+                        # 229,
+                        # 225,
+                        # 447,
+                        # 361,
+                        # 239,
+                        # 595,
+                        # 489,
+                        # 360,
+                        # 295,
+                        # 247,
+                        # 124,
+                        # 98,
+                        # 105,
+                        # 192,
+                        # 95,
+                        # 70,
+                        # 175,
+                        # 130,
+                        # 41,
+                        # 64,
+                        # 50,
+                        # 107,
+                        # 31,
+                        # 311,
+                        # 337,
+                        # 258,
+                        # 177,
+                        # 174,
+                        # 220,
+                        # 99])
+
+    # freq, sum, mean, sd, var, min_range, max_range = get_statistics(sample)
+    # Range has been set by using the commented code above.
+    min_range = 79
+    max_range = 357
+
+    classifications = get_categories()
+
+    # The crawl is checkpointed to this log. Running the program again
+    # resumes the crawl where it stopped. In incremental mode topics below
+    # the minimum range or that changed on DBpedia are collected again.
+    log_path = 'crawl_checkpoint.jsonl'
+    incremental = False
+
+    # Set this to the directory of an index built by dbpedia_index.py to
+    # crawl a local DBpedia dump instead of the live endpoint.
+    index_path = None
+
+    # The strategies run in the order 1, 2, 3 and 4 of the thesis. Set this
+    # to True to let the planner run the strategy with the best expected
+    # yield per query first; this changes which abstracts are collected.
+    plan_strategies = False
+
+    # The languages of the abstracts. The entities are selected on the first
+    # language; the abstracts of the other languages come back in the same
+    # queries and are written to a dataset file per language.
+    languages = ['nl']
+
+    print("MARGIN OF ERROR RANGE: {0} - {1}\n".format(min_range, max_range))
+
+    # Responses stay valid for 30 days and the cache holds at most 2 GB.
+    cache = SPARQLCache('sparql_cache.sqlite', ttl=30 * 24 * 60 * 60,
+                        max_bytes=2 * 1024 ** 3)
+    # The scheduler starts at 10 requests per second and adapts the rate and
+    # the concurrency to how the endpoint responds.
+    scheduler = RequestScheduler(TokenBucket(10.0), max_concurrency=16)
+    if index_path:
+        engine = DBpediaIndex(index_path)
+    else:
+        engine = AsyncSPARQLEngine(concurrency=16, cache=cache,
+                                   scheduler=scheduler)
+
+    state = replay_log(log_path)
+    with CheckpointLog(log_path) as log:
+        if len(languages) > 1:
+            engine = MultiLanguageEngine(engine, languages, log,
+                                         state.translations)
+        with GraphMemo(ReplayEngine(engine, state.abstracts)) as engine:
+            dic = CheckpointedDataset(log, state.dataset)
+            planner = CrawlPlanner(engine) if plan_strategies else None
+            dic = crawl(classifications, dic, log, state, max_range,
+                        min_range, engine, incremental, planner)
+            print('TOTAL QUERIES: {0}\n'.format(engine.queries))
+            engine.statistics()
+            if planner is not None:
+                write_cost_report(planner.report())
+    cache.statistics()
+    cache.close()
+    scheduler.statistics()
+    write_lost_report(scheduler.take_lost())
+
+    check_size(dic, min_range)
+
+    # The log knows which strategy found every abstract and holds the
+    # abstracts in the other languages.
+    state = replay_log(log_path)
+    write_language_shards(dic,
+                          'dataset_max_range_357_all_strategies_{0}.jsonl.gz',
+                          languages, state.translations, state.sources)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,125 @@
+#!/usr/bin/python3
+# student: J.F.P. (Richard) Scholtens
+# studentnr.: s2956586
+# datum: 18/10/2026
+# A persistent on-disk cache for SPARQL responses. Responses are stored in a
+# SQLite database with the normalized query text as key, so re-running a
+# crawl after a crash or with another max_range is served from disk instead
+# of from DBpedia. Every entry can expire after a time to live and the cache
+# removes the least recently used entries when it grows beyond its size cap.
+
+
+import json
+import time
+import sqlite3
+from sparql_queries import normalize_query
+
+
+class SPARQLCache:
+    """Stores SPARQL JSON results on disk. The ttl is the default number of
+    seconds an entry stays valid (None keeps it forever) and max_bytes is the
+    maximum total size of the stored responses (None means no limit)."""
+
+    def __init__(self, path='sparql_cache.sqlite', ttl=None, max_bytes=None):
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.connection = sqlite3.connect(path, timeout=60,
+                                          isolation_level=None)
+        self.connection.execute('PRAGMA journal_mode=WAL')
+        self.connection.execute('PRAGMA synchronous=NORMAL')
+        self.connection.execute("""CREATE TABLE IF NOT EXISTS responses (
+                                       query TEXT PRIMARY KEY,
+                                       response TEXT NOT NULL,
+                                       size INTEGER NOT NULL,
+                                       expires REAL,
+                                       last_access REAL NOT NULL)""")
+        self.connection.execute("""CREATE INDEX IF NOT EXISTS lru
+                                   ON responses (last_access)""")
+        self.total_bytes = self.connection.execute(
+            'SELECT COALESCE(SUM(size), 0) FROM responses').fetchone()[0]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def get(self, query):
+        """Returns the cached result of a query or None if the query is not
+        in the cache or has expired."""
+        key = normalize_query(query)
+        now = time.time()
+        row = self.connection.execute(
+            'SELECT response, expires FROM responses WHERE query = ?',
+            (key,)).fetchone()
+        if row is None or (row[1] is not None and row[1] < now):
+            self.misses += 1
+            return None
+        self.connection.execute(
+            'UPDATE responses SET last_access = ? WHERE query = ?',
+            (now, key))
+        self.hits += 1
+        return json.loads(row[0])
+
+    def put(self, query, results, ttl=None):
+        """Stores the result of a query. The ttl overrules the default time
+        to live of the cache for this entry."""
+        key = normalize_query(query)
+        response = json.dumps(results)
+        # The size cap is in bytes, so the encoded size is stored.
+        size = len(response.encode('utf-8'))
+        ttl = self.ttl if ttl is None else ttl
+        now = time.time()
+        expires = None if ttl is None else now + ttl
+        old = self.connection.execute(
+            'SELECT size FROM responses WHERE query = ?', (key,)).fetchone()
+        self.connection.execute(
+            """INSERT OR REPLACE INTO responses
+               (query, response, size, expires, last_access)
+               VALUES (?, ?, ?, ?, ?)""",
+            (key, response, size, expires, now))
+        self.total_bytes += size - (old[0] if old else 0)
+        if self.max_bytes is not None and self.total_bytes > self.max_bytes:
+            self.evict()
+
+    def evict(self):
+        """Removes expired entries and then the least recently used entries
+        until the cache is within its size cap."""
+        self.connection.execute(
+            'DELETE FROM responses WHERE expires IS NOT NULL AND expires < ?',
+            (time.time(),))
+        self.total_bytes = self.connection.execute(
+            'SELECT COALESCE(SUM(size), 0) FROM responses').fetchone()[0]
+        if self.max_bytes is None or self.total_bytes <= self.max_bytes:
+            return
+        excess = self.total_bytes - self.max_bytes
+        keys = []
+        for key, size in self.connection.execute(
+                'SELECT query, size FROM responses ORDER BY last_access'):
+            keys.append((key,))
+            excess -= size
+            self.total_bytes -= size
+            if excess <= 0:
+                break
+        self.connection.executemany('DELETE FROM responses WHERE query = ?',
+                                    keys)
+
+    def __len__(self):
+        return self.connection.execute(
+            'SELECT COUNT(*) FROM responses').fetchone()[0]
+
+    def statistics(self):
+        """Prints and returns the number of hits, misses and entries and the
+        size of the cache."""
+        entries = len(self)
+        print('CACHE HITS: {0}'.format(self.hits))
+        print('CACHE MISSES: {0}'.format(self.misses))
+        print('CACHE ENTRIES: {0}'.format(entries))
+        print('CACHE SIZE: {0} BYTES\n'.format(self.total_bytes))
+        return self.hits, self.misses, entries, self.total_bytes
+
+    def close(self):
+        self.connection.close()
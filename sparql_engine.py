@@ -0,0 +1,227 @@
+#!/usr/bin/python3
+# student: J.F.P. (Richard) Scholtens
+# studentnr.: s2956586
+# datum: 18/10/2026
+# An asynchronous retrieval engine for the collection strategies in
+# retrieve_information.py. Instead of creating a new SPARQLWrapper for every
+# query, the engine keeps one HTTP session with keep-alive connections open
+# and runs a limited number of queries at the same time. Results are always
+# returned in the order of the given entities, so the collection strategies
+# stay deterministic. When a cache (see sparql_cache.py) is given, queries
+# that were answered before are served from disk. When a token bucket (see
+# rate_limit.py) is given, every request to the endpoint first takes a token.
+# When a scheduler (see request_scheduler.py) is given, it decides when and how
+# often a request is sent, and a query that is lost after all retries gets an
+# empty result. The values of one entity can also be streamed page by page,
+# so a strategy that has enough entities stops before the rest is downloaded.
+
+
+import asyncio
+import aiohttp
+from sparql_queries import (DBPEDIA_ENDPOINT, ABSTRACT_KINDS, PAGE_SIZE,
+                            COUNT_BATCH_SIZE, build_batch_query,
+                            build_count_query, build_language_query,
+                            build_page_query, split_batches, is_truncated,
+                            parse_values, parse_counts, parse_page,
+                            parse_batch_values, parse_language_values,
+                            iterate_pages)
+
+
+class AsyncSPARQLEngine:
+    """Runs SPARQL-queries concurrently over one keep-alive HTTP session.
+    The number of queries in flight is limited by the concurrency."""
+
+    def __init__(self, endpoint=DBPEDIA_ENDPOINT, concurrency=16, timeout=60,
+                 keepalive_timeout=30, cache=None, limiter=None,
+                 scheduler=None):
+        self.endpoint = endpoint
+        self.cache = cache
+        self.limiter = limiter
+        self.scheduler = scheduler
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.keepalive_timeout = keepalive_timeout
+        self.loop = asyncio.new_event_loop()
+        self.session = None
+        self.semaphore = None
+        self.queries = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    async def _open(self):
+        """Opens the HTTP session. The connector keeps at most as many
+        connections open as the concurrency and reuses them."""
+        if self.session is None:
+            connector = aiohttp.TCPConnector(
+                limit=self.concurrency,
+                keepalive_timeout=self.keepalive_timeout)
+            timeout = aiohttp.ClientTimeout(total=self.timeout)
+            self.session = aiohttp.ClientSession(connector=connector,
+                                                 timeout=timeout)
+            self.semaphore = asyncio.Semaphore(self.concurrency)
+
+    async def request(self, query):
+        """Sends one query to the endpoint and returns the JSON result.
+        Raises an aiohttp.ClientResponseError if the endpoint answers with
+        an error status."""
+        params = {'query': query,
+                  'format': 'application/sparql-results+json'}
+        self.queries += 1
+        async with self.session.get(self.endpoint,
+                                    params=params) as response:
+            response.raise_for_status()
+            return await response.json(content_type=None)
+
+    async def fetch(self, query):
+        """Returns the JSON result of a query, from the cache if possible."""
+        if self.cache is not None:
+            results = self.cache.get(query)
+            if results is not None:
+                return results
+        async with self.semaphore:
+            if self.scheduler is not None:
+                results = await self.scheduler.run(query, self.request)
+                if results is None:
+                    return {'head': {'vars': []}, 'results': {'bindings': []}}
+            else:
+                if self.limiter is not None:
+                    await self.limiter.acquire_async()
+                results = await self.request(query)
+        if self.cache is not None:
+            self.cache.put(query, results)
+        return results
+
+    async def fetch_values(self, query, abstract=False):
+        """Sends one query and returns a set of values."""
+        results = await self.fetch(query)
+        return parse_values(results, abstract)
+
+    async def _retrieve_many(self, queries, abstract):
+        await self._open()
+        return await asyncio.gather(*[self.fetch_values(query, abstract)
+                                      for query in queries])
+
+    def retrieve_many(self, queries, abstract=False):
+        """Runs all queries concurrently and returns a list of value sets in
+        the same order as the queries."""
+        if not queries:
+            return []
+        return self.loop.run_until_complete(self._retrieve_many(queries,
+                                                                abstract))
+
+    async def fetch_batch(self, kind, entities):
+        """Collects one DBpedia property for a batch of entities with one
+        VALUES-query. If the endpoint cut off the result, the batch is split
+        in two and both halves are asked again. A single entity with too
+        many values is paged through instead."""
+        results = await self.fetch(build_batch_query(kind, entities))
+        if is_truncated(results):
+            if len(entities) > 1:
+                middle = len(entities) // 2
+                first, second = await asyncio.gather(
+                    self.fetch_batch(kind, entities[:middle]),
+                    self.fetch_batch(kind, entities[middle:]))
+                return first + second
+            return [await self.fetch_pages(kind, entities[0])]
+        return parse_batch_values(results, entities, kind in ABSTRACT_KINDS)
+
+    async def fetch_pages(self, kind, entity, page_size=PAGE_SIZE):
+        """Collects all values of one entity by asking for one page after
+        the other and returns them as a set."""
+        values = set()
+        after = ''
+        while True:
+            results = await self.fetch(build_page_query(kind, entity, after,
+                                                        page_size))
+            page, after = parse_page(results, kind in ABSTRACT_KINDS)
+            values.update(page)
+            if len(page) < page_size:
+                return values
+
+    async def fetch_languages(self, entities, languages):
+        """Collects the abstracts of a batch of entities in several
+        languages with one query. If the endpoint cut off the result, the
+        batch is split in two and both halves are asked again."""
+        results = await self.fetch(build_language_query(entities, languages))
+        if is_truncated(results) and len(entities) > 1:
+            middle = len(entities) // 2
+            first, second = await asyncio.gather(
+                self.fetch_languages(entities[:middle], languages),
+                self.fetch_languages(entities[middle:], languages))
+            return first + second
+        return parse_language_values(results, entities, languages)
+
+    async def _collect_languages(self, entities, languages):
+        await self._open()
+        batches = await asyncio.gather(*[
+            self.fetch_languages(batch, languages)
+            for batch in split_batches('dbo_abstract', entities)])
+        return [values for batch in batches for values in batch]
+
+    def collect_languages(self, entities, languages):
+        """Collects the abstracts of every entity in all given languages and
+        returns a list with a dictionary of abstract sets per language, in
+        the same order as the entities."""
+        if not entities:
+            return []
+        return self.loop.run_until_complete(
+            self._collect_languages(entities, languages))
+
+    async def fetch_counts(self, kind, entities):
+        """Counts the values of one DBpedia property for a batch of
+        entities with one query."""
+        results = await self.fetch(build_count_query(kind, entities))
+        return parse_counts(results, entities)
+
+    async def _count(self, kind, entities):
+        await self._open()
+        batches = await asyncio.gather(*[
+            self.fetch_counts(kind, batch)
+            for batch in split_batches(kind, entities, COUNT_BATCH_SIZE)])
+        return [count for batch in batches for count in batch]
+
+    def count(self, kind, entities):
+        """Returns the number of values of one DBpedia property for every
+        entity, in the same order as the entities, without retrieving the
+        values themselves."""
+        if not entities:
+            return []
+        return self.loop.run_until_complete(self._count(kind, entities))
+
+    async def _fetch(self, query):
+        await self._open()
+        return await self.fetch(query)
+
+    def stream(self, kind, entity, page_size=PAGE_SIZE):
+        """Yields the values of one DBpedia property of an entity in sorted
+        order. The values are asked for one page at a time, and the next
+        page is only sent for when the previous one has been used."""
+        return iterate_pages(
+            lambda query: self.loop.run_until_complete(self._fetch(query)),
+            kind, entity, page_size)
+
+    async def _collect(self, kind, entities):
+        await self._open()
+        batches = await asyncio.gather(*[self.fetch_batch(kind, batch)
+                                         for batch in split_batches(kind,
+                                                                    entities)])
+        return [values for batch in batches for values in batch]
+
+    def collect(self, kind, entities):
+        """Collects one DBpedia property for every entity and returns a list
+        of value sets in the same order as the entities. The entities are
+        looked up in batches which run concurrently."""
+        if not entities:
+            return []
+        return self.loop.run_until_complete(self._collect(kind, entities))
+
+    def close(self):
+        """Closes the HTTP session and the event loop."""
+        if self.session is not None:
+            self.loop.run_until_complete(self.session.close())
+            self.session = None
+        self.loop.close()
@@ -0,0 +1,250 @@
+#!/usr/bin/python3
+# student: J.F.P. (Richard) Scholtens
+# studentnr.: s2956586
+# datum: 18/10/2026
+# Holds the SPARQL-queries that are used by the collection strategies in
+# retrieve_information.py. Both the blocking SPARQLWrapper code and the
+# asynchronous engine in sparql_engine.py build their queries here, so they
+# always send exactly the same query text to DBpedia. The batched queries
+# look up the same properties for many entities at once by using a VALUES
+# block, and the bindings are split back per entity afterwards. The paged
+# queries stream the values of one entity in a fixed order, one page at a
+# time, so a large category is never cut off by the endpoint. The count
+# queries only ask how many values every entity has, which the crawl planner
+# uses to estimate what a strategy will cost. The language query asks for
+# the abstracts of several languages at once, so the category graph only has
+# to be crawled once for all languages.
+
+
+DBPEDIA_ENDPOINT = "http://dbpedia.org/sparql"
+
+QUERIES = {
+    'is_skos_broader_of': """SELECT * WHERE { <http://dbpedia.org/resource/%s>
+                     ^skos:broader
+                    ?value .}""",
+    'is_subject_of': """SELECT * WHERE { <http://dbpedia.org/resource/%s>
+            ^<http://purl.org/dc/terms/subject>
+            ?value .}""",
+    'dbo_abstract': """SELECT * WHERE { <http://dbpedia.org/resource/%s>
+        <http://dbpedia.org/ontology/abstract> ?value .
+        FILTER langMatches(lang(?value),'nl')}""",
+    'dct_subject': """SELECT * WHERE { <http://dbpedia.org/resource/%s>
+      <http://purl.org/dc/terms/subject>
+      ?value .}""",
+}
+
+BATCH_QUERIES = {
+    'is_skos_broader_of': """SELECT ?e ?value WHERE { VALUES ?e { %s }
+                    ?value skos:broader ?e .}""",
+    'is_subject_of': """SELECT ?e ?value WHERE { VALUES ?e { %s }
+            ?value <http://purl.org/dc/terms/subject> ?e .}""",
+    'dbo_abstract': """SELECT ?e ?value WHERE { VALUES ?e { %s }
+        ?e <http://dbpedia.org/ontology/abstract> ?value .
+        FILTER langMatches(lang(?value),'nl')}""",
+    'dct_subject': """SELECT ?e ?value WHERE { VALUES ?e { %s }
+      ?e <http://purl.org/dc/terms/subject> ?value .}""",
+}
+
+# Queries that ask for one page of the values of an entity. A page holds the
+# values that come after the last value of the previous page (keyset
+# pagination). Unlike an OFFSET, the endpoint does not have to skip all
+# earlier rows again for every page, so deep pages stay fast.
+PAGE_QUERIES = {
+    'is_skos_broader_of': """SELECT ?value WHERE { ?value skos:broader
+                    <http://dbpedia.org/resource/%s> .
+                    FILTER (STR(?value) > "%s")}
+                    ORDER BY STR(?value) LIMIT %s""",
+    'is_subject_of': """SELECT ?value WHERE { ?value
+            <http://purl.org/dc/terms/subject>
+            <http://dbpedia.org/resource/%s> .
+            FILTER (STR(?value) > "%s")}
+            ORDER BY STR(?value) LIMIT %s""",
+    'dbo_abstract': """SELECT ?value WHERE { <http://dbpedia.org/resource/%s>
+        <http://dbpedia.org/ontology/abstract> ?value .
+        FILTER (langMatches(lang(?value),'nl') && STR(?value) > "%s")}
+        ORDER BY STR(?value) LIMIT %s""",
+    'dct_subject': """SELECT ?value WHERE { <http://dbpedia.org/resource/%s>
+      <http://purl.org/dc/terms/subject> ?value .
+      FILTER (STR(?value) > "%s")}
+      ORDER BY STR(?value) LIMIT %s""",
+}
+
+# Asks for the abstracts of a batch of entities in several languages. The
+# filter holds one langMatches per language.
+LANGUAGE_QUERY = """SELECT ?e ?value WHERE { VALUES ?e { %s }
+        ?e <http://dbpedia.org/ontology/abstract> ?value .
+        FILTER (%s)}"""
+
+# Counts the values per entity of a batched query instead of returning them.
+COUNT_QUERY = """SELECT ?e (COUNT(?value) AS ?count) WHERE { { %s } }
+    GROUP BY ?e"""
+
+# Number of entities per count query. Only one row per entity comes back, so
+# the batches can be larger than the batches of the value queries.
+COUNT_BATCH_SIZE = 200
+
+# Number of values per page. A strategy rarely needs more than the maximum
+# range of entities, so most categories fit in one page.
+PAGE_SIZE = 1000
+
+# Number of entities per batched query. Membership of categories can be
+# large, so those batches are kept smaller.
+BATCH_SIZES = {'is_skos_broader_of': 50,
+               'is_subject_of': 20,
+               'dbo_abstract': 100,
+               'dct_subject': 100}
+
+# Public endpoints silently cut off results at this number of rows. A batch
+# that returns this many rows is split in two and asked again.
+MAX_ROWS = 10000
+
+RESOURCE = 'http://dbpedia.org/resource/'
+
+# Properties of which the values are literals instead of hyperlinks.
+ABSTRACT_KINDS = {'dbo_abstract'}
+
+
+def build_query(kind, entity):
+    """Returns the SPARQL-query of the given kind for an entity."""
+    return QUERIES[kind] % entity
+
+
+def build_batch_query(kind, entities):
+    """Returns the batched SPARQL-query of the given kind for a list of
+    entities."""
+    values = ' '.join('<{0}{1}>'.format(RESOURCE, entity)
+                      for entity in entities)
+    return BATCH_QUERIES[kind] % values
+
+
+def build_language_query(entities, languages):
+    """Returns the SPARQL-query that asks for the abstracts of a batch of
+    entities in all given languages."""
+    values = ' '.join('<{0}{1}>'.format(RESOURCE, entity)
+                      for entity in entities)
+    languages = ' || '.join("langMatches(lang(?value),'{0}')".format(language)
+                            for language in languages)
+    return LANGUAGE_QUERY % (values, languages)
+
+
+def build_count_query(kind, entities):
+    """Returns the SPARQL-query that counts the values of the given kind for
+    every entity of a batch."""
+    return COUNT_QUERY % build_batch_query(kind, entities)
+
+
+def escape_literal(text):
+    """Escapes a string so it can be put between double quotes in a
+    SPARQL-query."""
+    return text.replace('\\', '\\\\').replace('"', '\\"')
+
+
+def build_page_query(kind, entity, after='', page_size=PAGE_SIZE):
+    """Returns the SPARQL-query of the given kind that asks for one page of
+    the values of an entity, starting after the given value."""
+    return PAGE_QUERIES[kind] % (entity, escape_literal(after), page_size)
+
+
+def split_batches(kind, entities, size=None):
+    """Splits a list of entities into batches of the size of the kind."""
+    size = size or BATCH_SIZES[kind]
+    return [entities[i:i + size] for i in range(0, len(entities), size)]
+
+
+def is_truncated(results):
+    """Checks if the endpoint may have cut off the result."""
+    return len(results["results"]["bindings"]) >= MAX_ROWS
+
+
+def normalize_query(query):
+    """Collapses all whitespace of a query so that queries which only differ
+    in layout are seen as the same query."""
+    return ' '.join(query.split())
+
+
+def resource_value(iri):
+    """Returns the last part of a hyperlink, which is the name a resource
+    is stored and asked for under."""
+    return iri.rsplit('/', 1)[-1]
+
+
+def parse_values(results, abstract=False):
+    """Returns a set of values from a SPARQL JSON result. If the value is a
+    hyperlink, it slices the last part and stores it as the value."""
+    values = set()
+    for result in results["results"]["bindings"]:
+        value = result["value"]["value"]
+        if not abstract:
+            value = resource_value(value)
+        values.add(value)
+    return values
+
+
+def language_of(literal):
+    """Returns the language of a literal of a SPARQL JSON result without
+    its region, so 'nl-BE' becomes 'nl'."""
+    return literal.get('xml:lang', '').split('-')[0].lower()
+
+
+def parse_language_values(results, entities, languages):
+    """Splits the bindings of a language query back per entity and per
+    language. Returns a list with a dictionary per entity that has a set of
+    abstracts for every language, in the same order as the entities."""
+    values = {RESOURCE + entity: {language: set() for language in languages}
+              for entity in entities}
+    for result in results["results"]["bindings"]:
+        entity = result["e"]["value"]
+        language = language_of(result["value"])
+        if entity in values and language in values[entity]:
+            values[entity][language].add(result["value"]["value"])
+    return [values[RESOURCE + entity] for entity in entities]
+
+
+def parse_counts(results, entities):
+    """Returns the number of values of every entity of a count query, in
+    the same order as the entities."""
+    counts = {RESOURCE + entity: 0 for entity in entities}
+    for result in results["results"]["bindings"]:
+        entity = result["e"]["value"]
+        if entity in counts:
+            counts[entity] = int(result["count"]["value"])
+    return [counts[RESOURCE + entity] for entity in entities]
+
+
+def parse_page(results, abstract=False):
+    """Returns the values of one page in the order of the result, together
+    with the full last value, which is where the next page starts."""
+    values = [result["value"]["value"]
+              for result in results["results"]["bindings"]]
+    last = values[-1] if values else ''
+    if not abstract:
+        values = [resource_value(value) for value in values]
+    return values, last
+
+
+def iterate_pages(fetch, kind, entity, page_size=PAGE_SIZE):
+    """Yields the values of the given kind of one entity in sorted order.
+    The fetch function returns the SPARQL JSON result of a query. The next
+    page is only asked for when every value of the previous page has been
+    used, so a caller that stops early does not download the rest."""
+    after = ''
+    while True:
+        results = fetch(build_page_query(kind, entity, after, page_size))
+        values, after = parse_page(results, kind in ABSTRACT_KINDS)
+        yield from values
+        if len(values) < page_size:
+            return
+
+
+def parse_batch_values(results, entities, abstract=False):
+    """Splits the bindings of a batched query back per entity. Returns a
+    list of value sets in the same order as the entities."""
+    values = {RESOURCE + entity: set() for entity in entities}
+    for result in results["results"]["bindings"]:
+        value = result["value"]["value"]
+        if not abstract:
+            value = resource_value(value)
+        entity = result["e"]["value"]
+        if entity in values:
+            values[entity].add(value)
+    return [values[RESOURCE + entity] for entity in entities]
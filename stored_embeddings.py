@@ -0,0 +1,150 @@
+#!/usr/bin/python3
+# student: J.F.P. (Richard) Scholtens
+# studentnr.: s2956586
+# datum: 18/10/2026
+# Computes the embeddings of the Flair input files once and reads them back
+# during training and evaluation. The texts of flair_train.txt, flair_dev.txt
+# and flair_test.txt are embedded with a Flair embedding, for example BERTje
+# or GloVe, and stored in an embedding store (see embedding_store.py). Texts
+# that are already in the store are skipped, so a grown dataset only embeds
+# its new texts.
+#
+# StoredTokenEmbeddings can then take the place of the embedding in the
+# notebook, for example inside DocumentRNNEmbeddings: it gives every token
+# its stored vector, so training an LSTM no longer runs BERTje at all and
+# works on CPU. StoredDocumentEmbeddings gives every text its pooled vector.
+#
+# Usage: python3 stored_embeddings.py [MODEL_NAME]
+
+
+import sys
+import numpy as np
+import torch
+from flair.data import Sentence
+from flair.embeddings import (TokenEmbeddings, DocumentEmbeddings,
+                              WordEmbeddings, TransformerWordEmbeddings)
+from embedding_store import EmbeddingStore
+from mtc_runtime import length_batches
+
+
+def sentence_text(sentence):
+    """Returns the text a sentence is stored under: its tokens joined by
+    spaces, so the key does not depend on how the sentence was made."""
+    return ' '.join(token.text for token in sentence)
+
+
+def flair_texts(file_names):
+    """Returns the distinct texts of Flair files."""
+    texts = {}
+    for file_name in file_names:
+        with open(file_name) as file:
+            for line in file:
+                texts[line.rstrip('\n').split('\t', 1)[-1]] = None
+    return list(texts)
+
+
+def precompute(file_names, embedding, store, batch_size=32):
+    """Embeds the texts of Flair files that are not yet in the store, in
+    mini-batches of texts of about the same length, and stores one vector
+    per token or their mean, as the pooling of the store says. Returns the
+    number of texts that were embedded."""
+    sentences = [Sentence(text) for text in flair_texts(file_names)]
+    sentences = [sentence for sentence in sentences
+                 if sentence_text(sentence) not in store]
+    texts = [sentence_text(sentence) for sentence in sentences]
+    print('TEXTS TO EMBED: {0}'.format(len(sentences)))
+    with torch.inference_mode():
+        for number, batch in enumerate(length_batches(texts, batch_size)):
+            embedding.embed([sentences[i] for i in batch])
+            for i in batch:
+                sentence = sentences[i]
+                if len(sentence):
+                    vectors = torch.stack([token.get_embedding()
+                                           for token in sentence])
+                    vectors = vectors.float().cpu().numpy()
+                else:
+                    vectors = np.zeros((0, embedding.embedding_length))
+                if store.pooling == 'mean':
+                    vectors = (vectors.mean(axis=0, keepdims=True)
+                               if len(vectors) else
+                               np.zeros((1, embedding.embedding_length)))
+                store.put(texts[i], vectors)
+                sentence.clear_embeddings()
+            if number % 100 == 99:
+                store.commit()
+    store.commit()
+    print('TEXTS IN STORE: {0}\n'.format(len(store)))
+    return len(sentences)
+
+
+def stored_vectors(store, sentence):
+    """Returns the stored embeddings of a sentence as float32 tensor."""
+    vectors = store.get(sentence_text(sentence))
+    if vectors is None:
+        raise KeyError('TEXT NOT IN EMBEDDING STORE, RUN '
+                       'stored_embeddings.py FIRST: {0}'.format(
+                           sentence_text(sentence)[:50]))
+    return torch.from_numpy(vectors.astype(np.float32))
+
+
+class StoredTokenEmbeddings(TokenEmbeddings):
+    """Gives every token the vector of a store with token embeddings."""
+
+    def __init__(self, store):
+        super().__init__()
+        self.store = store
+        self.name = 'stored-' + store.model_name
+        self.static_embeddings = True
+
+    @property
+    def embedding_length(self):
+        return self.store.dim
+
+    def _add_embeddings_internal(self, sentences):
+        for sentence in sentences:
+            vectors = stored_vectors(self.store, sentence)
+            for token, vector in zip(sentence, vectors):
+                token.set_embedding(self.name, vector)
+        return sentences
+
+
+class StoredDocumentEmbeddings(DocumentEmbeddings):
+    """Gives every sentence the mean of its stored vectors."""
+
+    def __init__(self, store):
+        super().__init__()
+        self.store = store
+        self.name = 'stored-document-' + store.model_name
+        self.static_embeddings = True
+
+    @property
+    def embedding_length(self):
+        return self.store.dim
+
+    def _add_embeddings_internal(self, sentences):
+        for sentence in sentences:
+            vectors = stored_vectors(self.store, sentence)
+            if len(vectors):
+                vector = vectors.mean(dim=0)
+            else:
+                vector = torch.zeros(self.store.dim)
+            sentence.set_embedding(self.name, vector)
+        return sentences
+
+
+def main():
+    model_name = 'wietsedv/bert-base-dutch-cased'
+    if len(sys.argv) == 2:
+        model_name = sys.argv[1]
+    files = ['flair_train.txt', 'flair_dev.txt', 'flair_test.txt']
+
+    if model_name == 'glove':
+        embedding = WordEmbeddings('glove')
+    else:
+        embedding = TransformerWordEmbeddings(model_name)
+    with EmbeddingStore('embedding_store', model_name) as store:
+        precompute(files, embedding, store)
+
+
+if __name__ == '__main__':
+    main()
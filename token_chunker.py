@@ -0,0 +1,175 @@
+#!/usr/bin/python3
+# student: J.F.P. (Richard) Scholtens
+# studentnr.: s2956586
+# datum: 18/10/2026
+# Chops abstracts into chunks that fit the maximum input length of a BERT
+# model. split_words of flair_writer.py takes windows of 200 words, but
+# WordPiece turns 200 Dutch words into anywhere between 220 and 600 subword
+# tokens, so BERTje either cuts a chunk off or pads it. Here the
+# chunks are made with the subword tokenizer of the model itself: the number
+# of tokens of every word is counted once with the offsets of a fast
+# tokenizer, and the words are put into chunks that hold as many tokens as
+# the model takes. Consecutive chunks overlap by a quarter of that, and the
+# last chunk always reaches the end of the abstract, so no text is dropped.
+#
+# The token counts are kept per abstract in a SQLite database, so the
+# tokenizer runs only once per abstract, also when the Flair files are
+# written again. The tokenizer is loaded from a local model directory with
+# the transformers library, which is only needed for this kind of chunking.
+
+
+import array
+import bisect
+import hashlib
+import sqlite3
+
+
+class TokenCountCache:
+    """Stores the number of subword tokens of every word of an abstract on
+    disk, with the tokenizer name and the text of the abstract as key."""
+
+    def __init__(self, path='token_counts.sqlite'):
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self.connection = sqlite3.connect(path, timeout=60,
+                                          isolation_level=None)
+        self.connection.execute('PRAGMA journal_mode=WAL')
+        self.connection.execute('PRAGMA synchronous=NORMAL')
+        self.connection.execute("""CREATE TABLE IF NOT EXISTS counts (
+                                       key BLOB PRIMARY KEY,
+                                       counts BLOB NOT NULL)""")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    @staticmethod
+    def key(tokenizer_name, text):
+        return hashlib.sha1((tokenizer_name + '\t' + text).encode(
+            'utf-8')).digest()
+
+    def get(self, tokenizer_name, text):
+        """Returns the token counts of the words of a text or None if the
+        text is not in the cache."""
+        row = self.connection.execute(
+            'SELECT counts FROM counts WHERE key = ?',
+            (self.key(tokenizer_name, text),)).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        counts = array.array('H')
+        counts.frombytes(row[0])
+        return counts.tolist()
+
+    def put(self, tokenizer_name, text, counts):
+        self.connection.execute(
+            'INSERT OR REPLACE INTO counts (key, counts) VALUES (?, ?)',
+            (self.key(tokenizer_name, text),
+             array.array('H', (min(count, 65535) for count in counts)
+                         ).tobytes()))
+
+    def statistics(self):
+        """Prints and returns the number of hits and misses."""
+        print('TOKEN COUNT CACHE HITS: {0}'.format(self.hits))
+        print('TOKEN COUNT CACHE MISSES: {0}\n'.format(self.misses))
+        return self.hits, self.misses
+
+    def close(self):
+        self.connection.close()
+
+
+def load_tokenizer(model_dir):
+    """Loads the fast tokenizer of a model from a local directory, for
+    example a download of GroNLP/bert-base-dutch-cased (BERTje)."""
+    from transformers import AutoTokenizer
+    tokenizer = AutoTokenizer.from_pretrained(model_dir, use_fast=True,
+                                              local_files_only=True)
+    if not tokenizer.is_fast:
+        raise ValueError('NO FAST TOKENIZER FOUND IN {0}'.format(model_dir))
+    return tokenizer
+
+
+def word_token_counts(tokenizer, words):
+    """Returns the number of subword tokens of every word. The words are
+    tokenized as one text and every token is given to the word its offset
+    falls in."""
+    starts = []
+    position = 0
+    for word in words:
+        starts.append(position)
+        position += len(word) + 1
+    counts = [0] * len(words)
+    encoding = tokenizer(' '.join(words), add_special_tokens=False,
+                         return_offsets_mapping=True)
+    for start, end in encoding['offset_mapping']:
+        if end > start:
+            counts[bisect.bisect_right(starts, start) - 1] += 1
+    return counts
+
+
+def token_windows(counts, max_tokens, overlap):
+    """Returns the (start, end) word positions of the chunks. Every chunk
+    holds as many words as fit in max_tokens; the next chunk starts at the
+    first word of the last overlap tokens of the chunk before. A word that
+    is longer than max_tokens on its own becomes a chunk by itself."""
+    windows = []
+    start = 0
+    while True:
+        end = start
+        tokens = 0
+        while end < len(counts) and (end == start or
+                                     tokens + counts[end] <= max_tokens):
+            tokens += counts[end]
+            end += 1
+        windows.append((start, end))
+        if end >= len(counts):
+            return windows
+        next_start = end
+        tokens = 0
+        while next_start - 1 > start and \
+                tokens + counts[next_start - 1] <= overlap:
+            next_start -= 1
+            tokens += counts[next_start]
+        start = next_start
+
+
+class TokenChunker:
+    """Splits lists of words into chunks that fit a model. The maximum
+    length is the number of tokens the model takes, including its special
+    tokens; by default the maximum of the tokenizer, at most 512. A
+    tokenizer without a maximum reports a huge number, and BERT would cut
+    such chunks off without warning."""
+
+    def __init__(self, model_dir, cache_path='token_counts.sqlite',
+                 max_length=None, overlap=None):
+        self.tokenizer = load_tokenizer(model_dir)
+        self.name = self.tokenizer.name_or_path
+        max_length = max_length or min(512, self.tokenizer.model_max_length)
+        self.max_tokens = (max_length -
+                           self.tokenizer.num_special_tokens_to_add())
+        self.overlap = self.max_tokens // 4 if overlap is None else overlap
+        self.cache = TokenCountCache(cache_path) if cache_path else None
+
+    def counts(self, words):
+        """Returns the token counts of the words, from the cache if the
+        abstract was tokenized before."""
+        text = ' '.join(words)
+        counts = self.cache.get(self.name, text) if self.cache else None
+        if counts is None:
+            counts = word_token_counts(self.tokenizer, words)
+            if self.cache:
+                self.cache.put(self.name, text, counts)
+        return counts
+
+    def __call__(self, words):
+        return [' '.join(words[start:end]) for start, end in
+                token_windows(self.counts(words), self.max_tokens,
+                              self.overlap)]
+
+    def close(self):
+        if self.cache:
+            self.cache.close()